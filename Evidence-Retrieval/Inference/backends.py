@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+
+
+# torch | torch_int8 | onnx
+NLI_BACKEND = os.getenv("NLI_BACKEND", "torch")
+
+# ONNX graph used by the onnx backend (see Inference/export_onnx.py);
+# defaults to <model_path>/onnx/model.onnx
+NLI_ONNX_PATH = os.getenv("NLI_ONNX_PATH", "")
+
+# CPU threads for the forward pass (0 = library default)
+NLI_NUM_THREADS = int(os.getenv("NLI_NUM_THREADS", "0"))
+
+ONNX_SUBDIR = "onnx"
+
+
+def default_onnx_path(model_path, quantized=False):
+    name = "model.int8.onnx" if quantized else "model.onnx"
+    return os.path.join(model_path, ONNX_SUBDIR, name)
+
+
+def softmax(logits):
+    logits = np.asarray(logits, dtype=np.float32)
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+# =================================================
+# 🔹 BACKENDS
+# =================================================
+# Every backend exposes:
+#   name            str
+#   return_tensors  tensor type the tokenizer should produce ("pt" / "np")
+#   id2label        {int: str}
+#   logits(inputs)  -> (batch, n_labels) float32 NumPy array
+class TorchBackend:
+    name = "torch"
+    return_tensors = "pt"
+
+    def __init__(self, model_path, device=None):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        if NLI_NUM_THREADS:
+            torch.set_num_threads(NLI_NUM_THREADS)
+
+        self.torch = torch
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = AutoModelForSequenceClassification.from_pretrained(
+            model_path,
+            local_files_only=True
+        ).to(self.device)
+        self.model.eval()
+
+        self.id2label = {
+            int(k): v for k, v in self.model.config.id2label.items()
+        }
+
+    def logits(self, inputs):
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with self.torch.inference_mode():
+            return self.model(**inputs).logits.float().cpu().numpy()
+
+
+class TorchInt8Backend(TorchBackend):
+    """fp32 weights with Linear layers dynamically quantized to int8 (CPU only)."""
+    name = "torch_int8"
+
+    def __init__(self, model_path, device=None):
+        super().__init__(model_path, device="cpu")
+
+        torch = self.torch
+        quantization = getattr(torch, "ao", torch).quantization
+        self.model = quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+
+class OnnxBackend:
+    name = "onnx"
+    return_tensors = "np"
+
+    def __init__(self, model_path, onnx_path=None):
+        import onnxruntime as ort
+        from transformers import AutoConfig
+
+        onnx_path = onnx_path or NLI_ONNX_PATH or default_onnx_path(model_path)
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(
+                f"ONNX model not found at {onnx_path} "
+                f"(export it with: python -m Inference.export_onnx --model {model_path})"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if NLI_NUM_THREADS:
+            options.intra_op_num_threads = NLI_NUM_THREADS
+
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(
+            onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        config = AutoConfig.from_pretrained(model_path, local_files_only=True)
+        self.id2label = {int(k): v for k, v in config.id2label.items()}
+
+    def logits(self, inputs):
+        feed = {
+            name: np.asarray(inputs[name], dtype=np.int64)
+            for name in self.input_names
+            if name in inputs
+        }
+        return self.session.run(None, feed)[0].astype(np.float32)
+
+
+BACKENDS = {
+    "torch": TorchBackend,
+    "torch_int8": TorchInt8Backend,
+    "onnx": OnnxBackend,
+}
+
+
+def load_backend(name, model_path, **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown NLI backend '{name}' (use one of {list(BACKENDS)})")
+    return BACKENDS[name](model_path, **kwargs)
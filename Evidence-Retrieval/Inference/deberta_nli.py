@@ -98,36 +98,49 @@
 
 
 import os
-import json
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import hashlib
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from Inference.backends import NLI_BACKEND, load_backend, softmax
+from Inference.nli_aggregation import NLI_AGGREGATOR, aggregate, label_roles
+from Inference.nli_scheduler import NLI_SCHEDULER_ENABLED, NLIScheduler
+from Pipelines.artifact_store import write_artifact
+from Retrieval.fusion_and_ranking import load_fused_results
+from Pipelines.logging_setup import get_logger
+from Pipelines.tracing import span
+
+log = get_logger("nli")
+
+
+# batch = one (claim, evidence) pair per row, then aggregate
+# joint = claim + all evidence in one [SEP]-joined sequence
+NLI_MODE = os.getenv("NLI_MODE", "batch")
+
+# Max pairs per padded forward pass
+NLI_BATCH_SIZE = int(os.getenv("NLI_BATCH_SIZE", "32"))
 
 
 # =================================================
 # 🔹 DeBERTa NLI MODEL CLASS
 # =================================================
 class DebertaNLI:
-    def __init__(self, model_path, max_length=512):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+    def __init__(self, model_path, max_length=512, backend=NLI_BACKEND, **backend_options):
+        from transformers import AutoTokenizer
 
-        print("🔄 Loading DeBERTa model...")
+        log.info(f"🔄 Loading DeBERTa model ({backend} backend)...")
         self.tokenizer = AutoTokenizer.from_pretrained(
             model_path,
             local_files_only=True
         )
-        self.model = AutoModelForSequenceClassification.from_pretrained(
-            model_path,
-            local_files_only=True
-        ).to(self.device)
-
-        self.model.eval()
+        self.backend = load_backend(backend, model_path, **backend_options)
         self.max_length = max_length
+        self.id2label = self.backend.id2label
 
-        self.id2label = {
-            int(k): v for k, v in self.model.config.id2label.items()
-        }
-
-        print(f"✅ DeBERTa loaded on {self.device.upper()}")
+        log.info(f"✅ DeBERTa loaded ({self.backend.name})")
 
     def predict(self, claim, evidence_sentences):
         # Combine claim + evidences into a single sequence
@@ -137,73 +150,252 @@ class DebertaNLI:
 
         inputs = self.tokenizer(
             text,
-            return_tensors="pt",
+            return_tensors=self.backend.return_tensors,
             truncation=True,
             max_length=self.max_length,
             padding=True
-        ).to(self.device)
+        )
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            probs = torch.softmax(outputs.logits, dim=-1)
-            pred_id = torch.argmax(probs, dim=-1).item()
-            confidence = probs[0][pred_id].item()
+        probs = self._forward(inputs)
+        pred_id = int(probs[0].argmax())
+        confidence = float(probs[0][pred_id])
 
         return self.id2label[pred_id], confidence
 
+    # ---------------- batched pairs ----------------
+    def _forward(self, inputs):
+        return softmax(self.backend.logits(inputs))
+
+    def score_pairs(self, pairs, batch_size=NLI_BATCH_SIZE):
+        """
+        (n, n_labels) probabilities for (claim, evidence) pairs.
+        Pairs are tokenized once, sorted by length and padded per batch
+        only to that batch's longest pair.
+        """
+        probs = np.empty((len(pairs), len(self.id2label)), dtype=np.float32)
+        if not pairs:
+            return probs
+
+        with span("nli.forward", pairs=len(pairs), backend=self.backend.name) as s:
+            encoded = self.tokenizer(
+                [claim.strip() for claim, _ in pairs],
+                [evidence.strip() for _, evidence in pairs],
+                truncation=True,
+                max_length=self.max_length
+            )
+            lengths = [len(ids) for ids in encoded["input_ids"]]
+            order = np.argsort(lengths, kind="stable")
+            s.set(tokens=int(sum(lengths)), max_tokens=int(max(lengths)),
+                  batches=-(-len(order) // batch_size))
+
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                batch = self.tokenizer.pad(
+                    {key: [encoded[key][i] for i in rows] for key in encoded.keys()},
+                    return_tensors=self.backend.return_tensors
+                )
+                probs[rows] = self._forward(batch)
+
+        return probs
+
+    def predict_batch(self, claim, evidence_sentences, aggregator=NLI_AGGREGATOR,
+                      weights=None, scorer=None):
+        """
+        Scores every (claim, evidence) pair and aggregates them.
+        Returns (label, confidence, per-evidence probabilities).
+        `scorer` replaces self.score_pairs (e.g. NLIScheduler.score_pairs).
+        """
+        scorer = scorer or self.score_pairs
+        probs = scorer([(claim, e) for e in evidence_sentences])
+        label, confidence = aggregate(probs, self.id2label, aggregator, weights)
+        return label, confidence, probs
+
+    def label_probabilities(self, row):
+        return {self.id2label[i]: float(p) for i, p in enumerate(row)}
+
 
 # =================================================
-# 🔹 LOAD MODEL ONCE (AT IMPORT TIME)
+# 🔹 ACTIVE MODEL (LOADED ON FIRST USE / WARMUP, SWAPPABLE)
 # =================================================
-MODEL_PATH = "Models/Model-1"   # change to DeBERTa-large path if needed
-NLI_MODEL = DebertaNLI(model_path=MODEL_PATH, max_length=256)
+MODEL_PATH = os.getenv("NLI_MODEL_PATH", "Models/Model-1")
+
+
+class NLIHandle(NamedTuple):
+    """One loaded model version; requests keep the handle they started with."""
+    version: str
+    model_path: str
+    model: DebertaNLI
+    scheduler: Optional[NLIScheduler]
+    loaded_at: float
+    load_seconds: float
+
+
+_active_nli = None
+_nli_lock = threading.Lock()       # guards the active reference only
+_load_lock = threading.Lock()      # one load at a time; serving never waits on it
+
+
+FINGERPRINT_SAMPLE_BYTES = 1 << 20
+
+
+def checkpoint_fingerprint(model_path):
+    """
+    Short hash of a checkpoint directory: small files (config, tokenizer)
+    in full, weight files by size plus their first and last MiB.
+    Tells apart checkpoints that share a directory name.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            size = os.path.getsize(path)
+            digest.update(f"{os.path.relpath(path, model_path)}:{size}".encode("utf-8"))
+            with open(path, "rb") as f:
+                if size <= 2 * FINGERPRINT_SAMPLE_BYTES:
+                    digest.update(f.read())
+                else:
+                    digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+                    f.seek(-FINGERPRINT_SAMPLE_BYTES, os.SEEK_END)
+                    digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+
+def load_nli(model_path=MODEL_PATH, backend=NLI_BACKEND):
+    """Load and warm up a model version without publishing it."""
+    start = time.perf_counter()
+    model = DebertaNLI(model_path=model_path, max_length=256, backend=backend)
+    # a checkpoint whose labels cannot be aggregated is rejected here,
+    # not on the first request (raises ValueError)
+    label_roles(model.id2label)
+    # warmup forward pass, so the first real request does not pay for it
+    model.score_pairs([("Warmup claim.", "Warmup evidence.")])
+
+    return NLIHandle(
+        version=(f"{os.path.basename(os.path.normpath(model_path))}:{backend}:"
+                 f"{checkpoint_fingerprint(model_path)}"),
+        model_path=model_path,
+        model=model,
+        # Batches pairs across concurrent requests on one worker thread
+        scheduler=NLIScheduler(model) if NLI_SCHEDULER_ENABLED else None,
+        loaded_at=time.time(),
+        load_seconds=time.perf_counter() - start
+    )
+
+
+def get_nli():
+    """Active NLIHandle, loading the default model on first use."""
+    handle = _active_nli
+    if handle is not None:
+        return handle
+
+    return swap_nli(MODEL_PATH, only_if_empty=True)
+
+
+def swap_nli(model_path, backend=NLI_BACKEND, only_if_empty=False):
+    """
+    Load `model_path` and make it the active model. Requests already
+    running finish on the handle they hold; the old scheduler drains
+    its queue and stops.
+    """
+    global _active_nli
+    with _load_lock:
+        if only_if_empty and _active_nli is not None:
+            return _active_nli
+
+        # the current model keeps serving while the new one loads
+        handle = load_nli(model_path, backend)
+        with _nli_lock:
+            previous, _active_nli = _active_nli, handle
+
+    if previous is not None and previous.scheduler is not None:
+        previous.scheduler.close()
+    log.info(f"✅ NLI model active: {handle.version}")
+    return handle
+
+
+def active_nli():
+    """Active handle or None, without triggering a load."""
+    return _active_nli
+
+
+def get_nli_model():
+    return get_nli().model
 
 
 # =================================================
 # 🔹 RUN NLI (PER REQUEST)
 # =================================================
-def run_deberta_nli(query_id, claim, top_k=5):
-    fusion_path = f"outputs/fusion/final_ranked_sentences_{query_id}.json"
-
-    # Load fused top-ranked sentences
-    with open(fusion_path, "r", encoding="utf-8") as f:
-        fusion_data = json.load(f)
-
-    top_sentences = fusion_data["results"][:top_k]
+def save_nli_results(query_id, claim, result):
+    write_artifact("inference", "nli_results", query_id, {
+        "query_id": query_id,
+        "claim": claim,
+        "label": result["label"],
+        "confidence": result["confidence"],
+        "mode": result.get("mode"),
+        "aggregator": result.get("aggregator"),
+        "model_version": result.get("model_version"),
+        "evidences": result["evidences"],
+        "used_sentence_ids": [e["sentence_id"] for e in result["evidences"]],
+        "num_evidence_used": len(result["evidences"])
+    })
+
+
+def run_deberta_nli(query_id, claim, top_k=5, ranked=None, save=True,
+                    mode=NLI_MODE, aggregator=NLI_AGGREGATOR):
+    """
+    `ranked` is the in-memory fusion output; when omitted the
+    fusion file for `query_id` is loaded from disk. Returns None when
+    inference fails.
+    """
+    if ranked is None:
+        # Load fused top-ranked sentences
+        ranked = load_fused_results(query_id)
+
+    top_sentences = ranked[:top_k]
 
     evidence_texts = [s["sentence_text"] for s in top_sentences]
     evidence_ids = [s["sentence_id"] for s in top_sentences]
 
-    # 🔹 USE PRELOADED MODEL
-    label, confidence = NLI_MODEL.predict(claim, evidence_texts)
-
-    # Save result to JSON (same behavior as before)
-    os.makedirs("outputs/inference", exist_ok=True)
-    out_path = f"outputs/inference/nli_results_{query_id}.json"
+    evidences = [
+        {
+            "sentence_id": sid,
+            "sentence_text": txt
+        }
+        for sid, txt in zip(evidence_ids, evidence_texts)
+    ]
+
+    # 🔹 USE THE ACTIVE MODEL (pinned for this request)
+    handle = get_nli()
+    nli = handle.model
+    try:
+        if mode == "joint":
+            label, confidence = nli.predict(claim, evidence_texts)
+            aggregator = None
+        else:
+            label, confidence, probs = nli.predict_batch(
+                claim, evidence_texts, aggregator,
+                scorer=handle.scheduler.score_pairs if handle.scheduler else None
+            )
+            for ev, row in zip(evidences, probs):
+                ev["label"] = nli.id2label[int(row.argmax())]
+                ev["probabilities"] = nli.label_probabilities(row)
+    except Exception as e:
+        # the pipeline answers None with "NLI inference failed"
+        log.error(f"❌ NLI inference failed: {e}", extra={"query_id": query_id})
+        return None
 
-    output_data = {
-        "query_id": query_id,
-        "claim": claim,
+    # Return result for API
+    result = {
         "label": label,
         "confidence": confidence,
-        "used_sentence_ids": evidence_ids,
-        "num_evidence_used": len(evidence_texts)
+        "mode": mode,
+        "aggregator": aggregator,
+        "model_version": handle.version,
+        "evidences": evidences
     }
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
-
-    print(f"🧠 DeBERTa NLI result saved to: {out_path}")
+    if save:
+        save_nli_results(query_id, claim, result)
 
-    # Return result for API
-    return {
-        "label": label,
-        "confidence": confidence,
-        "evidences": [
-            {
-                "sentence_id": sid,
-                "sentence_text": txt
-            }
-            for sid, txt in zip(evidence_ids, evidence_texts)
-        ]
-    }
+    return result
@@ -0,0 +1,144 @@
+"""
+Export the NLI model to ONNX (and optionally quantize it) for
+NLI_BACKEND=onnx.
+
+    python -m Inference.export_onnx --model Models/Model-1
+    python -m Inference.export_onnx --model Models/Model-1 --quantize dynamic
+    python -m Inference.export_onnx --model Models/Model-1 --quantize static \
+        --calibration Inference/fixtures/nli_parity.jsonl
+
+The fp32 graph is written to <model>/onnx/model.onnx; a quantized graph to
+<model>/onnx/model.int8.onnx (point NLI_ONNX_PATH at it to serve it).
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from Inference.backends import default_onnx_path
+
+
+def load_pairs(path):
+    """(claim, evidence) pairs from a fixture jsonl ({"claim", "evidence": [...]})."""
+    pairs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                pairs.extend((row["claim"], e) for e in row["evidence"])
+    return pairs
+
+
+# =================================================
+# 🔹 EXPORT
+# =================================================
+def export_onnx(model_path, out_path, opset=17, max_length=256):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_path, local_files_only=True
+    ).eval()
+
+    dummy = tokenizer(
+        ["A claim to verify."], ["Some evidence sentence."],
+        return_tensors="pt", truncation=True, max_length=max_length
+    )
+    input_names = list(dummy.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            out_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+
+    print(f"💾 ONNX model saved to: {out_path}")
+    return out_path
+
+
+# =================================================
+# 🔹 QUANTIZATION
+# =================================================
+class PairCalibrationReader:
+    """Feeds tokenized fixture pairs to onnxruntime static calibration."""
+
+    def __init__(self, model_path, onnx_path, pairs, max_length=256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+        session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        input_names = [i.name for i in session.get_inputs()]
+
+        self._batches = iter([
+            {
+                name: np.asarray(encoded[name], dtype=np.int64)
+                for name in input_names
+            }
+            for encoded in (
+                tokenizer([claim], [evidence], return_tensors="np",
+                          truncation=True, max_length=max_length)
+                for claim, evidence in pairs
+            )
+        ])
+
+    def get_next(self):
+        return next(self._batches, None)
+
+
+def quantize(model_path, onnx_path, out_path, mode="dynamic", calibration=None):
+    from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+
+    if mode == "dynamic":
+        quantize_dynamic(onnx_path, out_path, weight_type=QuantType.QInt8)
+    elif mode == "static":
+        if not calibration:
+            raise ValueError("static quantization needs --calibration <fixtures.jsonl>")
+        reader = PairCalibrationReader(model_path, onnx_path, load_pairs(calibration))
+        quantize_static(
+            onnx_path, out_path, reader,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8
+        )
+    else:
+        raise ValueError(f"Unknown quantization mode '{mode}' (use dynamic or static)")
+
+    print(f"💾 Quantized ({mode}) ONNX model saved to: {out_path}")
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the NLI model to ONNX")
+    parser.add_argument("--model", default="Models/Model-1")
+    parser.add_argument("--out", default=None, help="fp32 graph path")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--quantize", choices=["dynamic", "static"], default=None)
+    parser.add_argument("--calibration", default=None,
+                        help="fixture jsonl used for static calibration")
+    args = parser.parse_args()
+
+    onnx_path = export_onnx(args.model, args.out or default_onnx_path(args.model), args.opset)
+
+    if args.quantize:
+        quantize(
+            args.model,
+            onnx_path,
+            default_onnx_path(args.model, quantized=True),
+            mode=args.quantize,
+            calibration=args.calibration
+        )
+
+
+if __name__ == "__main__":
+    main()
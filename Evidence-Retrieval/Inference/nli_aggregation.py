@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+
+
+# max | vote | confidence
+NLI_AGGREGATOR = os.getenv("NLI_AGGREGATOR", "max")
+
+# "max" aggregator: below this neither side wins -> neutral label
+NLI_DECISION_THRESHOLD = float(os.getenv("NLI_DECISION_THRESHOLD", "0.5"))
+
+SUPPORT_HINTS = ("SUPPORT", "ENTAIL")
+REFUTE_HINTS = ("REFUTE", "CONTRADICT")
+
+
+def label_roles(id2label):
+    """{"support": id, "refute": id, "neutral": id} from the model's label names."""
+    roles = {}
+    for idx, name in id2label.items():
+        upper = name.upper()
+        if any(h in upper for h in SUPPORT_HINTS):
+            roles["support"] = idx
+        elif any(h in upper for h in REFUTE_HINTS):
+            roles["refute"] = idx
+        else:
+            roles["neutral"] = idx
+
+    missing = {"support", "refute", "neutral"} - set(roles)
+    if missing:
+        raise ValueError(f"Cannot map NLI labels {list(id2label.values())} (missing {sorted(missing)})")
+    return roles
+
+
+def rank_weights(n):
+    """1, 1/2, 1/3, ... for evidence in fusion order."""
+    return 1.0 / np.arange(1, n + 1)
+
+
+# =================================================
+# 🔹 AGGREGATORS
+# =================================================
+# each takes (n_evidence, n_labels) probabilities and per-evidence
+# weights, and returns (label_id, confidence)
+def aggregate_max(probs, roles, weights):
+    """Strongest single support vs strongest single refutation."""
+    support = probs[:, roles["support"]].max()
+    refute = probs[:, roles["refute"]].max()
+
+    if max(support, refute) < NLI_DECISION_THRESHOLD:
+        return roles["neutral"], float(1 - max(support, refute))
+    if support >= refute:
+        return roles["support"], float(support)
+    return roles["refute"], float(refute)
+
+
+def aggregate_vote(probs, roles, weights):
+    """Each evidence votes its argmax label with its weight."""
+    votes = np.bincount(probs.argmax(axis=1), weights=weights, minlength=probs.shape[1])
+    label_id = int(votes.argmax())
+    return label_id, float(votes[label_id] / votes.sum())
+
+
+def aggregate_confidence(probs, roles, weights):
+    """Mean distribution, each evidence weighted by weight * its own certainty."""
+    w = weights * probs.max(axis=1)
+    mean = (probs * w[:, None]).sum(axis=0) / w.sum()
+    label_id = int(mean.argmax())
+    return label_id, float(mean[label_id])
+
+
+AGGREGATORS = {
+    "max": aggregate_max,
+    "vote": aggregate_vote,
+    "confidence": aggregate_confidence,
+}
+
+
+def aggregate(probs, id2label, aggregator=NLI_AGGREGATOR, weights=None):
+    """Final (label, confidence) from per-evidence probabilities."""
+    if aggregator not in AGGREGATORS:
+        raise ValueError(f"Unknown NLI aggregator '{aggregator}' (use one of {list(AGGREGATORS)})")
+
+    roles = label_roles(id2label)
+    probs = np.asarray(probs, dtype=np.float64)
+    if len(probs) == 0:
+        return id2label[roles["neutral"]], 0.0
+
+    weights = rank_weights(len(probs)) if weights is None else np.asarray(weights, dtype=np.float64)
+    label_id, confidence = AGGREGATORS[aggregator](probs, roles, weights)
+    return id2label[label_id], confidence
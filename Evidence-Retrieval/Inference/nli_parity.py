@@ -0,0 +1,98 @@
+"""
+Parity check of an NLI backend against the fp32 PyTorch reference.
+
+    python -m Inference.nli_parity --backend torch_int8
+    python -m Inference.nli_parity --backend onnx --onnx-path Models/Model-1/onnx/model.int8.onnx
+
+Compares per-pair labels and probabilities plus the aggregated claim label
+on a fixture set; exits non-zero when the candidate is out of tolerance.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from Inference.deberta_nli import DebertaNLI
+from Inference.nli_aggregation import NLI_AGGREGATOR, aggregate
+
+DEFAULT_FIXTURES = "Inference/fixtures/nli_parity.jsonl"
+
+
+def load_fixtures(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def score_fixtures(nli, fixtures):
+    """Per-fixture probability matrices, plus total forward time."""
+    start = time.perf_counter()
+    probs = [
+        nli.score_pairs([(row["claim"], e) for e in row["evidence"]])
+        for row in fixtures
+    ]
+    return probs, time.perf_counter() - start
+
+
+def compare(reference, candidate, fixtures, id2label, aggregator=NLI_AGGREGATOR):
+    pair_agree = pair_total = claim_agree = 0
+    max_prob_diff = max_conf_diff = 0.0
+
+    for ref, cand in zip(reference, candidate):
+        pair_agree += int((ref.argmax(axis=1) == cand.argmax(axis=1)).sum())
+        pair_total += len(ref)
+        if len(ref):
+            max_prob_diff = max(max_prob_diff, float(np.abs(ref - cand).max()))
+
+        ref_label, ref_conf = aggregate(ref, id2label, aggregator)
+        cand_label, cand_conf = aggregate(cand, id2label, aggregator)
+        claim_agree += int(ref_label == cand_label)
+        max_conf_diff = max(max_conf_diff, abs(ref_conf - cand_conf))
+
+    return {
+        "fixtures": len(fixtures),
+        "pairs": pair_total,
+        "pair_label_agreement": pair_agree / max(pair_total, 1),
+        "claim_label_agreement": claim_agree / max(len(fixtures), 1),
+        "max_prob_diff": max_prob_diff,
+        "max_confidence_diff": max_conf_diff,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NLI backend parity check vs fp32")
+    parser.add_argument("--backend", required=True, choices=["torch", "torch_int8", "onnx"])
+    parser.add_argument("--model", default="Models/Model-1")
+    parser.add_argument("--onnx-path", default=None)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="minimum claim-level label agreement")
+    parser.add_argument("--max-confidence-diff", type=float, default=0.05)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+
+    reference = DebertaNLI(args.model, max_length=256, backend="torch", device="cpu")
+    options = {"onnx_path": args.onnx_path} if args.backend == "onnx" else {}
+    candidate = DebertaNLI(args.model, max_length=256, backend=args.backend, **options)
+
+    ref_probs, ref_time = score_fixtures(reference, fixtures)
+    cand_probs, cand_time = score_fixtures(candidate, fixtures)
+
+    report = compare(ref_probs, cand_probs, fixtures, reference.id2label)
+    report["fp32_seconds"] = ref_time
+    report[f"{args.backend}_seconds"] = cand_time
+
+    print(json.dumps(report, indent=2))
+
+    ok = (
+        report["claim_label_agreement"] >= args.min_agreement
+        and report["max_confidence_diff"] <= args.max_confidence_diff
+    )
+    print("✅ Parity OK" if ok else "❌ Parity check failed")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
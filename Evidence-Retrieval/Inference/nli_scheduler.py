@@ -0,0 +1,187 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from Pipelines.logging_setup import get_logger
+from Pipelines.tracing import current_span, record_span, span, use_span
+
+log = get_logger("nli.scheduler")
+
+# Route batched NLI through the shared micro-batching worker
+NLI_SCHEDULER_ENABLED = os.getenv("NLI_SCHEDULER", "1") == "1"
+
+# How long the worker waits for more requests after the first one arrives
+NLI_BATCH_WINDOW_MS = float(os.getenv("NLI_BATCH_WINDOW_MS", "5"))
+
+# Pairs collected before a batch is dispatched without waiting
+NLI_MAX_BATCH_PAIRS = int(os.getenv("NLI_MAX_BATCH_PAIRS", "32"))
+
+
+# -----------------------------------------------------
+# Batch observers (metrics)
+# -----------------------------------------------------
+_batch_observers = []
+
+
+def add_batch_observer(fn):
+    """`fn(n_pairs, n_requests, seconds)` after every scored batch."""
+    if fn not in _batch_observers:
+        _batch_observers.append(fn)
+
+
+def _notify_batch(n_pairs, n_requests, seconds):
+    for fn in list(_batch_observers):
+        try:
+            fn(n_pairs, n_requests, seconds)
+        except Exception as e:
+            log.warning(f"⚠️ Batch observer failed: {e}")
+
+
+class _Request:
+    __slots__ = ("pairs", "future", "span")
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+        self.future = Future()
+        self.span = current_span()      # the batch is traced under each caller
+
+
+class NLIScheduler:
+    """
+    Micro-batches (claim, evidence) pairs from concurrent pipelines.
+
+    Callers submit their pairs and get a Future; a single worker thread
+    collects requests for up to `window_ms` (or until `max_pairs` pairs
+    are waiting) and scores them together with `nli.score_pairs`, which
+    length-sorts and pads the combined batch. Each future resolves to
+    that caller's (n_pairs, n_labels) probability rows.
+    """
+
+    def __init__(self, nli, window_ms=NLI_BATCH_WINDOW_MS, max_pairs=NLI_MAX_BATCH_PAIRS):
+        self.nli = nli
+        self.window = window_ms / 1000.0
+        self.max_pairs = max_pairs
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches = 0
+        self.pairs = 0
+        self.requests = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="nli-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, pairs):
+        request = _Request(list(pairs))
+        if not request.pairs:
+            request.future.set_result(
+                np.empty((0, len(self.nli.id2label)), dtype=np.float32)
+            )
+            return request.future
+
+        with self._lock:
+            if not self._closed:
+                self._queue.put(request)
+                return request.future
+
+        # scheduler retired (model swapped): score inline on the old model
+        try:
+            request.future.set_result(self.nli.score_pairs(request.pairs))
+        except Exception as e:
+            request.future.set_exception(e)
+        return request.future
+
+    def score_pairs(self, pairs, timeout=None):
+        return self.submit(pairs).result(timeout=timeout)
+
+    def close(self):
+        """Finish queued requests, then stop the worker thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+    # ---------------- worker ----------------
+    def _collect(self):
+        """(batch, stop) - stop is set once the close() sentinel is reached."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        n_pairs = len(first.pairs)
+        deadline = time.monotonic() + self.window
+        stop = False
+
+        while n_pairs < self.max_pairs:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                stop = True
+                break
+            batch.append(request)
+            n_pairs += len(request.pairs)
+
+        # drop requests whose caller gave up
+        return [r for r in batch if r.future.set_running_or_notify_cancel()], stop
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+            if not batch:
+                continue
+
+            pairs = [pair for request in batch for pair in request.pairs]
+            start = time.perf_counter()
+            start_ns = time.time_ns()
+            try:
+                # forward span in the first caller's trace, a copy in the others
+                with use_span(batch[0].span), span(
+                    "nli.batch", pairs=len(pairs), requests=len(batch)
+                ):
+                    probs = self.nli.score_pairs(pairs)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            _notify_batch(len(pairs), len(batch), time.perf_counter() - start)
+
+            end_ns = time.time_ns()
+            for request in batch[1:]:
+                record_span("nli.batch", request.span, start_ns, end_ns,
+                            pairs=len(pairs), requests=len(batch), shared=True)
+
+            offset = 0
+            for request in batch:
+                n = len(request.pairs)
+                request.future.set_result(probs[offset:offset + n])
+                offset += n
+
+            with self._lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.pairs += len(pairs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "pairs": self.pairs,
+                "avg_pairs_per_batch": self.pairs / self.batches if self.batches else 0.0,
+                "queued": self._queue.qsize(),
+            }
@@ -1,25 +1,22 @@
 # pipelines/gnews.py
 
 import re
-import requests
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 from nltk.util import ngrams
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sentence_transformers import SentenceTransformer, util
 
+from Pipelines.http_client import get_json, SourceRequestError
+from Retrieval.encoder_registry import get_encoder
+from Pipelines.logging_setup import get_logger
 
-# =============================
-# 🔹 MODEL (load once)
-# =============================
-_model = None
+log = get_logger("sources.gnews")
 
 
+# =============================
+# 🔹 MODEL (shared with retrieval)
+# =============================
 def get_model():
-    global _model
-    if _model is None:
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
-    return _model
+    return get_encoder("all-MiniLM-L6-v2")
 
 
 # =============================
@@ -47,6 +44,10 @@ def select_relevant_ngrams(query, ngram_list, top_k=5):
     if not ngram_list:
         return []
 
+    # heavy imports deferred to first use (keeps app import fast)
+    from sentence_transformers import util
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
     model = get_model()
 
     # Semantic similarity
@@ -108,22 +109,19 @@ def gnews_pipeline(user_query, api_key, limit=20, lang="en"):
     Output : List[dict] with unified schema
     """
     expanded = expand_query(user_query)
-    encoded_query = requests.utils.quote(expanded)
 
-    url = (
-        f"https://gnews.io/api/v4/search?"
-        f"q={encoded_query}"
-        f"&lang={lang}"
-        f"&max={limit}"
-        f"&apikey={api_key}"
-    )
+    url = "https://gnews.io/api/v4/search"
+    params = {
+        "q": expanded,
+        "lang": lang,
+        "max": limit,
+        "apikey": api_key
+    }
 
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"❌ GNews API request failed: {e}")
+        data = get_json(url, params=params, timeout=10, cache="gnews")
+    except SourceRequestError as e:
+        log.error(f"❌ GNews API request failed: {e}")
         return []
 
     final_results = []
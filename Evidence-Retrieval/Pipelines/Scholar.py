@@ -46,8 +46,12 @@
 #     return final_results
 # pipelines/scholar.py
 
-import requests
-import time
+import os
+
+from Pipelines.http_client import get_json
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("sources.scholar")
 
 
 # # ==============================
@@ -117,10 +121,6 @@ def scholar_pipeline(user_query, limit=5):
     Output : List[dict] with unified schema
     """
 
-    import requests
-    import time
-    import os
-
     final_results = []
     seen_titles = set()
     doc_counter = 0
@@ -140,10 +140,8 @@ def scholar_pipeline(user_query, limit=5):
             "User-Agent": "Evidence-Retrieval/1.0 (academic-research)"
         }
 
-        time.sleep(0.3)
-        r = requests.get(openalex_url, params=openalex_params, headers=headers, timeout=15)
-        r.raise_for_status()
-        data = r.json()
+        data = get_json(openalex_url, params=openalex_params, headers=headers,
+                        timeout=15, cache="openalex")
 
         for item in data.get("results", []):
             abstract_inverted = item.get("abstract_inverted_index")
@@ -175,7 +173,7 @@ def scholar_pipeline(user_query, limit=5):
             })
 
     except Exception as e:
-        print(f"⚠️ OpenAlex failed: {e}")
+        log.warning(f"⚠️ OpenAlex failed: {e}")
 
     # -------------------------------------------------
     # 🔹 2) SEMANTIC SCHOLAR (FALLBACK)
@@ -194,20 +192,9 @@ def scholar_pipeline(user_query, limit=5):
                 "x-api-key": os.getenv("SEMANTIC_SCHOLAR_API_KEY", "")
             }
 
-            retries = 3
-            for attempt in range(retries):
-                time.sleep(2 ** attempt)
-                r = requests.get(scholar_url, params=scholar_params, headers=headers, timeout=15)
-
-                if r.status_code == 200:
-                    data = r.json()
-                    break
-                elif r.status_code == 429:
-                    print(f"⏳ Scholar rate limited (retry {attempt+1})")
-                    continue
-                else:
-                    data = {}
-                    break
+            # backoff only kicks in after a 429 / 5xx / network error
+            data = get_json(scholar_url, params=scholar_params, headers=headers,
+                            timeout=15, retries=3, cache="semantic_scholar")
 
             for item in data.get("data", []):
                 abstract = item.get("abstract")
@@ -233,6 +220,6 @@ def scholar_pipeline(user_query, limit=5):
                     break
 
         except Exception as e:
-            print(f"⚠️ Semantic Scholar failed: {e}")
+            log.warning(f"⚠️ Semantic Scholar failed: {e}")
 
     return final_results
@@ -1,12 +1,19 @@
 # pipelines/wiki.py
 
+import os
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from nltk.corpus import stopwords, wordnet
 from nltk.tokenize import word_tokenize
 from nltk.util import ngrams
 from fuzzywuzzy import fuzz
 
+from Pipelines.http_client import get_json, SourceRequestError
+from Pipelines.logging_setup import get_logger
+from Pipelines.tracing import propagate
+
+log = get_logger("sources.wikipedia")
+
 
 # ==============================
 # 🔹 PREPROCESSING + SEMANTIC EXPANSION
@@ -39,13 +46,17 @@ def preprocess_and_expand(query: str):
 # ==============================
 # 🔹 WIKIPEDIA SEARCH FUNCTIONS
 # ==============================
-HEADERS = {
-    "User-Agent": "Evidence-Retrieval/1.0 (academic-research)"
-}
+WIKI_API_URL = "https://en.wikipedia.org/w/api.php"
+
+# Max concurrent Wikipedia requests per pipeline call
+WIKI_PARALLELISM = int(os.getenv("WIKI_PARALLELISM", "5"))
+
+# MediaWiki caps prop=extracts with exintro at 20 titles per request
+SUMMARY_BATCH_SIZE = 20
 
 
 def search_wikipedia(query, limit=5):
-    url = "https://en.wikipedia.org/w/api.php"
+    url = WIKI_API_URL
     params = {
         "action": "query",
         "list": "search",
@@ -55,25 +66,94 @@ def search_wikipedia(query, limit=5):
     }
 
     try:
-        response = requests.get(url, params=params, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        return response.json().get("query", {}).get("search", [])
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Wikipedia search failed for '{query}': {e}")
+        data = get_json(url, params=params, timeout=10, cache="wiki_search")
+        return data.get("query", {}).get("search", [])
+    except SourceRequestError as e:
+        log.error(f"❌ Wikipedia search failed for '{query}': {e}")
         return []
 
 
 def get_page_summary(title):
     url = "https://en.wikipedia.org/api/rest_v1/page/summary/" + title.replace(" ", "_")
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Summary request failed for '{title}': {e}")
+        return get_json(url, timeout=10, cache="wiki_summary")
+    except SourceRequestError as e:
+        log.error(f"❌ Summary request failed for '{title}': {e}")
         return None
 
 
+def get_page_summaries(titles):
+    """
+    Fetches intro extracts for many titles with one multi-title
+    MediaWiki query per SUMMARY_BATCH_SIZE titles.
+
+    Returns {requested_title: summary} where summary has the same
+    "extract" / "content_urls" shape as get_page_summary().
+    Titles missing from the batch response fall back to the REST endpoint.
+    """
+    summaries = {}
+    if not titles:
+        return summaries
+
+    batches = [
+        titles[i:i + SUMMARY_BATCH_SIZE]
+        for i in range(0, len(titles), SUMMARY_BATCH_SIZE)
+    ]
+
+    for batch in batches:
+        params = {
+            "action": "query",
+            "prop": "extracts|info",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": len(batch),
+            "inprop": "url",
+            "redirects": 1,
+            "titles": "|".join(batch),
+            "format": "json",
+        }
+
+        try:
+            data = get_json(
+                WIKI_API_URL, params=params, timeout=10, cache="wiki_summary"
+            ).get("query", {})
+        except SourceRequestError as e:
+            log.error(f"❌ Batched summary request failed: {e}")
+            continue
+
+        # requested title -> final page title (after normalization / redirects)
+        resolved = {t: t for t in batch}
+        for step in data.get("normalized", []) + data.get("redirects", []):
+            for requested, current in resolved.items():
+                if current == step.get("from"):
+                    resolved[requested] = step.get("to")
+
+        pages = {
+            page.get("title"): page
+            for page in data.get("pages", {}).values()
+            if "missing" not in page
+        }
+
+        for requested, final_title in resolved.items():
+            page = pages.get(final_title)
+            if not page or not page.get("extract"):
+                continue
+            summaries[requested] = {
+                "title": page.get("title"),
+                "extract": page.get("extract", ""),
+                "content_urls": {"desktop": {"page": page.get("fullurl", "")}}
+            }
+
+    missing = [t for t in titles if t not in summaries]
+    if missing:
+        with ThreadPoolExecutor(max_workers=WIKI_PARALLELISM) as pool:
+            for title, summary in zip(missing, pool.map(propagate(get_page_summary), missing)):
+                if summary:
+                    summaries[title] = summary
+
+    return summaries
+
+
 # ==============================
 # 🔹 MAIN WIKIPEDIA PIPELINE
 # ==============================
@@ -90,8 +170,13 @@ def wiki_pipeline(user_query, limit=5):
     # prioritize longer (more specific) queries
     expanded_queries.sort(key=lambda x: len(x.split()), reverse=True)
 
-    for q in expanded_queries[:10]:
-        results = search_wikipedia(q, limit)
+    # run the expanded searches concurrently, merge in query order
+    with ThreadPoolExecutor(max_workers=WIKI_PARALLELISM) as pool:
+        search_results = list(pool.map(
+            propagate(lambda q: search_wikipedia(q, limit)), expanded_queries[:10]
+        ))
+
+    for results in search_results:
         for r in results:
             title = r.get("title")
             if title and title not in seen_titles:
@@ -104,11 +189,14 @@ def wiki_pipeline(user_query, limit=5):
         if fuzz.partial_ratio(user_query.lower(), r["title"].lower()) > 60
     ]
 
+    candidates = filtered_results[:limit]
+    summaries = get_page_summaries([r["title"] for r in candidates])
+
     final_results = []
     doc_counter = 0
 
-    for r in filtered_results[:limit]:
-        summary = get_page_summary(r["title"])
+    for r in candidates:
+        summary = summaries.get(r["title"])
         if not summary:
             continue
 
@@ -0,0 +1,327 @@
+# pipelines/artifact_store.py
+
+"""
+Debug artifacts written under outputs/ (documents, sentences,
+BM25 / FAISS scores, fused ranking, NLI results).
+
+- selectable format: ARTIFACT_FORMAT = json | orjson | msgpack | parquet
+  (default: compact orjson when installed, else compact json)
+- payloads are encoded by the caller and the bytes written on a
+  background thread; the queue is bounded by ARTIFACT_QUEUE_BYTES and,
+  once full, the caller writes its file itself instead of queueing it
+  (nothing is dropped, so a written artifact can always be read back)
+- read_artifact() returns a LazyArtifact that only decodes on access
+  and finds the file whatever format it was written in
+"""
+
+import os
+import json
+import queue
+import atexit
+import threading
+import importlib.util
+
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("artifacts")
+
+
+# ==============================
+# 🔹 CONFIG
+# ==============================
+def default_format():
+    return "orjson" if importlib.util.find_spec("orjson") else "json"
+
+
+ARTIFACT_FORMAT = os.getenv("ARTIFACT_FORMAT") or default_format()
+ARTIFACT_ASYNC = os.getenv("ARTIFACT_ASYNC", "1") == "1"
+
+# Encoded bytes waiting for the writer thread
+ARTIFACT_QUEUE_BYTES = int(os.getenv("ARTIFACT_QUEUE_BYTES", str(64 * 2**20)))
+
+OUTPUT_ROOT = "outputs"
+
+EXTENSIONS = {
+    "json": "json",
+    "orjson": "json",
+    "msgpack": "msgpack",
+    "parquet": "parquet",
+}
+
+
+# ==============================
+# 🔹 ENCODERS / DECODERS
+# ==============================
+def _encode_json(payload, table_key):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _encode_orjson(payload, table_key):
+    import orjson
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _encode_msgpack(payload, table_key):
+    import msgpack
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def _encode_parquet(payload, table_key):
+    import io
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    header = {k: v for k, v in payload.items() if k != table_key}
+    table = pa.Table.from_pylist(payload[table_key])
+    table = table.replace_schema_metadata({
+        b"artifact_header": json.dumps(header).encode("utf-8"),
+        b"artifact_table_key": table_key.encode("utf-8"),
+    })
+
+    buf = io.BytesIO()
+    pq.write_table(table, buf, compression="zstd")
+    return buf.getvalue()
+
+
+ENCODERS = {
+    "json": _encode_json,
+    "orjson": _encode_orjson,
+    "msgpack": _encode_msgpack,
+    "parquet": _encode_parquet,
+}
+
+
+def _resolve_format(fmt, table_key):
+    # parquet only makes sense for record tables
+    if fmt == "parquet" and table_key is None:
+        fmt = "orjson"
+    if fmt not in ENCODERS:
+        log.warning(f"⚠️ Unknown ARTIFACT_FORMAT '{fmt}', using json")
+        fmt = "json"
+    return fmt
+
+
+def _encode(payload, fmt, table_key):
+    try:
+        return fmt, ENCODERS[fmt](payload, table_key)
+    except ImportError as e:
+        log.warning(f"⚠️ {fmt} artifacts unavailable ({e}), falling back to json")
+        return "json", _encode_json(payload, table_key)
+
+
+# ==============================
+# 🔹 BACKGROUND WRITER
+# ==============================
+class ArtifactWriter:
+    def __init__(self, max_bytes=ARTIFACT_QUEUE_BYTES):
+        self.max_bytes = max_bytes
+        self._queue = queue.Queue()
+        self._queued_bytes = 0
+        self._pending = {}          # base path -> Event set once written
+        self._lock = threading.Lock()
+        self.inline_writes = 0
+        self._thread = threading.Thread(
+            target=self._run, name="artifact-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                task()
+            except Exception as e:
+                log.warning(f"⚠️ Artifact task failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, fn, base=None, size=0):
+        """
+        Queue `fn`, which holds `size` bytes until it has run. Past
+        max_bytes it runs on the calling thread instead (returns False).
+        """
+        with self._lock:
+            # housekeeping (size 0) always queues, so it still runs after the writes
+            full = size > 0 and self._queued_bytes > 0 and self._queued_bytes + size > self.max_bytes
+            if full:
+                self.inline_writes += 1
+            else:
+                self._queued_bytes += size
+
+        if full:
+            log.debug(f"⏳ Artifact queue full, writing {base or fn.__name__} inline")
+            if base is not None:
+                # an older queued write of the same file must not land after this one
+                self.wait_for(base)
+            try:
+                fn()
+            except Exception as e:
+                log.warning(f"⚠️ Artifact task failed: {e}")
+            return False
+
+        done = threading.Event()
+
+        def task():
+            try:
+                fn()
+            finally:
+                done.set()
+                with self._lock:
+                    self._queued_bytes -= size
+                    if base is not None and self._pending.get(base) is done:
+                        del self._pending[base]
+
+        if base is not None:
+            with self._lock:
+                self._pending[base] = done
+        self._queue.put(task)
+        return True
+
+    def queued_bytes(self):
+        with self._lock:
+            return self._queued_bytes
+
+    def wait_for(self, base, timeout=None):
+        with self._lock:
+            done = self._pending.get(base)
+        if done is not None:
+            done.wait(timeout)
+
+    def flush(self, timeout=None):
+        """Block until every queued task has run (or `timeout` expires)."""
+        with self._queue.all_tasks_done:
+            self._queue.all_tasks_done.wait_for(
+                lambda: self._queue.unfinished_tasks == 0, timeout
+            )
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ArtifactWriter()
+                atexit.register(_writer.flush, 10)
+    return _writer
+
+
+def submit_task(fn):
+    """Run housekeeping on the writer thread, after queued writes."""
+    get_writer().submit(fn)
+
+
+# ==============================
+# 🔹 WRITE / READ
+# ==============================
+def artifact_base(stage_dir, prefix, query_id):
+    return os.path.join(OUTPUT_ROOT, stage_dir, f"{prefix}_{query_id}")
+
+
+def _write_file(base, fmt, data):
+    path = f"{base}.{EXTENSIONS[fmt]}"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+    log.debug(f"💾 Artifact saved to: {path}")
+
+
+def write_artifact(stage_dir, prefix, query_id, payload, table_key=None, fmt=None):
+    """
+    Persist `payload` as outputs/<stage_dir>/<prefix>_<query_id>.<ext>.
+    `table_key` names the list of records inside the payload (used by
+    columnar formats). The payload is encoded before this returns; with
+    ARTIFACT_ASYNC on, the file is written on the writer thread.
+    """
+    base = artifact_base(stage_dir, prefix, query_id)
+    fmt, data = _encode(payload, _resolve_format(fmt or ARTIFACT_FORMAT, table_key), table_key)
+
+    if not ARTIFACT_ASYNC:
+        _write_file(base, fmt, data)
+        return
+
+    get_writer().submit(lambda: _write_file(base, fmt, data), base=base, size=len(data))
+
+
+class LazyArtifact:
+    """Decodes an artifact file the first time its contents are needed."""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = path.rsplit(".", 1)[-1]
+        self._data = None
+        self._table = None
+        self._table_key = None
+        self._header = None
+
+    def _load(self):
+        if self._data is not None:
+            return
+
+        if self.format == "json":
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            try:
+                import orjson
+                self._data = orjson.loads(raw)
+            except ImportError:
+                self._data = json.loads(raw)
+        elif self.format == "msgpack":
+            import msgpack
+            with open(self.path, "rb") as f:
+                self._data = msgpack.unpackb(f.read(), raw=False)
+        elif self.format == "parquet":
+            self._load_parquet_header()
+            self._data = dict(self._header)
+        else:
+            raise ValueError(f"Unsupported artifact format: {self.path}")
+
+    def _load_parquet_header(self):
+        if self._header is not None:
+            return
+        import pyarrow.parquet as pq
+        meta = pq.read_schema(self.path).metadata or {}
+        self._header = json.loads(meta.get(b"artifact_header", b"{}"))
+        self._table_key = meta.get(b"artifact_table_key", b"records").decode("utf-8")
+
+    def _load_table(self):
+        import pyarrow.parquet as pq
+        return pq.read_table(self.path).to_pylist()
+
+    def __getitem__(self, key):
+        self._load()
+        if self.format == "parquet" and key == self._table_key:
+            if self._table is None:
+                self._table = self._load_table()
+            return self._table
+        return self._data[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def read_artifact(stage_dir, prefix, query_id):
+    """
+    Lazily open the artifact for `query_id`, whatever format it was
+    written in. Waits for a pending background write of the same file.
+    """
+    base = artifact_base(stage_dir, prefix, query_id)
+    if _writer is not None:
+        _writer.wait_for(base)
+
+    for ext in ("json", "msgpack", "parquet"):
+        path = f"{base}.{ext}"
+        if os.path.exists(path):
+            return LazyArtifact(path)
+
+    raise FileNotFoundError(f"No artifact found for {base}")
@@ -0,0 +1,379 @@
+# pipelines/http_client.py
+
+"""
+Process-wide HTTP client shared by the source pipelines
+(Wikipedia, Scholar, GNews).
+
+- one pooled keep-alive client per process (sync) / per event loop (async)
+- optional HTTP/2 (HTTP2_ENABLED=1, needs the `h2` package)
+- per-host connection limits
+- retries with jittered exponential backoff, only after a failure
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from Pipelines.logging_setup import get_logger
+from Pipelines.response_cache import SECRET_PARAMS, get_response_cache
+from Pipelines.tracing import SPAN_KIND_CLIENT, span
+
+log = get_logger("http")
+
+
+# ==============================
+# 🔹 CONFIG
+# ==============================
+DEFAULT_HEADERS = {
+    "User-Agent": "Evidence-Retrieval/1.0 (academic-research)"
+}
+
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "0") == "1"
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "64"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "8"))
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRIES = 2
+BACKOFF_BASE = 0.5      # seconds
+BACKOFF_MAX = 8.0       # seconds
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SourceRequestError(Exception):
+    """Raised when an upstream request fails after all retries."""
+
+    def __init__(self, message, status_code=None, timed_out=False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.timed_out = timed_out
+
+
+# ==============================
+# 🔹 CLIENTS
+# ==============================
+def _http2_supported():
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        log.warning("⚠️ HTTP2_ENABLED=1 but 'h2' is not installed, using HTTP/1.1")
+        return False
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_CONNECTIONS,
+    )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+# httpx.AsyncClient is bound to the loop it was first used on; entries
+# go away with their loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    http2=_http2_supported(),
+                    limits=_limits(),
+                    headers=DEFAULT_HEADERS,
+                    timeout=DEFAULT_TIMEOUT,
+                    follow_redirects=True,
+                )
+    return _client
+
+
+def get_async_client():
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=_http2_supported(),
+                limits=_limits(),
+                headers=DEFAULT_HEADERS,
+                timeout=DEFAULT_TIMEOUT,
+                follow_redirects=True,
+            )
+            _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_client():
+    """Close the running loop's client (call before the loop shuts down)."""
+    with _client_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# ==============================
+# 🔹 PER-HOST LIMITS
+# ==============================
+_host_semaphores = {}
+_async_host_semaphores = weakref.WeakKeyDictionary()   # loop -> {host: asyncio.Semaphore}
+
+
+def _host_semaphore(host):
+    with _client_lock:
+        sem = _host_semaphores.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+            _host_semaphores[host] = sem
+    return sem
+
+
+def _async_host_semaphore(host):
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        per_host = _async_host_semaphores.setdefault(loop, {})
+        sem = per_host.get(host)
+        if sem is None:
+            sem = per_host[host] = asyncio.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+    return sem
+
+
+# ==============================
+# 🔹 RETRY HELPERS
+# ==============================
+def backoff_delay(attempt, retry_after=None):
+    """
+    Full-jitter exponential backoff for the given retry attempt (1-based).
+    A Retry-After header from the server takes precedence.
+    """
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _retry_delay(url, attempt, retries, response=None, error=None):
+    """
+    Retry policy shared by the sync and async paths: seconds to wait
+    before the next attempt, or None when `response` is final.
+    Raises SourceRequestError when a transport error used the last attempt.
+    """
+    if error is not None:
+        if attempt == retries:
+            raise SourceRequestError(
+                f"Request to {url} failed: {error}",
+                timed_out=isinstance(error, httpx.TimeoutException)
+            )
+        return backoff_delay(attempt + 1)
+
+    if response.status_code in RETRY_STATUSES and attempt < retries:
+        if response.status_code == 429:
+            log.warning(f"⏳ {urlsplit(url).netloc} rate limited", extra={"retry": attempt + 1})
+        return backoff_delay(attempt + 1, _retry_after(response))
+    return None
+
+
+def _decode(response, url):
+    if response.status_code >= 400:
+        raise SourceRequestError(
+            f"HTTP {response.status_code} for {url}",
+            status_code=response.status_code
+        )
+    try:
+        return response.json()
+    except ValueError as e:
+        raise SourceRequestError(f"Invalid JSON from {url}: {e}")
+
+
+# ==============================
+# 🔹 SOURCE OVERRIDE (record / replay)
+# ==============================
+_source_override = None
+
+
+def set_source_override(fetch):
+    """
+    Route every source request through `fetch(url, params, live)`
+    instead of the response cache (see Pipelines.source_adapter).
+    `live(target=url)` performs the real request, optionally against
+    another URL. Pass None to restore normal fetching.
+    """
+    global _source_override
+    _source_override = fetch
+
+
+# ==============================
+# 🔹 REQUEST OBSERVERS (metrics)
+# ==============================
+_request_observers = []
+
+
+def add_request_observer(fn):
+    """`fn(source, seconds, outcome)` after every get_json call; outcome is ok | error | timeout."""
+    if fn not in _request_observers:
+        _request_observers.append(fn)
+
+
+def _notify(source, seconds, error):
+    if error is None:
+        outcome = "ok"
+    elif getattr(error, "timed_out", False):
+        outcome = "timeout"
+    else:
+        outcome = "error"
+
+    for fn in list(_request_observers):
+        try:
+            fn(source, seconds, outcome)
+        except Exception as e:
+            log.warning(f"⚠️ Request observer failed: {e}")
+
+
+# ==============================
+# 🔹 PUBLIC API
+# ==============================
+def get_json(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT,
+             retries=DEFAULT_RETRIES, cache=None):
+    """
+    GET `url` and return the decoded JSON body.
+    Raises SourceRequestError once all retries are exhausted.
+
+    `cache` names the source (e.g. "wiki_search") whose TTL applies;
+    leave it as None to bypass the response cache.
+    """
+    source = cache or urlsplit(url).netloc
+    start = time.perf_counter()
+    error = None
+    with _request_span(source, url, params) as request_span:
+        try:
+            return _get_json(url, params, headers, timeout, retries, cache)
+        except Exception as e:
+            error = e
+            request_span.set(timed_out=getattr(e, "timed_out", False))
+            raise
+        finally:
+            _notify(source, time.perf_counter() - start, error)
+
+
+async def async_get_json(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT,
+                         retries=DEFAULT_RETRIES, cache=None):
+    """Async counterpart of get_json()."""
+    source = cache or urlsplit(url).netloc
+    start = time.perf_counter()
+    error = None
+    with _request_span(source, url, params) as request_span:
+        try:
+            return await _async_get_json(url, params, headers, timeout, retries, cache)
+        except Exception as e:
+            error = e
+            request_span.set(timed_out=getattr(e, "timed_out", False))
+            raise
+        finally:
+            _notify(source, time.perf_counter() - start, error)
+
+
+def _request_span(source, url, params):
+    public = {k: v for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS}
+    return span(f"source.{source}", kind=SPAN_KIND_CLIENT, url=url,
+                params=json.dumps(public, ensure_ascii=False) if public else None)
+
+
+def _get_json(url, params, headers, timeout, retries, cache):
+    override = _source_override
+    if override is not None:
+        return override(
+            url, params,
+            lambda target=url: _fetch_json(target, params, headers, timeout, retries)
+        )
+
+    response_cache = get_response_cache() if cache else None
+    if response_cache is None:
+        return _fetch_json(url, params, headers, timeout, retries)
+
+    return response_cache.fetch(
+        cache, url, params,
+        lambda: _fetch_json(url, params, headers, timeout, retries)
+    )
+
+
+async def _async_get_json(url, params, headers, timeout, retries, cache):
+    override = _source_override
+    if override is not None:
+        # record / replay adapters are synchronous
+        return await asyncio.to_thread(
+            override, url, params,
+            lambda target=url: _fetch_json(target, params, headers, timeout, retries)
+        )
+
+    response_cache = get_response_cache() if cache else None
+    if response_cache is None:
+        return await _async_fetch_json(url, params, headers, timeout, retries)
+
+    return await response_cache.afetch(
+        cache, url, params,
+        lambda: _async_fetch_json(url, params, headers, timeout, retries),
+        lambda: _fetch_json(url, params, headers, timeout, retries)
+    )
+
+
+def _fetch_json(url, params, headers, timeout, retries):
+    host = urlsplit(url).netloc
+    delay = 0
+
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(delay)
+
+        response = error = None
+        try:
+            with _host_semaphore(host):
+                response = get_client().get(
+                    url, params=params, headers=headers, timeout=timeout
+                )
+        except httpx.HTTPError as e:
+            error = e
+
+        delay = _retry_delay(url, attempt, retries, response, error)
+        if delay is None:
+            return _decode(response, url)
+
+
+async def _async_fetch_json(url, params, headers, timeout, retries):
+    host = urlsplit(url).netloc
+    delay = 0
+
+    for attempt in range(retries + 1):
+        if attempt:
+            await asyncio.sleep(delay)
+
+        response = error = None
+        try:
+            async with _async_host_semaphore(host):
+                response = await get_async_client().get(
+                    url, params=params, headers=headers, timeout=timeout
+                )
+        except httpx.HTTPError as e:
+            error = e
+
+        delay = _retry_delay(url, attempt, retries, response, error)
+        if delay is None:
+            return _decode(response, url)
@@ -0,0 +1,81 @@
+# pipelines/logging_setup.py
+
+"""
+Structured logging for the pipeline stages and services.
+
+LOG_LEVEL    DEBUG | INFO | WARNING | ERROR (default INFO)
+LOG_FORMAT   text | json (default text)
+
+Fields passed with `extra={...}` (query_id, stage, seconds, counts...)
+are appended as key=value in text mode and as JSON keys in json mode.
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+ROOT_LOGGER = "evidence"
+
+# attributes every LogRecord has; anything else came in through `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def _extra_fields(record):
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_FIELDS}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s | %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += "  " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    """Attach one stdout handler to the `evidence` logger (idempotent)."""
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+        _configured = True
+
+
+def get_logger(name):
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -1,16 +1,44 @@
+import threading
+
 import nltk
 
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("nltk")
+
+# download id -> path nltk.data.find() looks it up under
+RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+}
+
+_ready = False
+_setup_lock = threading.Lock()
+
+
+def _installed(path):
+    # find() also looks inside <path>.zip, which is how wordnet / omw ship
+    try:
+        nltk.data.find(path)
+        return True
+    except LookupError:
+        return False
+
+
 def setup_nltk():
-    resources = [
-        "punkt",
-        "punkt_tab",
-        "stopwords",
-        "wordnet",
-        "omw-1.4"
-    ]
-
-    for r in resources:
-        try:
-            nltk.data.find(r)
-        except LookupError:
-            nltk.download(r)
+    """Download missing NLTK resources once per process; cheap afterwards."""
+    global _ready
+    if _ready:
+        return
+
+    with _setup_lock:
+        if _ready:
+            return
+        for name, path in RESOURCES.items():
+            if not _installed(path):
+                log.info(f"⬇️ Downloading NLTK resource: {name}")
+                nltk.download(name, quiet=True)
+        _ready = True
@@ -0,0 +1,314 @@
+# pipelines/response_cache.py
+
+"""
+Response cache for upstream source APIs
+(Wikipedia search / summaries, OpenAlex, Semantic Scholar, GNews).
+
+Entries are keyed by normalized endpoint + params and looked up
+through a list of tiers (in-memory LRU, then SQLite on disk).
+Each source has its own TTL plus a stale-while-revalidate window:
+a stale entry is served immediately and refreshed in the background.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+
+from Pipelines.logging_setup import get_logger
+from Pipelines.tracing import current_span
+
+log = get_logger("response_cache")
+
+
+# ==============================
+# 🔹 CONFIG
+# ==============================
+HOUR = 3600
+DAY = 24 * HOUR
+
+# source -> (fresh TTL, stale-while-revalidate window), in seconds
+SOURCE_TTLS = {
+    "wiki_search": (DAY, 6 * DAY),
+    "wiki_summary": (DAY, 6 * DAY),
+    "openalex": (7 * DAY, 23 * DAY),
+    "semantic_scholar": (7 * DAY, 23 * DAY),
+    "gnews": (2 * HOUR, 10 * HOUR),
+}
+DEFAULT_TTL = (HOUR, HOUR)
+
+# Never part of the cache key (and never written to disk)
+SECRET_PARAMS = {"apikey", "api_key", "key", "token"}
+
+CACHE_TIERS = os.getenv("RESPONSE_CACHE_TIERS", "memory,sqlite")
+CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "outputs/cache/source_responses.sqlite3")
+CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+
+
+def cache_key(url, params=None):
+    """sha256 over scheme://host/path + sorted, non-secret params."""
+    parts = urlsplit(url)
+    endpoint = f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+    items = parse_qsl(parts.query) + [
+        (k, str(v)) for k, v in (params or {}).items() if v is not None
+    ]
+    items = sorted((k, v) for k, v in items if k.lower() not in SECRET_PARAMS)
+
+    raw = endpoint + "?" + "&".join(f"{k}={v}" for k, v in items)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ==============================
+# 🔹 TIERS
+# ==============================
+class MemoryTier:
+    """
+    Thread-safe in-process LRU. Bodies are kept serialized, so every
+    hit decodes a private copy and callers may mutate what they get.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+        if entry is None:
+            return None
+        return entry[0], json.loads(entry[1])
+
+    def set(self, key, source, stored_at, value):
+        body = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._data[key] = (stored_at, body)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class SQLiteTier:
+    """On-disk tier, survives restarts and is shared by worker processes."""
+
+    PRUNE_EVERY = 500
+
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, source TEXT, stored_at REAL, body TEXT)"
+            )
+            self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, key, source, stored_at, value):
+        body = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, source, stored_at, body)
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune()
+
+    def _prune(self):
+        now = time.time()
+        for source, (fresh, stale) in SOURCE_TTLS.items():
+            self._conn.execute(
+                "DELETE FROM responses WHERE source = ? AND stored_at < ?",
+                (source, now - fresh - stale)
+            )
+        # any other source (or none) lives by DEFAULT_TTL
+        known = list(SOURCE_TTLS)
+        self._conn.execute(
+            "DELETE FROM responses WHERE (source IS NULL OR source NOT IN "
+            f"({', '.join('?' * len(known))})) AND stored_at < ?",
+            (*known, now - sum(DEFAULT_TTL))
+        )
+        self._conn.commit()
+
+
+# ==============================
+# 🔹 CACHE
+# ==============================
+MISS = object()
+
+
+class ResponseCache:
+    def __init__(self, tiers, ttls=None):
+        self.tiers = tiers
+        self.ttls = ttls or SOURCE_TTLS
+        self.stats = defaultdict(lambda: defaultdict(int))
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+
+    def _lookup(self, key, source):
+        for i, tier in enumerate(self.tiers):
+            try:
+                entry = tier.get(key)
+            except Exception as e:
+                log.warning(f"⚠️ Cache tier {type(tier).__name__} read failed: {e}")
+                continue
+            if entry is not None:
+                # promote into the faster tiers
+                for upper in self.tiers[:i]:
+                    upper.set(key, source, *entry)
+                return entry
+        return None
+
+    def _store(self, key, source, value):
+        stored_at = time.time()
+        for tier in self.tiers:
+            try:
+                tier.set(key, source, stored_at, value)
+            except Exception as e:
+                log.warning(f"⚠️ Cache tier {type(tier).__name__} write failed: {e}")
+
+    def _count(self, source, event):
+        with self._lock:
+            self.stats[source][event] += 1
+
+    def _state(self, source, entry):
+        """'fresh' | 'stale' | 'expired' for a cached entry."""
+        fresh, stale = self.ttls.get(source, DEFAULT_TTL)
+        age = time.time() - entry[0]
+        if age <= fresh:
+            return "fresh"
+        if age <= fresh + stale:
+            return "stale"
+        return "expired"
+
+    def _revalidate(self, source, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, source, loader())
+                self._count(source, "refreshes")
+            except Exception as e:
+                self._count(source, "refresh_errors")
+                log.warning(f"⚠️ Background refresh failed for {source}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
+
+    def _cached(self, source, key, refresh_loader):
+        """Serve a fresh or stale entry (stale ones refresh in the background); MISS otherwise."""
+        entry = self._lookup(key, source)
+
+        if entry is not None:
+            state = self._state(source, entry)
+            current_span().set(cache=state)
+            if state == "fresh":
+                self._count(source, "hits")
+                return entry[1]
+            if state == "stale":
+                self._count(source, "stale_hits")
+                self._revalidate(source, key, refresh_loader)
+                return entry[1]
+
+        self._count(source, "misses")
+        current_span().set(cache="miss")
+        return MISS
+
+    def fetch(self, source, url, params, loader):
+        """
+        Return the cached response for (url, params), calling `loader()`
+        on a miss. `loader` must raise on failure; errors are never cached.
+        """
+        key = cache_key(url, params)
+        value = self._cached(source, key, loader)
+        if value is MISS:
+            value = loader()
+            self._store(key, source, value)
+        return value
+
+    async def afetch(self, source, url, params, loader, refresh_loader):
+        """
+        Async counterpart of fetch(): `loader` is a coroutine function,
+        `refresh_loader` a sync callable for the background revalidation.
+        """
+        key = cache_key(url, params)
+        value = self._cached(source, key, refresh_loader)
+        if value is MISS:
+            value = await loader()
+            self._store(key, source, value)
+        return value
+
+    def snapshot(self):
+        """Per-source counters plus hit ratio."""
+        with self._lock:
+            report = {}
+            for source, counters in self.stats.items():
+                served = counters["hits"] + counters["stale_hits"]
+                total = served + counters["misses"]
+                report[source] = dict(counters, hit_ratio=served / total if total else 0.0)
+            return report
+
+
+# ==============================
+# 🔹 PROCESS-WIDE INSTANCE
+# ==============================
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _build_tiers(spec):
+    tiers = []
+    for name in (t.strip() for t in spec.split(",")):
+        if name == "memory":
+            tiers.append(MemoryTier())
+        elif name == "sqlite":
+            try:
+                tiers.append(SQLiteTier())
+            except sqlite3.Error as e:
+                log.warning(f"⚠️ SQLite response cache unavailable: {e}")
+        elif name:
+            log.warning(f"⚠️ Unknown response cache tier '{name}' ignored")
+    return tiers
+
+
+def get_response_cache():
+    """Shared cache, or None when RESPONSE_CACHE_TIERS is empty."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                tiers = _build_tiers(CACHE_TIERS)
+                _cache = ResponseCache(tiers) if tiers else False
+    return _cache or None
+
+
+def cache_stats():
+    cache = get_response_cache()
+    return cache.snapshot() if cache else {}
@@ -1,13 +1,17 @@
-import os
-import json
 import nltk
 
+from Pipelines.artifact_store import write_artifact
+from Pipelines.nltk_setup import setup_nltk
+
 
 def setup_sentence_tokenizer():
-    nltk.download("punkt", quiet=True)
+    setup_nltk()
 
 
 def split_documents_into_sentences(documents):
+    # sent_tokenize needs punkt; a no-op once the resources are in place
+    setup_sentence_tokenizer()
+
     sentences = []
 
     for doc in documents:
@@ -39,15 +43,9 @@ def split_documents_into_sentences(documents):
 
 
 def save_sentences_to_json(sentences, query_id):
-    os.makedirs("outputs/sentences", exist_ok=True)
-
-    path = f"outputs/sentences/sentences_{query_id}.json"
-
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({
-            "query_id": query_id,
-            "total_sentences": len(sentences),
-            "sentences": sentences
-        }, f, indent=2, ensure_ascii=False)
-
-    print(f"💾 Sentences saved to: {path}")
+    # name kept for callers; the format follows ARTIFACT_FORMAT
+    write_artifact("sentences", "sentences", query_id, {
+        "query_id": query_id,
+        "total_sentences": len(sentences),
+        "sentences": sentences
+    }, table_key="sentences")
@@ -0,0 +1,330 @@
+# pipelines/source_adapter.py
+
+"""
+Record / replay adapter for the upstream source APIs
+(Wikipedia, OpenAlex, Semantic Scholar, GNews).
+
+SOURCE_MODE:
+- live    normal network requests (default)
+- record  live requests, every response written to the store
+- replay  answered from the store, with optional synthetic latency
+          and error / timeout injection; no network
+- remote  requests sent to a stand-in server (`serve` below)
+
+The store is SQLite with zlib-compressed JSON bodies, keyed by
+response_cache.cache_key (API keys are never part of it). In every
+mode but live the response cache is bypassed, so each request reaches
+upstream, the store or the stand-in server.
+
+    python -m Pipelines.source_adapter serve --store PATH --port 8765
+    python -m Pipelines.source_adapter info --store PATH
+"""
+
+import os
+import json
+import time
+import zlib
+import random
+import sqlite3
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from Pipelines.http_client import DEFAULT_TIMEOUT, SourceRequestError, set_source_override
+from Pipelines.response_cache import SECRET_PARAMS, cache_key
+from Pipelines.tracing import current_span
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("source_adapter")
+
+
+# ==============================
+# 🔹 CONFIG
+# ==============================
+SOURCE_MODES = ("live", "record", "replay", "remote")
+
+SOURCE_MODE = os.getenv("SOURCE_MODE", "live")
+SOURCE_STORE_PATH = os.getenv("SOURCE_STORE_PATH", "outputs/source_store/responses.sqlite3")
+SOURCE_SERVER_URL = os.getenv("SOURCE_SERVER_URL", "http://127.0.0.1:8765")
+
+# Synthetic upstream behaviour in replay / serve
+REPLAY_LATENCY_MS = float(os.getenv("REPLAY_LATENCY_MS", "0"))
+REPLAY_JITTER_MS = float(os.getenv("REPLAY_JITTER_MS", "0"))
+REPLAY_ERROR_RATE = float(os.getenv("REPLAY_ERROR_RATE", "0"))
+REPLAY_TIMEOUT_RATE = float(os.getenv("REPLAY_TIMEOUT_RATE", "0"))
+REPLAY_TIMEOUT_S = float(os.getenv("REPLAY_TIMEOUT_S", str(DEFAULT_TIMEOUT)))
+REPLAY_SEED = os.getenv("REPLAY_SEED")
+
+
+# ==============================
+# 🔹 STORE
+# ==============================
+class SourceStore:
+    """Recorded responses; safe to share between threads and processes."""
+
+    def __init__(self, path=SOURCE_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, params TEXT, recorded_at REAL, body BLOB)"
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def lookup(self, url, params):
+        return self.get(cache_key(url, params))
+
+    def put(self, url, params, data):
+        public_params = {
+            k: v for k, v in (params or {}).items()
+            if k.lower() not in SECRET_PARAMS
+        }
+        body = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (cache_key(url, params), url, json.dumps(public_params), time.time(), body)
+            )
+            self._conn.commit()
+
+    def close(self):
+        """Fold the WAL back into the database file and close it."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
+
+    def hosts(self):
+        with self._lock:
+            urls = [row[0] for row in self._conn.execute("SELECT url FROM responses")]
+        return Counter(urlsplit(url).netloc for url in urls)
+
+
+# ==============================
+# 🔹 FAULT INJECTION
+# ==============================
+class Faults:
+    """Synthetic latency plus a share of failed / timed-out requests."""
+
+    def __init__(self, latency_ms=REPLAY_LATENCY_MS, jitter_ms=REPLAY_JITTER_MS,
+                 error_rate=REPLAY_ERROR_RATE, timeout_rate=REPLAY_TIMEOUT_RATE,
+                 timeout_s=REPLAY_TIMEOUT_S, seed=REPLAY_SEED):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_s = timeout_s
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Sleep the synthetic latency; returns None, "error" or "timeout"."""
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            roll = self._random.random()
+
+        delay = max(self.latency_ms + jitter, 0) / 1000
+        if delay:
+            time.sleep(delay)
+
+        if roll < self.timeout_rate:
+            time.sleep(self.timeout_s)
+            return "timeout"
+        if roll < self.timeout_rate + self.error_rate:
+            return "error"
+        return None
+
+    def describe(self):
+        return (f"latency {self.latency_ms:.0f}±{self.jitter_ms:.0f} ms, "
+                f"errors {self.error_rate:.0%}, timeouts {self.timeout_rate:.0%}")
+
+
+# ==============================
+# 🔹 ADAPTER (http_client source override)
+# ==============================
+def remote_url(server_url, url):
+    """https://host/path?q → <server>/host/path?q"""
+    parts = urlsplit(url)
+    target = f"{server_url.rstrip('/')}/{parts.netloc}{parts.path}"
+    return target + (f"?{parts.query}" if parts.query else "")
+
+
+class SourceAdapter:
+    def __init__(self, mode, store=None, faults=None, server_url=SOURCE_SERVER_URL):
+        if mode not in SOURCE_MODES:
+            raise ValueError(f"Unknown source mode '{mode}' (use one of {list(SOURCE_MODES)})")
+        self.mode = mode
+        self.store = store
+        self.faults = faults or Faults(0, 0, 0, 0)
+        self.server_url = server_url
+        self.stats = Counter()
+
+    def fetch(self, url, params, live):
+        current_span().set(source_mode=self.mode)
+        if self.mode == "record":
+            data = live()
+            self.store.put(url, params, data)
+            self.stats["recorded"] += 1
+            return data
+
+        if self.mode == "remote":
+            return live(remote_url(self.server_url, url))
+
+        # replay: retries are not simulated, an injected failure is final
+        outcome = self.faults.draw()
+        if outcome == "timeout":
+            self.stats["injected_timeouts"] += 1
+            raise SourceRequestError(f"Request to {url} failed: timed out (injected)", timed_out=True)
+        if outcome == "error":
+            self.stats["injected_errors"] += 1
+            raise SourceRequestError(f"HTTP 503 for {url} (injected)", status_code=503)
+
+        data = self.store.lookup(url, params)
+        if data is None:
+            self.stats["misses"] += 1
+            raise SourceRequestError(f"No recorded response for {url}", status_code=404)
+        self.stats["hits"] += 1
+        return data
+
+
+_adapter = None
+
+
+def install(mode=SOURCE_MODE, store_path=SOURCE_STORE_PATH, faults=None, store=None):
+    """
+    Route the source pipelines through `mode`; "live" removes the adapter.
+    `store` replaces the SourceStore at `store_path` (anything with
+    lookup(url, params) / put(url, params, data), e.g. a synthetic upstream).
+    """
+    global _adapter
+    if mode == "live":
+        if _adapter is not None:
+            set_source_override(None)
+            _adapter = None
+        return None
+
+    if store is None and mode in ("record", "replay"):
+        store = SourceStore(store_path)
+    if mode == "replay" and faults is None:
+        faults = Faults()
+
+    _adapter = SourceAdapter(mode, store, faults)
+    set_source_override(_adapter.fetch)
+
+    if mode == "remote":
+        log.info(f"🎞 Source adapter: remote → {_adapter.server_url}")
+    elif mode == "replay":
+        recorded = f"{len(store)} responses, " if isinstance(store, SourceStore) else ""
+        log.info(f"🎞 Source adapter: replay {store.path} ({recorded}{_adapter.faults.describe()})")
+    else:
+        log.info(f"🎞 Source adapter: {mode} → {store.path}")
+    return _adapter
+
+
+def get_adapter():
+    return _adapter
+
+
+# ==============================
+# 🔹 STAND-IN SERVER
+# ==============================
+def make_handler(store, faults):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        """GET /<host>/<path>?<query> → recorded response for https://<host>/<path>"""
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            host, _, path = parts.path.lstrip("/").partition("/")
+            url = f"https://{host}/{unquote(path)}"
+            params = dict(parse_qsl(parts.query, keep_blank_values=True))
+
+            outcome = faults.draw()
+            if outcome == "timeout":
+                # the client gave up long ago; just drop the connection
+                self.close_connection = True
+                return
+            if outcome == "error":
+                return self._send(503, {"error": "injected upstream error"})
+
+            data = store.lookup(url, params)
+            if data is None:
+                return self._send(404, {"error": f"no recorded response for {url}"})
+            self._send(200, data)
+
+        def _send(self, status, data):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def serve(store, faults, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), make_handler(store, faults))
+    print(f"🎞 Serving {len(store)} recorded responses on http://{host}:{port} ({faults.describe()})")
+    print(f"   point the app at it with SOURCE_MODE=remote SOURCE_SERVER_URL=http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recorded source responses")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="serve the store as a stand-in upstream")
+    serve_parser.add_argument("--store", default=SOURCE_STORE_PATH)
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency-ms", type=float, default=REPLAY_LATENCY_MS)
+    serve_parser.add_argument("--jitter-ms", type=float, default=REPLAY_JITTER_MS)
+    serve_parser.add_argument("--error-rate", type=float, default=REPLAY_ERROR_RATE)
+    serve_parser.add_argument("--timeout-rate", type=float, default=REPLAY_TIMEOUT_RATE)
+    serve_parser.add_argument("--seed", default=REPLAY_SEED)
+
+    info_parser = sub.add_parser("info", help="recorded responses per host")
+    info_parser.add_argument("--store", default=SOURCE_STORE_PATH)
+
+    args = parser.parse_args()
+    store = SourceStore(args.store)
+
+    if args.command == "info":
+        print(f"📦 {len(store)} recorded responses in {args.store}")
+        for host, count in store.hosts().most_common():
+            print(f"   {host:<35}{count:>6}")
+        return
+
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate,
+                    args.timeout_rate, REPLAY_TIMEOUT_S, args.seed)
+    serve(store, faults, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+# pipelines/tracing.py
+
+"""
+Lightweight tracing for the verification and chat pipelines.
+
+Spans are exported as OTLP/JSON (`resourceSpans` documents):
+- TRACE_EXPORTER=file  one document per line in TRACE_FILE
+- TRACE_EXPORTER=otlp  POSTed to TRACE_OTLP_ENDPOINT (any OTLP/HTTP
+                       collector, or the stand-in below)
+
+Traces start only at explicit roots (verify_claim_pipeline,
+answer_user_question); spans opened elsewhere without a current span
+are no-ops, so batch jobs and warmups produce nothing. Worker threads
+see the caller's span only through propagate().
+
+    python -m Pipelines.tracing collect --port 4318 --out PATH
+    python -m Pipelines.tracing report --file PATH --top 5
+"""
+
+import os
+import json
+import atexit
+import time
+import queue
+import random
+import argparse
+import threading
+import contextvars
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("tracing")
+
+
+# ==============================
+# 🔹 CONFIG
+# ==============================
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")          # file | otlp
+TRACE_FILE = os.getenv("TRACE_FILE", "outputs/traces/spans.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "evidence-retrieval")
+
+EXPORT_BATCH_SIZE = 256
+EXPORT_INTERVAL_S = 2.0
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+
+# ==============================
+# 🔹 SPANS
+# ==============================
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind",
+                 "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name, trace_id, parent_id=None, kind=SPAN_KIND_INTERNAL, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current = contextvars.ContextVar("current_span", default=NOOP_SPAN)
+
+
+def current_span():
+    return _current.get()
+
+
+@contextmanager
+def span(name, root=False, kind=SPAN_KIND_INTERNAL, **attributes):
+    """
+    Child of the current span, or a new trace when `root` is set.
+    Yields the span (or a no-op span) so attributes can be added.
+    """
+    parent = _current.get()
+    if parent is NOOP_SPAN:
+        if not root or not TRACING_ENABLED or random.random() >= TRACE_SAMPLE_RATE:
+            yield NOOP_SPAN
+            return
+        new = Span(name, f"{random.getrandbits(128):032x}", kind=kind, attributes=attributes)
+    else:
+        new = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+    token = _current.set(new)
+    try:
+        yield new
+    except BaseException as e:
+        new.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        new.end_ns = time.time_ns()
+        _export(new)
+
+
+@contextmanager
+def use_span(parent):
+    """Make `parent` (a span captured on another thread) the current span."""
+    token = _current.set(parent if parent is not None else NOOP_SPAN)
+    try:
+        yield parent
+    finally:
+        _current.reset(token)
+
+
+def propagate(fn):
+    """`fn` bound to the caller's current span, for thread pools / executors."""
+    parent = _current.get()
+    if parent is NOOP_SPAN:
+        return fn
+
+    def run(*args, **kwargs):
+        with use_span(parent):
+            return fn(*args, **kwargs)
+    return run
+
+
+def record_span(name, parent, start_ns, end_ns, **attributes):
+    """A finished child span of `parent` with explicit timing (work done elsewhere)."""
+    if parent is NOOP_SPAN or parent is None:
+        return
+    done = Span(name, parent.trace_id, parent.span_id, attributes=attributes)
+    done.start_ns = start_ns
+    done.end_ns = end_ns
+    _export(done)
+
+
+# ==============================
+# 🔹 OTLP/JSON ENCODING
+# ==============================
+def _value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes):
+    return [{"key": k, "value": _value(v)} for k, v in attributes.items() if v is not None]
+
+
+def encode_spans(spans):
+    """One OTLP/JSON ExportTraceServiceRequest document."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": TRACE_SERVICE_NAME})},
+            "scopeSpans": [{
+                "scope": {"name": "evidence"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                        "name": s.name,
+                        "kind": s.kind,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": _attributes(s.attributes),
+                        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+# ==============================
+# 🔹 EXPORT (background thread)
+# ==============================
+_queue = queue.Queue(maxsize=10000)
+_exporter_thread = None
+_exporter_lock = threading.Lock()
+
+
+def _export(finished):
+    global _exporter_thread
+    if _exporter_thread is None:
+        with _exporter_lock:
+            if _exporter_thread is None:
+                _exporter_thread = threading.Thread(target=_export_loop, name="trace-export", daemon=True)
+                _exporter_thread.start()
+                atexit.register(flush)
+    try:
+        _queue.put_nowait(finished)
+    except queue.Full:
+        pass        # tracing must never slow the pipeline down
+
+
+def _write(document):
+    if TRACE_EXPORTER == "otlp":
+        request = urllib.request.Request(
+            TRACE_OTLP_ENDPOINT,
+            data=json.dumps(document).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+    else:
+        os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(document) + "\n")
+
+
+def _export_loop():
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + EXPORT_INTERVAL_S
+        while len(batch) < EXPORT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _write(encode_spans(batch))
+        except Exception as e:
+            log.warning(f"⚠️ Trace export failed ({len(batch)} spans dropped): {e}")
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def flush(timeout=5.0):
+    """Wait until queued spans are exported (runs at interpreter exit)."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+# ==============================
+# 🔹 COLLECTOR STAND-IN + REPORT
+# ==============================
+def make_collector_handler(out_path):
+    lock = threading.Lock()
+
+    class CollectorHandler(BaseHTTPRequestHandler):
+        """OTLP/HTTP JSON receiver: POST /v1/traces, appended to `out_path`."""
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/traces":
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                document = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+
+            with lock, open(out_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(document) + "\n")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    return CollectorHandler
+
+
+def load_spans(path):
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    spans.extend(scope.get("spans", []))
+    return spans
+
+
+def _duration_ms(s):
+    return (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+
+
+def _attribute_text(s):
+    values = []
+    for a in s.get("attributes", []):
+        value = next(iter(a["value"].values()))
+        values.append(f"{a['key']}={value}")
+    return " ".join(values)
+
+
+def print_trace(trace_spans):
+    children = {}
+    for s in trace_spans:
+        children.setdefault(s.get("parentSpanId"), []).append(s)
+    ids = {s["spanId"] for s in trace_spans}
+
+    def walk(s, depth, t0):
+        offset = (int(s["startTimeUnixNano"]) - t0) / 1e6
+        error = " ❌" if s.get("status", {}).get("code") == 2 else ""
+        print(f"   {'  ' * depth}{s['name']:<{40 - 2 * depth}} +{offset:>8.1f} ms "
+              f"{_duration_ms(s):>9.1f} ms{error}  {_attribute_text(s)}")
+        for child in sorted(children.get(s["spanId"], []), key=lambda c: int(c["startTimeUnixNano"])):
+            walk(child, depth + 1, t0)
+
+    roots = [s for s in trace_spans if s.get("parentSpanId") not in ids]
+    for root in sorted(roots, key=lambda r: int(r["startTimeUnixNano"])):
+        walk(root, 0, int(root["startTimeUnixNano"]))
+
+
+def report(path, top=5, name=None):
+    traces = {}
+    for s in load_spans(path):
+        traces.setdefault(s["traceId"], []).append(s)
+
+    roots = []
+    for trace_id, trace_spans in traces.items():
+        ids = {s["spanId"] for s in trace_spans}
+        for s in trace_spans:
+            if s.get("parentSpanId") not in ids and (name is None or s["name"] == name):
+                roots.append((_duration_ms(s), trace_id, s["name"]))
+
+    if not roots:
+        print("No traces found")
+        return
+
+    durations = sorted(d for d, _, _ in roots)
+    pick = lambda q: durations[min(int(q * len(durations)), len(durations) - 1)]
+    print(f"📈 {len(roots)} traces: p50 {pick(0.5):.0f} ms, p95 {pick(0.95):.0f} ms, "
+          f"p99 {pick(0.99):.0f} ms, max {durations[-1]:.0f} ms")
+
+    for duration, trace_id, root_name in sorted(roots, reverse=True)[:top]:
+        print(f"\n🐢 {root_name} {duration:.0f} ms  trace {trace_id}")
+        print_trace(traces[trace_id])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace collector stand-in and report")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    collect_parser = sub.add_parser("collect", help="receive OTLP/HTTP JSON spans into a file")
+    collect_parser.add_argument("--host", default="127.0.0.1")
+    collect_parser.add_argument("--port", type=int, default=4318)
+    collect_parser.add_argument("--out", default="outputs/traces/collected.jsonl")
+
+    report_parser = sub.add_parser("report", help="slowest traces with their span trees")
+    report_parser.add_argument("--file", default=TRACE_FILE)
+    report_parser.add_argument("--top", type=int, default=5)
+    report_parser.add_argument("--name", help="only traces whose root span has this name")
+
+    args = parser.parse_args()
+    if args.command == "report":
+        report(args.file, args.top, args.name)
+        return
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    server = ThreadingHTTPServer((args.host, args.port), make_collector_handler(args.out))
+    print(f"📡 Collecting spans on http://{args.host}:{args.port}/v1/traces → {args.out}")
+    print(f"   point the app at it with TRACING_ENABLED=1 TRACE_EXPORTER=otlp "
+          f"TRACE_OTLP_ENDPOINT=http://{args.host}:{args.port}/v1/traces")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+
+# =================================================
+# 🔹 TOKENIZER
+# =================================================
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+# =================================================
+# 🔹 SPARSE BM25
+# =================================================
+VARIANTS = {
+    # variant: default parameters (same defaults as rank_bm25)
+    "okapi": {"k1": 1.5, "b": 0.75, "epsilon": 0.25},
+    "bm25l": {"k1": 1.5, "b": 0.75, "delta": 0.5},
+    "bm25plus": {"k1": 1.5, "b": 0.75, "delta": 1.0},
+}
+
+
+class BM25Engine:
+    """
+    BM25 over a CSR document-term matrix.
+
+    Per-(doc, term) weights are precomputed once per corpus state, so
+    scoring any number of queries is one sparse matrix product. Okapi and
+    BM25+ scores match rank_bm25 for the same tokens; BM25L follows
+    Lv & Zhai (2011), where only terms present in a document contribute.
+    Documents can be added incrementally; weights are rebuilt lazily.
+    """
+
+    def __init__(self, variant="okapi", tokenizer=tokenize, **params):
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown BM25 variant '{variant}' (use one of {list(VARIANTS)})")
+
+        self.variant = variant
+        self.params = dict(VARIANTS[variant], **params)
+        self.tokenizer = tokenizer
+
+        self.vocab = {}
+        self.doc_len = []
+        self._rows = []
+        self._cols = []
+        self._counts = []
+
+        self._weights = None    # (n_docs, n_terms) CSR
+        self._base = None       # (n_terms,) score every doc gets per query term
+        self._dirty = True
+
+    @property
+    def n_docs(self):
+        return len(self.doc_len)
+
+    def add_documents(self, texts):
+        for text in texts:
+            doc_id = len(self.doc_len)
+            counts = Counter(self.tokenizer(text))
+
+            for term, count in counts.items():
+                term_id = self.vocab.setdefault(term, len(self.vocab))
+                self._rows.append(doc_id)
+                self._cols.append(term_id)
+                self._counts.append(count)
+
+            self.doc_len.append(sum(counts.values()))
+
+        self._dirty = True
+
+    # ---------------- weights ----------------
+    def _idf(self, df, n_docs):
+        if self.variant == "okapi":
+            idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+            # rank_bm25 floors negative idf at epsilon * mean idf
+            floor = self.params["epsilon"] * idf.mean() if len(idf) else 0.0
+            return np.where(idf < 0, floor, idf)
+        if self.variant == "bm25l":
+            return np.log(n_docs + 1) - np.log(df + 0.5)
+        return np.log((n_docs + 1) / df)
+
+    def _build(self):
+        n_docs, n_terms = self.n_docs, len(self.vocab)
+        k1, b = self.params["k1"], self.params["b"]
+
+        rows = np.asarray(self._rows, dtype=np.int64)
+        cols = np.asarray(self._cols, dtype=np.int64)
+        tf = np.asarray(self._counts, dtype=np.float64)
+
+        doc_len = np.asarray(self.doc_len, dtype=np.float64)
+        avgdl = doc_len.mean() if n_docs and doc_len.mean() > 0 else 1.0
+        length_norm = (1 - b + b * doc_len / avgdl)[rows]
+
+        df = np.bincount(cols, minlength=n_terms).astype(np.float64)
+        idf = self._idf(df, n_docs)
+
+        if self.variant == "okapi":
+            weights = idf[cols] * tf * (k1 + 1) / (tf + k1 * length_norm)
+            base = np.zeros(n_terms)
+        elif self.variant == "bm25l":
+            delta = self.params["delta"]
+            ctd = tf / length_norm
+            weights = idf[cols] * (k1 + 1) * (ctd + delta) / (k1 + ctd + delta)
+            base = np.zeros(n_terms)
+        else:
+            delta = self.params["delta"]
+            base = idf * delta
+            weights = idf[cols] * tf * (k1 + 1) / (k1 * length_norm + tf)
+
+        self._weights = sparse.csr_matrix(
+            (weights, (rows, cols)), shape=(n_docs, n_terms)
+        )
+        self._base = base
+        self._dirty = False
+
+    # ---------------- scoring ----------------
+    def _query_matrix(self, queries):
+        rows, cols, vals = [], [], []
+        for q_idx, query in enumerate(queries):
+            tokens = self.tokenizer(query) if isinstance(query, str) else query
+            for term, count in Counter(tokens).items():
+                term_id = self.vocab.get(term)
+                if term_id is not None:
+                    rows.append(q_idx)
+                    cols.append(term_id)
+                    vals.append(count)
+
+        return sparse.csr_matrix(
+            (vals, (rows, cols)), shape=(len(queries), len(self.vocab)), dtype=np.float64
+        )
+
+    def get_batch_scores(self, queries):
+        """(n_queries, n_docs) score matrix; queries are strings or token lists."""
+        if self._dirty:
+            self._build()
+
+        if self.n_docs == 0:
+            return np.zeros((len(queries), 0))
+
+        q = self._query_matrix(queries)
+        scores = (self._weights @ q.T).T.toarray()
+        scores += (q @ self._base)[:, None]
+        return scores
+
+    def get_scores(self, query):
+        return self.get_batch_scores([query])[0]
@@ -1,27 +1,25 @@
-import json
 import os
-import nltk
-from rank_bm25 import BM25Okapi
 
+from Pipelines.artifact_store import read_artifact, write_artifact
+from Retrieval.bm25_engine import BM25Engine
 
-def load_sentences(query_id):
-    path = f"outputs/sentences/sentences_{query_id}.json"
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data["sentences"]
+
+# okapi | bm25l | bm25plus
+BM25_VARIANT = os.getenv("BM25_VARIANT", "okapi")
 
 
-def tokenize(text):
-    return [t.lower() for t in nltk.word_tokenize(text)]
+def load_sentences(query_id):
+    return read_artifact("sentences", "sentences", query_id)["sentences"]
 
 
-def compute_bm25_scores(query_text, sentences):
-    corpus = [tokenize(s["sentence_text"]) for s in sentences]
-    bm25 = BM25Okapi(corpus)
+def bm25_score_array(query_text, sentences, variant=BM25_VARIANT):
+    """(n,) BM25 scores aligned with `sentences`."""
+    bm25 = BM25Engine(variant)
+    bm25.add_documents(s["sentence_text"] for s in sentences)
+    return bm25.get_scores(query_text)
 
-    query_tokens = tokenize(query_text)
-    scores = bm25.get_scores(query_tokens)
 
+def bm25_results(scores, sentences):
     results = []
     for sent, score in zip(sentences, scores):
         results.append({
@@ -33,19 +31,16 @@ def compute_bm25_scores(query_text, sentences):
     return results
 
 
-def save_bm25_scores(results, query_id):
-    os.makedirs("outputs/bm25", exist_ok=True)
-
-    path = f"outputs/bm25/bm25_scores_{query_id}.json"
+def compute_bm25_scores(query_text, sentences, variant=BM25_VARIANT):
+    return bm25_results(bm25_score_array(query_text, sentences, variant), sentences)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({
-            "query_id": query_id,
-            "total_sentences": len(results),
-            "scores": results
-        }, f, indent=2)
 
-    print(f"💾 BM25 scores saved to: {path}")
+def save_bm25_scores(results, query_id):
+    write_artifact("bm25", "bm25_scores", query_id, {
+        "query_id": query_id,
+        "total_sentences": len(results),
+        "scores": results
+    }, table_key="scores")
 
 
 def run_bm25(query_id, query_text):
@@ -0,0 +1,236 @@
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:     # Windows: single-process append only
+    fcntl = None
+
+
+# =================================================
+# 🔹 CONFIG
+# =================================================
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "outputs/cache/embeddings")
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")   # or float16
+EMBEDDING_LRU_SIZE = int(os.getenv("EMBEDDING_LRU_SIZE", "20000"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+
+KEY_BYTES = 16
+
+
+def embedding_key(text, model_id):
+    """Content address of `text` under `model_id` (16-byte blake2b digest)."""
+    h = hashlib.blake2b(digest_size=KEY_BYTES)
+    h.update(model_id.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.digest()
+
+
+# =================================================
+# 🔹 EMBEDDING STORE
+# =================================================
+class EmbeddingStore:
+    """
+    Sentence embeddings keyed by hash(model_id, text).
+
+    Tier 1: in-memory LRU of float32 vectors.
+    Tier 2: append-only pair of files per model
+            <model>.<dtype>.bin  rows of `dim` values, memory-mapped
+            <model>.keys         16-byte keys, row i <-> key i
+    """
+
+    def __init__(self, model_id, dim, directory=EMBEDDING_CACHE_DIR,
+                 dtype=EMBEDDING_CACHE_DTYPE, lru_size=EMBEDDING_LRU_SIZE):
+        self.model_id = model_id
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.lru_size = lru_size
+        self.row_bytes = dim * self.dtype.itemsize
+
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model_id)
+        self.vec_path = os.path.join(directory, f"{slug}.{dim}.{self.dtype.name}.bin")
+        self.key_path = os.path.join(directory, f"{slug}.{dim}.{self.dtype.name}.keys")
+
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self._rows = {}             # key -> row in the vector file
+        self._keys_read = 0         # bytes of the key file already indexed
+        self._mmap = None
+        self._mapped_rows = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        with self._lock:
+            self._refresh_index()
+
+    # ---------- disk tier ----------
+    def _refresh_index(self):
+        """Pick up rows appended since the last read (also by other processes)."""
+        if not os.path.exists(self.key_path):
+            return
+
+        vec_rows = os.path.getsize(self.vec_path) // self.row_bytes \
+            if os.path.exists(self.vec_path) else 0
+
+        with open(self.key_path, "rb") as f:
+            f.seek(self._keys_read)
+            raw = f.read()
+
+        # only whole keys that have a fully written vector row
+        start_row = self._keys_read // KEY_BYTES
+        n_new = min(len(raw) // KEY_BYTES, vec_rows - start_row)
+        for i in range(max(n_new, 0)):
+            key = raw[i * KEY_BYTES:(i + 1) * KEY_BYTES]
+            self._rows.setdefault(key, start_row + i)
+        self._keys_read += max(n_new, 0) * KEY_BYTES
+
+    def _row_vector(self, row):
+        if row >= self._mapped_rows:
+            n_rows = os.path.getsize(self.vec_path) // self.row_bytes
+            self._mmap = np.memmap(
+                self.vec_path, dtype=self.dtype, mode="r", shape=(n_rows, self.dim)
+            )
+            self._mapped_rows = n_rows
+        return np.asarray(self._mmap[row], dtype=np.float32)
+
+    def _append(self, keys, vectors):
+        data = np.ascontiguousarray(vectors, dtype=self.dtype)
+
+        with open(self.key_path, "ab") as key_file:
+            if fcntl:
+                fcntl.flock(key_file, fcntl.LOCK_EX)
+            try:
+                # vectors first: a crash leaves an orphan row, never a dangling key
+                with open(self.vec_path, "ab") as vec_file:
+                    # realign after an interrupted append (row i <-> key i); keys
+                    # past the last whole row are dropped, never padded with zeros
+                    n_rows = min(
+                        os.fstat(key_file.fileno()).st_size // KEY_BYTES,
+                        os.fstat(vec_file.fileno()).st_size // self.row_bytes,
+                    )
+                    key_file.truncate(n_rows * KEY_BYTES)
+                    vec_file.truncate(n_rows * self.row_bytes)
+                    vec_file.write(data.tobytes())
+                key_file.write(b"".join(keys))
+                key_file.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(key_file, fcntl.LOCK_UN)
+
+        self._refresh_index()
+
+    # ---------- memory tier ----------
+    def _remember(self, key, vector):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _lookup(self, key):
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            return vector
+
+        row = self._rows.get(key)
+        if row is None:
+            return None
+
+        vector = self._row_vector(row)
+        self._remember(key, vector)
+        return vector
+
+    # ---------- public ----------
+    def encode(self, texts, encode_fn):
+        """
+        Return a float32 (len(texts), dim) matrix, calling
+        `encode_fn(list_of_texts)` only for texts not cached yet.
+        """
+        keys = [embedding_key(t, self.model_id) for t in texts]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        pending = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lookup(key)
+                if vector is None:
+                    pending.append(i)
+                else:
+                    out[i] = vector
+
+            if pending:
+                # another worker may have appended these meanwhile
+                self._refresh_index()
+                still_pending = []
+                for i in pending:
+                    vector = self._lookup(keys[i])
+                    if vector is None:
+                        still_pending.append(i)
+                    else:
+                        out[i] = vector
+                pending = still_pending
+
+            self.hits += len(texts) - len(pending)
+            self.misses += len(pending)
+
+        if not pending:
+            return out
+
+        # encode each distinct missing text once
+        first_index = {}
+        for i in pending:
+            first_index.setdefault(keys[i], i)
+        miss_keys = list(first_index)
+
+        vectors = np.asarray(
+            encode_fn([texts[first_index[k]] for k in miss_keys]), dtype=np.float32
+        )
+        # round-trip through the storage dtype so hits and misses match
+        vectors = vectors.astype(self.dtype).astype(np.float32)
+
+        with self._lock:
+            self._append(miss_keys, vectors)
+            encoded = {}
+            for key, vector in zip(miss_keys, vectors):
+                self._remember(key, vector)
+                encoded[key] = vector
+
+        for i in pending:
+            out[i] = encoded[keys[i]]
+
+        return out
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "rows": len(self._rows)}
+
+
+# =================================================
+# 🔹 ONE STORE PER (MODEL, DIM)
+# =================================================
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model_id, dim):
+    key = (model_id, dim)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = EmbeddingStore(model_id, dim)
+            _stores[key] = store
+    return store
+
+
+def embedding_store_stats():
+    """{model_id: hits / misses / rows} over the open stores."""
+    with _stores_lock:
+        stores = list(_stores.items())
+    return {model_id: store.stats() for (model_id, _), store in stores}
@@ -0,0 +1,99 @@
+import os
+import time
+import threading
+
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("encoders")
+
+
+# =================================================
+# 🔹 SHARED SENTENCE ENCODERS (one instance per process)
+# =================================================
+DEFAULT_ENCODER = "all-MiniLM-L6-v2"
+
+_encoders = {}
+_load_seconds = {}
+_load_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _canonical(name):
+    # "sentence-transformers/all-MiniLM-L6-v2" and "all-MiniLM-L6-v2" are the same model
+    prefix = "sentence-transformers/"
+    return name[len(prefix):] if name.startswith(prefix) else name
+
+
+def get_encoder(name=DEFAULT_ENCODER):
+    """
+    Return the process-wide SentenceTransformer for `name`, loading it
+    on first use. Concurrent first callers wait for a single load.
+    """
+    name = _canonical(name)
+
+    encoder = _encoders.get(name)
+    if encoder is not None:
+        return encoder
+
+    with _registry_lock:
+        lock = _load_locks.setdefault(name, threading.Lock())
+
+    with lock:
+        encoder = _encoders.get(name)
+        if encoder is None:
+            from sentence_transformers import SentenceTransformer
+
+            log.info(f"🔄 Loading encoder {name}...")
+            start = time.perf_counter()
+            encoder = SentenceTransformer(name)
+            _load_seconds[name] = time.perf_counter() - start
+            _encoders[name] = encoder
+            log.info(f"✅ Encoder {name} loaded", extra={"seconds": round(_load_seconds[name], 3)})
+
+    return encoder
+
+
+def loaded_encoders():
+    return list(_encoders)
+
+
+def encoder_load_seconds():
+    """{name: seconds} for the encoders currently loaded."""
+    return {name: _load_seconds[name] for name in list(_encoders) if name in _load_seconds}
+
+
+# =================================================
+# 🔹 ACTIVE RETRIEVAL ENCODER (SWAPPABLE)
+# =================================================
+_active_name = _canonical(os.getenv("RETRIEVAL_ENCODER", DEFAULT_ENCODER))
+_swap_lock = threading.Lock()
+
+
+def active_encoder():
+    """(name, encoder) serving retrieval; callers keep the pair per request."""
+    name = _active_name
+    return name, get_encoder(name)
+
+
+def active_encoder_name():
+    return _active_name
+
+
+def swap_encoder(name):
+    """
+    Load + warm up `name`, then make it the retrieval encoder. Requests
+    already holding the previous encoder finish with it; it is dropped
+    from the registry unless something else still asks for it by name
+    (the default encoder is also used for GNews query expansion).
+    """
+    global _active_name
+    name = _canonical(name)
+
+    with _swap_lock:
+        get_encoder(name).encode(["warmup"], normalize_embeddings=True)
+        previous, _active_name = _active_name, name
+
+    if previous != name and previous != DEFAULT_ENCODER:
+        _encoders.pop(previous, None)
+    log.info(f"✅ Retrieval encoder active: {name}")
+    return name
@@ -1,73 +1,125 @@
 import os
-import json
-import faiss
+from typing import NamedTuple, Optional
+
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
+from Pipelines.artifact_store import read_artifact, write_artifact
+from Retrieval.embedding_store import EMBEDDING_CACHE_ENABLED, get_embedding_store
+from Retrieval.encoder_registry import active_encoder
+
+# Candidates returned by the dense retriever
+DENSE_TOP_K = int(os.getenv("DENSE_TOP_K", "50"))
 
-_model = None
+# Pools smaller than this are scored with one NumPy mat-vec instead of FAISS.
+# A claim pulls ~30 documents (a few thousand sentences); only the long-page
+# tail reaches FAISS, which then keeps top-k instead of the full score array.
+FAISS_MIN_POOL = int(os.getenv("FAISS_MIN_POOL", "5000"))
 
 
 def get_model():
-    global _model
-    if _model is None:
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
-    return _model
+    return active_encoder()[1]
+
+
+def encode_sentences(sentence_texts, encoder=None):
+    """
+    Normalized float32 embeddings for `sentence_texts`; only texts
+    missing from the embedding store are sent to the encoder.
+    `encoder` is a (name, model) pair from active_encoder(); pass the
+    same pair to compute_dense_scores so one request never mixes models.
+    """
+    model_name, model = encoder or active_encoder()
+
+    def encode(texts):
+        return model.encode(texts, normalize_embeddings=True)
+
+    if not EMBEDDING_CACHE_ENABLED:
+        return np.array(encode(sentence_texts)).astype("float32")
+
+    store = get_embedding_store(
+        f"{model_name}:normalized", model.get_sentence_embedding_dimension()
+    )
+    return store.encode(sentence_texts, encode)
 
 
 def load_sentences(query_id):
-    path = f"outputs/sentences/sentences_{query_id}.json"
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data["sentences"]
+    return read_artifact("sentences", "sentences", query_id)["sentences"]
+
+
+class DenseScores(NamedTuple):
+    scores: Optional[np.ndarray]    # (n,) raw cosine per sentence; None on the FAISS path
+    top_indices: np.ndarray         # (k,) sentence rows, best first
+    top_scores: np.ndarray          # (k,)
 
 
-def compute_faiss_scores(query_text, sentences):
-    model = get_model()
+def dense_search(query_embedding, embeddings, top_k=DENSE_TOP_K):
+    """
+    Inner-product top-k over `embeddings` (rows are normalized vectors).
+    Small pools: one mat-vec + argpartition, full score array kept.
+    Large pools (>= FAISS_MIN_POOL): FAISS IndexFlatIP, top-k only.
+    """
+    n = len(embeddings)
+    k = min(top_k, n)
+    if k == 0:
+        empty = np.empty(0, dtype=np.float32)
+        return DenseScores(empty, np.empty(0, dtype=np.int64), empty)
 
-    sentence_texts = [s["sentence_text"] for s in sentences]
-    sentence_ids = [s["sentence_id"] for s in sentences]
+    if n < FAISS_MIN_POOL:
+        scores = embeddings @ query_embedding
+        top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return DenseScores(scores, top, scores[top])
 
-    embeddings = model.encode(sentence_texts, normalize_embeddings=True)
-    embeddings = np.array(embeddings).astype("float32")
+    import faiss
 
-    dim = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dim)
+    index = faiss.IndexFlatIP(embeddings.shape[1])
     index.add(embeddings)
+    top_scores, top = index.search(query_embedding[None, :], k)
+    return DenseScores(None, top[0], top_scores[0])
+
+
+def compute_dense_scores(query_text, sentences, embeddings=None, top_k=DENSE_TOP_K,
+                         encoder=None):
+    """
+    `embeddings` may be passed in when the caller already encoded the
+    sentences (rows aligned with `sentences`) and wants to reuse them.
+    """
+    encoder = encoder or active_encoder()
+    model = encoder[1]
+
+    if embeddings is None:
+        embeddings = encode_sentences([s["sentence_text"] for s in sentences], encoder)
 
     query_embedding = model.encode(
         [query_text],
         normalize_embeddings=True
-    ).astype("float32")
+    ).astype("float32")[0]
 
-    scores, indices = index.search(query_embedding, len(sentences))
-    scores = scores[0]
-    indices = indices[0]
+    return dense_search(query_embedding, embeddings, top_k)
 
-    results = []
-    for idx, score in zip(indices, scores):
-        results.append({
+
+def dense_results(dense, sentences):
+    """Score records for the top-k candidates, best first."""
+    return [
+        {
             "query_id": sentences[idx]["query_id"],
-            "sentence_id": sentence_ids[idx],
+            "sentence_id": sentences[idx]["sentence_id"],
             "faiss_score": float(score)
-        })
+        }
+        for idx, score in zip(dense.top_indices, dense.top_scores)
+    ]
 
-    return results
 
+def compute_faiss_scores(query_text, sentences, embeddings=None, top_k=DENSE_TOP_K):
+    dense = compute_dense_scores(query_text, sentences, embeddings, top_k)
+    return dense_results(dense, sentences)
 
-def save_faiss_scores(results, query_id):
-    os.makedirs("outputs/faiss", exist_ok=True)
-
-    path = f"outputs/faiss/faiss_scores_{query_id}.json"
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({
-            "query_id": query_id,
-            "total_sentences": len(results),
-            "scores": results
-        }, f, indent=2)
-
-    print(f"💾 FAISS scores saved to: {path}")
+def save_faiss_scores(results, query_id):
+    write_artifact("faiss", "faiss_scores", query_id, {
+        "query_id": query_id,
+        "total_sentences": len(results),
+        "scores": results
+    }, table_key="scores")
 
 
 def run_faiss(query_id, query_text):
@@ -1,65 +1,198 @@
 import os
-import json
+
 import numpy as np
 
+from Pipelines.artifact_store import read_artifact, write_artifact
+
 
 def load_bm25_scores(query_id):
-    path = f"outputs/bm25/bm25_scores_{query_id}.json"
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data["scores"]
+    return read_artifact("bm25", "bm25_scores", query_id)["scores"]
 
 
 def load_faiss_scores(query_id):
-    path = f"outputs/faiss/faiss_scores_{query_id}.json"
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data["scores"]
+    return read_artifact("faiss", "faiss_scores", query_id)["scores"]
 
 
 def load_sentences(query_id):
-    path = f"outputs/sentences/sentences_{query_id}.json"
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return {s["sentence_id"]: s for s in data["sentences"]}
+    sentences = read_artifact("sentences", "sentences", query_id)["sentences"]
+    return {s["sentence_id"]: s for s in sentences}
+
+
+def load_fused_results(query_id):
+    return read_artifact("fusion", "final_ranked_sentences", query_id)["results"]
 
 
+# weighted (alpha * min-max) | rrf | zscore
+FUSION_STRATEGY = os.getenv("FUSION_STRATEGY", "weighted")
+
+# rank offset for Reciprocal Rank Fusion
+RRF_K = int(os.getenv("FUSION_RRF_K", "60"))
+
+
+# =================================================
+# 🔹 NORMALIZATION
+# =================================================
 def min_max_normalize(values):
-    min_v = min(values)
-    max_v = max(values)
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values
+    min_v, max_v = values.min(), values.max()
     if max_v - min_v == 0:
-        return [0.0 for _ in values]
-    return [(v - min_v) / (max_v - min_v) for v in values]
-
+        return np.zeros_like(values)
+    return (values - min_v) / (max_v - min_v)
 
-def fuse_and_rank(query_id, alpha=0.6, top_k=10):
+
+def z_normalize(values):
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return values
+    std = values.std()
+    if std == 0:
+        return np.zeros_like(values)
+    return (values - values.mean()) / std
+
+
+def reciprocal_ranks(values, mask=None, k=RRF_K):
+    """1 / (k + rank), rank 1 = highest; rows outside `mask` get 0."""
+    values = np.asarray(values, dtype=np.float64)
+    if mask is not None:
+        values = np.where(mask, values, -np.inf)
+
+    order = np.argsort(-values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.arange(1, len(values) + 1)
+
+    rr = 1.0 / (k + ranks)
+    return rr if mask is None else np.where(mask, rr, 0.0)
+
+
+# =================================================
+# 🔹 FUSION STRATEGIES
+# =================================================
+# each takes aligned (n,) arrays; `dense_mask` marks rows the dense
+# retriever actually scored (None = all of them)
+def _weighted(bm25, dense, dense_mask, alpha):
+    return alpha * min_max_normalize(bm25) + (1 - alpha) * min_max_normalize(dense)
+
+
+def _zscore(bm25, dense, dense_mask, alpha):
+    return alpha * z_normalize(bm25) + (1 - alpha) * z_normalize(dense)
+
+
+def _rrf(bm25, dense, dense_mask, alpha):
+    return alpha * reciprocal_ranks(bm25) + (1 - alpha) * reciprocal_ranks(dense, dense_mask)
+
+
+FUSION_STRATEGIES = {
+    "weighted": _weighted,
+    "rrf": _rrf,
+    "zscore": _zscore,
+}
+
+
+def top_k_indices(scores, top_k):
+    """Rows of the `top_k` highest scores, best first (ties by row)."""
+    n = len(scores)
+    k = min(top_k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+    return top[np.lexsort((top, -scores[top]))]
+
+
+# =================================================
+# 🔹 ALIGNMENT
+# =================================================
+def _align_records(records, key, row_of, n, fill):
+    values = np.full(n, fill, dtype=np.float64)
+    mask = np.zeros(n, dtype=bool)
+    for r in records:
+        row = row_of.get(r["sentence_id"])
+        if row is not None:
+            values[row] = r[key]
+            mask[row] = True
+    return values, mask
+
+
+def _dense_array(faiss_scores, row_of, n):
+    """
+    (values, mask) aligned with the sentences. The dense retriever may
+    only return its top-k candidates; sentences outside them score no
+    higher than the weakest candidate.
+    """
+    if hasattr(faiss_scores, "top_indices"):        # faiss_retriever.DenseScores
+        if faiss_scores.scores is not None:
+            return np.asarray(faiss_scores.scores, dtype=np.float64), None
+        top, top_scores = faiss_scores.top_indices, faiss_scores.top_scores
+        floor = float(top_scores.min()) if len(top_scores) else 0.0
+        values = np.full(n, floor, dtype=np.float64)
+        values[top] = top_scores
+        mask = np.zeros(n, dtype=bool)
+        mask[top] = True
+        return values, mask
+
+    if isinstance(faiss_scores, np.ndarray):
+        return faiss_scores.astype(np.float64), None
+
+    floor = min((r["faiss_score"] for r in faiss_scores), default=0.0)
+    values, mask = _align_records(faiss_scores, "faiss_score", row_of, n, floor)
+    return values, (None if mask.all() else mask)
+
+
+# =================================================
+# 🔹 FUSION
+# =================================================
+def fuse_and_rank(query_id, alpha=0.6, top_k=10, strategy=FUSION_STRATEGY):
     bm25_scores = load_bm25_scores(query_id)
     faiss_scores = load_faiss_scores(query_id)
     sentences = load_sentences(query_id)
+    return fuse_scores(query_id, bm25_scores, faiss_scores, sentences,
+                       alpha=alpha, top_k=top_k, strategy=strategy)
 
-    bm25_map = {s["sentence_id"]: s["bm25_score"] for s in bm25_scores}
-    faiss_map = {s["sentence_id"]: s["faiss_score"] for s in faiss_scores}
 
-    sentence_ids = list(bm25_map.keys())
+def fuse_scores(query_id, bm25_scores, faiss_scores, sentences,
+                alpha=0.6, top_k=10, strategy=FUSION_STRATEGY):
+    """
+    Fuse BM25 + dense scores and return the `top_k` ranked records.
 
-    bm25_values = [bm25_map[sid] for sid in sentence_ids]
-    faiss_values = [faiss_map.get(sid, 0.0) for sid in sentence_ids]
+    `sentences` may be the sentence list or a {sentence_id: sentence} map.
+    `bm25_scores` may be an (n,) array aligned with `sentences` or the
+    score records; `faiss_scores` may be a DenseScores, an aligned array
+    or the (top-k) score records. Only the final top_k get records.
+    """
+    if strategy not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy '{strategy}' (use one of {list(FUSION_STRATEGIES)})")
 
-    bm25_norm = min_max_normalize(bm25_values)
-    faiss_norm = min_max_normalize(faiss_values)
+    if isinstance(sentences, dict):
+        sentences = list(sentences.values())
 
-    fused = []
+    n = len(sentences)
+    if n == 0:
+        return []
 
-    for sid, x, y in zip(sentence_ids, bm25_norm, faiss_norm):
-        final_score = alpha * x + (1 - alpha) * y
-        sent = sentences[sid]
+    row_of = None
+    if not isinstance(bm25_scores, np.ndarray) or not hasattr(faiss_scores, "top_indices"):
+        row_of = {s["sentence_id"]: i for i, s in enumerate(sentences)}
 
-        fused.append({
+    if isinstance(bm25_scores, np.ndarray):
+        bm25 = bm25_scores.astype(np.float64)
+    else:
+        bm25, _ = _align_records(bm25_scores, "bm25_score", row_of, n, 0.0)
+
+    dense, dense_mask = _dense_array(faiss_scores, row_of, n)
+
+    fused = FUSION_STRATEGIES[strategy](bm25, dense, dense_mask, alpha)
+
+    results = []
+    for idx in top_k_indices(fused, top_k):
+        sent = sentences[idx]
+        results.append({
             "query_id": query_id,
-            "sentence_id": sid,
-            "final_score": float(final_score),
-            "bm25_score": bm25_map[sid],
-            "faiss_score": faiss_map.get(sid, 0.0),
+            "sentence_id": sent["sentence_id"],
+            "final_score": float(fused[idx]),
+            "bm25_score": float(bm25[idx]),
+            "faiss_score": float(dense[idx]),
             "sentence_text": sent["sentence_text"],
             "doc_id": sent["doc_id"],
             "source": sent["source"],
@@ -67,26 +200,18 @@ def fuse_and_rank(query_id, alpha=0.6, top_k=10):
             "url": sent["url"]
         })
 
-    fused.sort(key=lambda x: x["final_score"], reverse=True)
-    return fused[:top_k]
+    return results
 
 
 def save_fused_results(results, query_id):
-    os.makedirs("outputs/fusion", exist_ok=True)
-
-    path = f"outputs/fusion/final_ranked_sentences_{query_id}.json"
-
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({
-            "query_id": query_id,
-            "total_results": len(results),
-            "results": results
-        }, f, indent=2, ensure_ascii=False)
-
-    print(f"💾 Final ranked evidence saved to: {path}")
+    write_artifact("fusion", "final_ranked_sentences", query_id, {
+        "query_id": query_id,
+        "total_results": len(results),
+        "results": results
+    }, table_key="results")
 
 
-def run_fusion(query_id, alpha=0.6, top_k=10):
-    results = fuse_and_rank(query_id, alpha=alpha, top_k=top_k)
+def run_fusion(query_id, alpha=0.6, top_k=10, strategy=FUSION_STRATEGY):
+    results = fuse_and_rank(query_id, alpha=alpha, top_k=top_k, strategy=strategy)
     save_fused_results(results, query_id)
     return results
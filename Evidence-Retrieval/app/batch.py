@@ -0,0 +1,140 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.claim_cache import verify_with_cache
+from app.pipeline import new_query_id
+from Inference.deberta_nli import NLI_AGGREGATOR, get_nli
+from Inference.nli_aggregation import aggregate
+from Pipelines.nltk_setup import setup_nltk
+from Pipelines.sentence_splitter import split_documents_into_sentences
+from Retrieval.bm25_retriever import bm25_score_array
+from Retrieval.encoder_registry import active_encoder
+from Retrieval.faiss_retriever import compute_dense_scores, encode_sentences
+from Retrieval.fusion_and_ranking import fuse_scores
+
+
+# Claims accepted per /api/verify/batch call
+BATCH_MAX_CLAIMS = int(os.getenv("BATCH_MAX_CLAIMS", "100"))
+
+# Claims verified at once for one /api/verify/batch call
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+EVIDENCE_TOP_K = 5
+
+
+# =================================================
+# 🔹 API BATCH (one pipeline per claim, shared NLI batches)
+# =================================================
+def _verify_one(claim):
+    try:
+        return verify_with_cache(claim)
+    except Exception as e:
+        return {"claim": claim, "error": str(e)}
+
+
+def verify_claims(claims):
+    """
+    Results in input order. Claims run concurrently; their NLI pairs
+    meet in the micro-batching scheduler, and repeats hit the claim cache.
+    """
+    with ThreadPoolExecutor(max_workers=min(BATCH_CONCURRENCY, max(len(claims), 1))) as pool:
+        return list(pool.map(_verify_one, claims))
+
+
+# =================================================
+# 🔹 OFFLINE BATCH (documents fetched elsewhere)
+# =================================================
+def init_worker(num_threads=0):
+    """Process-pool initializer: load everything once per worker."""
+    if num_threads:
+        try:
+            import torch
+            torch.set_num_threads(num_threads)
+        except ImportError:
+            pass
+    setup_nltk()
+    active_encoder()
+    get_nli()
+
+
+def verify_documents_batch(items, top_k=EVIDENCE_TOP_K, aggregator=NLI_AGGREGATOR):
+    """
+    `items` are {"id", "claim", "documents"} with documents already
+    collected. Sentences of every claim are encoded in one call and all
+    (claim, evidence) pairs are scored in one length-sorted NLI batch.
+    Returns one result per item, in order.
+    """
+    encoder = active_encoder()
+    handle = get_nli()
+    nli = handle.model
+
+    # ---------------- split ----------------
+    prepared = []
+    for item in items:
+        query_id = item.get("query_id") or new_query_id()
+        for doc in item["documents"]:
+            doc["query_id"] = query_id
+        prepared.append((query_id, split_documents_into_sentences(item["documents"])))
+
+    # ---------------- encode (one call) ----------------
+    all_texts = [s["sentence_text"] for _, sentences in prepared for s in sentences]
+    all_embeddings = encode_sentences(all_texts, encoder) if all_texts else None
+
+    # ---------------- retrieval + fusion per claim ----------------
+    ranked_per_item = []
+    offset = 0
+    for item, (query_id, sentences) in zip(items, prepared):
+        n = len(sentences)
+        if n == 0:
+            ranked_per_item.append([])
+            continue
+
+        embeddings = all_embeddings[offset:offset + n]
+        offset += n
+
+        bm25 = bm25_score_array(item["claim"], sentences)
+        dense = compute_dense_scores(item["claim"], sentences, embeddings=embeddings, encoder=encoder)
+        ranked_per_item.append(
+            fuse_scores(query_id, bm25, dense, sentences, alpha=0.6, top_k=top_k)
+        )
+
+    # ---------------- NLI (one batch for all claims) ----------------
+    pairs = [
+        (item["claim"], r["sentence_text"])
+        for item, ranked in zip(items, ranked_per_item)
+        for r in ranked
+    ]
+    probs = nli.score_pairs(pairs) if pairs else np.empty((0, len(nli.id2label)))
+
+    results = []
+    offset = 0
+    for item, (query_id, _), ranked in zip(items, prepared, ranked_per_item):
+        rows = probs[offset:offset + len(ranked)]
+        offset += len(ranked)
+
+        label, confidence = aggregate(rows, nli.id2label, aggregator)
+        results.append({
+            "id": item.get("id"),
+            "query_id": query_id,
+            "claim": item["claim"],
+            "label": label,
+            "confidence": confidence,
+            "model_version": handle.version,
+            "evidence": [
+                {
+                    "sentence_id": r["sentence_id"],
+                    "sentence_text": r["sentence_text"],
+                    "document_id": r["doc_id"],
+                    "source": r.get("source"),
+                    "title": r.get("title"),
+                    "url": r.get("url"),
+                    "nli_label": nli.id2label[int(row.argmax())],
+                    "probabilities": nli.label_probabilities(row)
+                }
+                for r, row in zip(ranked, rows)
+            ]
+        })
+
+    return results
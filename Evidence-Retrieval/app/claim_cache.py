@@ -0,0 +1,274 @@
+import os
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+from app.pipeline import verify_claim_pipeline
+from app.explainability_chatbot import pin_index, unpin_index
+from Retrieval.encoder_registry import active_encoder
+
+
+# -----------------------------------------------------
+# Config
+# -----------------------------------------------------
+CLAIM_CACHE_ENABLED = os.getenv("CLAIM_CACHE_ENABLED", "1") == "1"
+CLAIM_CACHE_MAX_ENTRIES = int(os.getenv("CLAIM_CACHE_MAX_ENTRIES", "2048"))
+CLAIM_CACHE_TTL_SECONDS = int(os.getenv("CLAIM_CACHE_TTL_SECONDS", "1800"))
+
+# Semantic level: reuse a result when cosine(claim, cached claim) >= this
+CLAIM_CACHE_SEMANTIC = os.getenv("CLAIM_CACHE_SEMANTIC", "1") == "1"
+CLAIM_CACHE_SIMILARITY = float(os.getenv("CLAIM_CACHE_SIMILARITY", "0.95"))
+
+# "X is true" / "X is not true" embed close together; never match across them
+NEGATIONS = {"no", "not", "never", "none", "nobody", "nothing", "neither", "nor", "without"}
+
+# nor across numbers / years ("won in 2022" vs "won in 2018")
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Words a rewording may add, drop or move without changing the claim.
+# Everything else (names, verbs, adjectives, "before" / "after") must
+# match: "won" / "lost" or "increased" / "decreased" embed as near-duplicates.
+FUNCTION_WORDS = {
+    "a", "an", "the", "in", "on", "at", "of", "for", "to", "from", "by", "with",
+    "as", "and", "or", "that", "which", "who", "it", "its", "this", "these",
+    "those", "there", "is", "was", "are", "were", "be", "been", "being",
+    "has", "have", "had", "does", "did", "do", "also", "s",
+}
+
+
+def normalize_claim(text):
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = text.replace("n't", " not")
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" .!?")
+
+
+def claim_signature(claim):
+    """
+    What two claims must share for a semantic hit: negations, numbers
+    and every content word. Cosine alone scores claims that differ in
+    one of these (a year, a name, an antonym) as near-duplicates, so
+    the semantic level only absorbs rewordings in function words,
+    word order, case and punctuation.
+    """
+    normalized = normalize_claim(claim)
+    words = {w for w in re.findall(r"\w+", normalized) if not any(c.isdigit() for c in w)}
+    return (
+        frozenset(words & NEGATIONS),
+        frozenset(NUMBER_PATTERN.findall(normalized)),
+        frozenset(words - NEGATIONS - FUNCTION_WORDS),
+    )
+
+
+# -----------------------------------------------------
+# Cache
+# -----------------------------------------------------
+class ClaimResultCache:
+    """
+    Verification results keyed by normalized claim (LRU + TTL).
+
+    Exact level: dict lookup on the normalized text.
+    Semantic level: one mat-vec over the cached claim embeddings
+    (normalized, so dot = cosine), kept as a matrix rebuilt on change.
+    """
+
+    def __init__(self, max_entries=CLAIM_CACHE_MAX_ENTRIES, ttl=CLAIM_CACHE_TTL_SECONDS,
+                 similarity=CLAIM_CACHE_SIMILARITY, pin=None, unpin=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+
+        # pin(query_id) / unpin(query_id): keep the explainability index
+        # of a cached result available for as long as the entry lives
+        self._pin = pin
+        self._unpin = unpin
+
+        self._entries = OrderedDict()   # normalized claim -> entry
+        self._lock = threading.Lock()
+        self._matrix = None             # (n, dim) rows for _matrix_keys
+        self._matrix_keys = []
+        self._dirty = True
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def _expired(self, entry, now):
+        return now - entry["cached_at"] > self.ttl
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        self._dirty = True
+        if entry is not None and self._unpin is not None:
+            self._unpin(entry["result"].get("query_id"))
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+            return entry
+
+    def get_similar(self, vector, encoder_name, signature):
+        """Best cached entry with cosine >= similarity and the same claim_signature, or None."""
+        now = time.time()
+
+        with self._lock:
+            if self._dirty:
+                self._rebuild()
+            if self._matrix is None or self._matrix.shape[1] != len(vector):
+                self.misses += 1
+                return None
+
+            scores = self._matrix @ vector
+            for row in np.argsort(-scores):
+                if scores[row] < self.similarity:
+                    break
+                entry = self._entries.get(self._matrix_keys[row])
+                if entry is None:
+                    continue
+                if self._expired(entry, now):
+                    self._drop(entry["key"])
+                    continue
+                if entry["encoder"] != encoder_name or entry["signature"] != signature:
+                    continue
+
+                self._entries.move_to_end(entry["key"])
+                self.semantic_hits += 1
+                return {**entry, "similarity": float(scores[row])}
+
+            self.misses += 1
+            return None
+
+    def record_miss(self):
+        """A miss decided without get_similar (semantic level off)."""
+        with self._lock:
+            self.misses += 1
+
+    def _rebuild(self):
+        keys = [k for k, e in self._entries.items() if e["vector"] is not None]
+        self._matrix_keys = keys
+        self._matrix = np.vstack([self._entries[k]["vector"] for k in keys]) if keys else None
+        self._dirty = False
+
+    def put(self, key, claim, result, vector=None, encoder_name=None):
+        with self._lock:
+            self._drop(key)
+            if self._pin is not None:
+                self._pin(result.get("query_id"))
+            self._entries[key] = {
+                "key": key,
+                "claim": claim,
+                "result": result,
+                "vector": vector,
+                "encoder": encoder_name,
+                "signature": claim_signature(claim),
+                "cached_at": time.time(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+            self._dirty = True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+            }
+
+
+CLAIM_CACHE = ClaimResultCache(pin=pin_index, unpin=unpin_index)
+
+# one pipeline run per normalized claim at a time; duplicates wait for it
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _cached_response(entry, level, claim):
+    match = {
+        "level": level,
+        "original_claim": entry["claim"],
+        "cached_at": entry["cached_at"],
+    }
+    if "similarity" in entry:
+        match["similarity"] = entry["similarity"]
+    # answer for the claim as submitted, not the cached wording
+    return {**entry["result"], "claim": claim, "cached": True, "cache_match": match}
+
+
+def _encode_claim(key):
+    encoder_name, encoder = active_encoder()
+    vector = encoder.encode([key], normalize_embeddings=True)[0]
+    return np.asarray(vector, dtype=np.float32), encoder_name
+
+
+# -----------------------------------------------------
+# Cached entry point
+# -----------------------------------------------------
+def verify_with_cache(claim, query_id=None, on_stage=None):
+    """
+    verify_claim_pipeline behind the claim cache. Cached responses keep
+    the original query_id (its explainability index is reused), carry
+    the submitted claim and are marked "cached": true with the kind of
+    match.
+    """
+    if not CLAIM_CACHE_ENABLED:
+        return verify_claim_pipeline(claim, query_id=query_id, on_stage=on_stage)
+
+    key = normalize_claim(claim)
+
+    entry = CLAIM_CACHE.get(key)
+    level = "exact"
+    vector = encoder_name = None
+    if entry is None and CLAIM_CACHE_SEMANTIC:
+        vector, encoder_name = _encode_claim(key)
+        entry = CLAIM_CACHE.get_similar(vector, encoder_name, claim_signature(claim))
+        level = "semantic"
+    elif entry is None:
+        CLAIM_CACHE.record_miss()
+
+    if entry is not None:
+        response = _cached_response(entry, level, claim)
+        if on_stage is not None:
+            on_stage("result", response)
+        return response
+
+    with _in_flight_lock:
+        leader = _in_flight.get(key)
+        if leader is None:
+            _in_flight[key] = Future()
+
+    if leader is not None:
+        result = leader.result()
+        if "error" not in result:
+            response = {**result, "claim": claim, "cached": True, "cache_match": {"level": "in_flight"}}
+            if on_stage is not None:
+                on_stage("result", response)
+            return response
+        # the run we waited on failed: try ourselves
+        return verify_claim_pipeline(claim, query_id=query_id, on_stage=on_stage)
+
+    result = None
+    try:
+        result = verify_claim_pipeline(claim, query_id=query_id, on_stage=on_stage)
+        if "error" not in result:
+            CLAIM_CACHE.put(key, claim, result, vector, encoder_name)
+    finally:
+        with _in_flight_lock:
+            future = _in_flight.pop(key)
+        future.set_result(result or {"error": "pipeline failed"})
+
+    return {**result, "cached": False}
@@ -0,0 +1,94 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# -----------------------------------------------------
+# Limits
+# -----------------------------------------------------
+EXPLAIN_CACHE_MAX_ENTRIES = int(os.getenv("EXPLAIN_CACHE_MAX_ENTRIES", "64"))
+EXPLAIN_CACHE_MAX_BYTES = int(os.getenv("EXPLAIN_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+EXPLAIN_CACHE_TTL_SECONDS = int(os.getenv("EXPLAIN_CACHE_TTL_SECONDS", "3600"))
+
+
+def estimate_index_bytes(vectorstore) -> int:
+    """Rough footprint of a LangChain FAISS store: vectors + stored texts."""
+    index = vectorstore.index
+    size = index.ntotal * index.d * 4
+    for doc in getattr(vectorstore.docstore, "_dict", {}).values():
+        size += len(doc.page_content) + 64 * len(doc.metadata)
+    return size
+
+
+class ExplainabilityIndexCache:
+    """
+    In-process LRU of explainability vector stores keyed by query_id.
+
+    Bounded by entry count and estimated bytes; an entry expires after
+    `ttl` seconds without being used.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = EXPLAIN_CACHE_MAX_ENTRIES,
+        max_bytes: int = EXPLAIN_CACHE_MAX_BYTES,
+        ttl: int = EXPLAIN_CACHE_TTL_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # query_id -> [store, size, last_used]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, query_id):
+        _, size, _ = self._entries.pop(query_id)
+        self._bytes -= size
+
+    def _expire(self, now):
+        for query_id in [q for q, (_, _, used) in self._entries.items() if now - used > self.ttl]:
+            self._drop(query_id)
+
+    def get(self, query_id: str):
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(query_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry[2] = now
+            self._entries.move_to_end(query_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, query_id: str, vectorstore):
+        size = estimate_index_bytes(vectorstore)
+        now = time.time()
+        with self._lock:
+            if query_id in self._entries:
+                self._drop(query_id)
+
+            self._entries[query_id] = [vectorstore, size, now]
+            self._bytes += size
+            self._expire(now)
+
+            # evict least recently used, but never the entry just added
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+INDEX_CACHE = ExplainabilityIndexCache()
@@ -1,30 +1,64 @@
 import os
 import json
-import shutil
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+import numpy as np
 from dotenv import load_dotenv
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_groq import ChatGroq
+from Pipelines.artifact_store import read_artifact, submit_task
+from Retrieval.encoder_registry import active_encoder_name
+from Retrieval.fusion_and_ranking import load_fused_results
+from Retrieval.faiss_retriever import encode_sentences
+from app.explainability_cache import INDEX_CACHE
+from app.output_cleanup import QUERY_ID_PATTERN
+from app.pipeline_context import PERSIST_ARTIFACTS, record_stage
+from Pipelines.logging_setup import get_logger
+from Pipelines.tracing import SPAN_KIND_CLIENT, propagate, span
+
+log = get_logger("explainability")
 
 # -----------------------------------------------------
 # Environment
 # -----------------------------------------------------
 load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-if not GROQ_API_KEY:
-    raise RuntimeError("GROQ_API_KEY not found in environment")
+
+def get_groq_api_key():
+    # checked per chat request, so the API can start without it
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise RuntimeError("GROQ_API_KEY not found in environment")
+    return api_key
+
 
 # -----------------------------------------------------
-# Global state (one query at a time)
+# Indexes live in INDEX_CACHE; disk copies are only a fallback
 # -----------------------------------------------------
-ACTIVE_QUERY_ID: Optional[str] = None
 FAISS_BASE_DIR = "outputs/explainability_faiss"
+ENCODER_FILE = "encoder.json"
+
+# -----------------------------------------------------
+# LangChain stack is imported on first use (app start stays fast)
+# -----------------------------------------------------
+_embeddings = {}
+
+
+def get_embeddings(model_name=None):
+    """
+    Normalized, like the retrieval vectors the indexes are built from.
+    Defaults to the active retrieval encoder.
+    """
+    model_name = model_name or active_encoder_name()
+    embeddings = _embeddings.get(model_name)
+    if embeddings is None:
+        from app.explainability_embeddings import SharedEncoderEmbeddings
+        embeddings = SharedEncoderEmbeddings(model_name=model_name, normalize=True)
+        _embeddings[model_name] = embeddings
+    return embeddings
 
 # -----------------------------------------------------
 # System prompt (ASCII only)
@@ -45,67 +79,223 @@ Your role is explanation only.
 """
 
 # -----------------------------------------------------
-# Build FAISS index AFTER NLI
+# Build FAISS index AFTER NLI (from retrieval vectors)
 # -----------------------------------------------------
-def build_explainability_index(query_id: str, top_k: int = 5):
-    global ACTIVE_QUERY_ID
-
-    # Delete old FAISS index if exists
-    if ACTIVE_QUERY_ID:
-        old_path = os.path.join(FAISS_BASE_DIR, ACTIVE_QUERY_ID)
-        if os.path.exists(old_path):
-            shutil.rmtree(old_path)
-
-    ACTIVE_QUERY_ID = query_id
+CHAT_TOP_K = 5
+
+_build_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain-build")
+_pending_builds = {}
+_pending_lock = threading.Lock()
+
+# Index inputs (texts, metadatas, encoder name) of the latest builds.
+# A pinned query (its verdict is in the claim cache) keeps them, so an
+# index evicted from INDEX_CACHE or cleaned off disk is rebuilt on chat.
+RECENT_INDEX_INPUTS = 64
+
+_recent_inputs = OrderedDict()  # query_id -> inputs
+_pinned_inputs = {}             # query_id -> [inputs, pin count]
+_inputs_lock = threading.Lock()
+
+
+def pin_index(query_id: str) -> bool:
+    """Keep `query_id`'s index rebuildable until unpin_index; False if unknown."""
+    with _inputs_lock:
+        pinned = _pinned_inputs.get(query_id)
+        if pinned is not None:
+            pinned[1] += 1
+            return True
+        inputs = _recent_inputs.get(query_id)
+        if inputs is None:
+            return False
+        _pinned_inputs[query_id] = [inputs, 1]
+        return True
+
+
+def unpin_index(query_id: str):
+    with _inputs_lock:
+        pinned = _pinned_inputs.get(query_id)
+        if pinned is None:
+            return
+        pinned[1] -= 1
+        if pinned[1] <= 0:
+            del _pinned_inputs[query_id]
+
+
+def _remember_inputs(query_id, texts, metadatas, encoder_name):
+    with _inputs_lock:
+        _recent_inputs[query_id] = (texts, metadatas, encoder_name)
+        _recent_inputs.move_to_end(query_id)
+        while len(_recent_inputs) > RECENT_INDEX_INPUTS:
+            _recent_inputs.popitem(last=False)
+
+
+def _build_index(query_id: str, texts, vectors, metadatas, encoder_name=None):
+    """`vectors=None` re-embeds `texts` (rebuild of a pinned index)."""
+    from langchain_community.vectorstores import FAISS
+
+    start = time.perf_counter()
+    try:
+        with span("explainability.build", query_id=query_id, sentences=len(texts)):
+            if vectors is None:
+                log.info(f"🔁 Rebuilding explainability index for {query_id}",
+                         extra={"query_id": query_id})
+                vectors = np.asarray(get_embeddings(encoder_name).embed_documents(texts),
+                                     dtype="float32")
+            faiss_index = FAISS.from_embeddings(
+                text_embeddings=list(zip(texts, vectors.tolist())),
+                embedding=get_embeddings(encoder_name),
+                metadatas=metadatas
+            )
+        INDEX_CACHE.put(query_id, faiss_index)
+
+        # disk copy for other workers / after eviction, off the request path
+        if PERSIST_ARTIFACTS:
+            submit_task(lambda: _save_index(query_id, faiss_index, encoder_name))
+        record_stage("explainability", time.perf_counter() - start, query_id)
+        return faiss_index
+    finally:
+        with _pending_lock:
+            _pending_builds.pop(query_id, None)
+
+
+def _save_index(query_id, faiss_index, encoder_name):
+    save_path = os.path.join(FAISS_BASE_DIR, query_id)
+    faiss_index.save_local(save_path)
+    # questions must be embedded with the model that built the index
+    with open(os.path.join(save_path, ENCODER_FILE), "w", encoding="utf-8") as f:
+        json.dump({"encoder": encoder_name or active_encoder_name()}, f)
 
-    os.makedirs(FAISS_BASE_DIR, exist_ok=True)
 
-    fusion_path = f"outputs/fusion/final_ranked_sentences_{query_id}.json"
-    docs_path = f"outputs/documents/documents_{query_id}.json"
+def _saved_encoder_name(faiss_path):
+    try:
+        with open(os.path.join(faiss_path, ENCODER_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)["encoder"]
+    except (OSError, ValueError, KeyError):
+        return None     # saved before the encoder was recorded
 
-    with open(fusion_path, "r", encoding="utf-8") as f:
-        fusion_data = json.load(f)
 
-    with open(docs_path, "r", encoding="utf-8") as f:
-        docs_data = json.load(f)
+def build_explainability_index(
+    query_id: str,
+    top_k: int = 5,
+    sentences: Optional[list] = None,
+    embeddings=None,
+    ranked: Optional[list] = None,
+    encoder_name: Optional[str] = None
+):
+    """
+    Sentence-level index over the documents behind the top_k evidence.
+
+    `sentences` / `embeddings` / `ranked` are the in-memory pipeline
+    outputs (embedding rows aligned with sentences); anything not passed
+    is loaded from outputs/ or the embedding cache. `encoder_name` is
+    the encoder the embeddings came from (default: the active one), so
+    chat questions are embedded with the same model. The FAISS store
+    itself is assembled in the background; the first chat for the query
+    waits for it if needed.
+    """
+    if ranked is None:
+        ranked = load_fused_results(query_id)
+
+    if sentences is None:
+        sentences = read_artifact("sentences", "sentences", query_id)["sentences"]
+        embeddings = None
+
+    if embeddings is None:
+        embeddings = encode_sentences([s["sentence_text"] for s in sentences])
+        encoder_name = None
+    encoder_name = encoder_name or active_encoder_name()
 
     top_doc_ids = []
-    for s in fusion_data["results"][:top_k]:
+    for s in ranked[:top_k]:
         doc_id = s.get("doc_id")
         if doc_id and doc_id not in top_doc_ids:
             top_doc_ids.append(doc_id)
 
-    texts = []
-    metadatas = []
+    rows = [i for i, s in enumerate(sentences) if s["doc_id"] in top_doc_ids]
+    if not rows:
+        return
 
-    for doc in docs_data["documents"]:
-        if doc["doc_id"] in top_doc_ids:
-            texts.append(doc["text"])
-            metadatas.append({
-                "doc_id": doc["doc_id"],
-                "source": doc.get("source"),
-                "title": doc.get("title"),
-                "url": doc.get("url")
-            })
+    texts = [sentences[i]["sentence_text"] for i in rows]
+    metadatas = [
+        {
+            "doc_id": sentences[i]["doc_id"],
+            "sentence_id": sentences[i]["sentence_id"],
+            "source": sentences[i].get("source"),
+            "title": sentences[i].get("title"),
+            "url": sentences[i].get("url")
+        }
+        for i in rows
+    ]
+
+    _remember_inputs(query_id, texts, metadatas, encoder_name)
+    with _pending_lock:
+        _pending_builds[query_id] = _build_executor.submit(
+            propagate(_build_index), query_id, texts, embeddings[rows], metadatas, encoder_name
+        )
 
-    if not texts:
-        return
 
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+def get_explainability_index(query_id: str):
+    """
+    Cached index for `query_id`, falling back to the on-disk copy and
+    then, for pinned queries, to a rebuild from the kept inputs.
+    """
+    vectorstore = INDEX_CACHE.get(query_id)
+    if vectorstore is not None:
+        return vectorstore
+
+    with _pending_lock:
+        pending = _pending_builds.get(query_id)
+    if pending is not None:
+        try:
+            return pending.result()
+        except Exception as e:
+            log.warning(f"⚠️ Explainability index build failed for {query_id}: {e}")
+
+    vectorstore = _load_saved_index(query_id)
+    if vectorstore is not None:
+        return vectorstore
+
+    with _inputs_lock:
+        pinned = _pinned_inputs.get(query_id)
+    if pinned is None:
+        return None
+    texts, metadatas, encoder_name = pinned[0]
+
+    # concurrent chats on the same query share one rebuild
+    with _pending_lock:
+        pending = _pending_builds.get(query_id)
+        if pending is None:
+            pending = _pending_builds[query_id] = _build_executor.submit(
+                propagate(_build_index), query_id, texts, None, metadatas, encoder_name
+            )
+    try:
+        return pending.result()
+    except Exception as e:
+        log.warning(f"⚠️ Explainability index rebuild failed for {query_id}: {e}")
+        return None
+
+
+def _load_saved_index(query_id):
+    # query_id comes from the client; only well-formed ids touch the disk
+    if not QUERY_ID_PATTERN.fullmatch(query_id):
+        return None
 
-    faiss_index = FAISS.from_texts(
-        texts=texts,
-        embedding=embeddings,
-        metadatas=metadatas
-    )
+    faiss_path = os.path.join(FAISS_BASE_DIR, query_id)
+    if not os.path.exists(faiss_path):
+        return None
 
-    save_path = os.path.join(FAISS_BASE_DIR, query_id)
-    faiss_index.save_local(save_path)
+    from langchain_community.vectorstores import FAISS
+
+    vectorstore = FAISS.load_local(
+        faiss_path,
+        get_embeddings(_saved_encoder_name(faiss_path)),
+        allow_dangerous_deserialization=True
+    )
+    INDEX_CACHE.put(query_id, vectorstore)
+    return vectorstore
 
 # -----------------------------------------------------
-# Chatbot query (loads FAISS from disk)
+# Chatbot query (in-memory index, disk fallback)
 # -----------------------------------------------------
 def answer_user_question(
     query_id: str,
@@ -113,25 +303,28 @@ def answer_user_question(
     final_label: str,
     confidence: float
 ):
-    if query_id != ACTIVE_QUERY_ID:
-        return "Explainability index not available for this query."
+    """Traced as one `chat` trace (index lookup, retrieval, Groq call)."""
+    with span("chat", root=True, query_id=query_id, question_chars=len(user_question)):
+        return _answer_user_question(query_id, user_question, final_label, confidence)
 
-    faiss_path = os.path.join(FAISS_BASE_DIR, query_id)
-    if not os.path.exists(faiss_path):
-        return "Explainability index not found."
 
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2"
-    )
+def _answer_user_question(query_id, user_question, final_label, confidence):
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.messages import SystemMessage, HumanMessage
+    from langchain_groq import ChatGroq
 
-    vectorstore = FAISS.load_local(
-        faiss_path,
-        embeddings,
-        allow_dangerous_deserialization=True
-    )
+    groq_api_key = get_groq_api_key()
+
+    with span("chat.index") as index_span:
+        vectorstore = get_explainability_index(query_id)
+        index_span.set(found=vectorstore is not None)
+    if vectorstore is None:
+        return "Explainability index not found."
 
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-    relevant_docs = retriever.invoke(user_question)
+    with span("chat.retrieve", k=CHAT_TOP_K) as retrieve_span:
+        retriever = vectorstore.as_retriever(search_kwargs={"k": CHAT_TOP_K})
+        relevant_docs = retriever.invoke(user_question)
+        retrieve_span.set(documents=len(relevant_docs))
 
     if not relevant_docs:
         return "The available evidence does not answer this question."
@@ -145,7 +338,7 @@ def answer_user_question(
         )
 
     llm = ChatGroq(
-        groq_api_key=GROQ_API_KEY,
+        groq_api_key=groq_api_key,
         model_name="llama-3.1-8b-instant",
         temperature=0.2,
         max_tokens=1024,
@@ -167,5 +360,11 @@ Answer using only the evidence above.
 """)
     ])
 
-    response = llm.invoke(prompt.format())
+    prompt_text = prompt.format()
+    with span("llm.groq", kind=SPAN_KIND_CLIENT, model=llm.model_name,
+              prompt_chars=len(prompt_text)) as llm_span:
+        response = llm.invoke(prompt_text)
+        usage = getattr(response, "usage_metadata", None) or {}
+        llm_span.set(input_tokens=usage.get("input_tokens"),
+                     output_tokens=usage.get("output_tokens"))
     return response.content
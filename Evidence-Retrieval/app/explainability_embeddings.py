@@ -0,0 +1,30 @@
+from langchain_core.embeddings import Embeddings
+
+from Retrieval.encoder_registry import get_encoder
+
+
+# -----------------------------------------------------
+# LangChain view of the shared encoder
+# -----------------------------------------------------
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+class SharedEncoderEmbeddings(Embeddings):
+    """
+    LangChain Embeddings backed by the process-wide SentenceTransformer,
+    so the explainability index does not load its own copy of MiniLM.
+    With normalize=True it matches the vectors from encode_sentences().
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, normalize: bool = False):
+        self.model_name = model_name
+        self.normalize = normalize
+
+    def embed_documents(self, texts):
+        vectors = get_encoder(self.model_name).encode(
+            list(texts), normalize_embeddings=self.normalize
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
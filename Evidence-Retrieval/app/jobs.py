@@ -0,0 +1,174 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from app.claim_cache import verify_with_cache
+from app.pipeline import new_query_id
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("jobs")
+
+
+# -----------------------------------------------------
+# Config
+# -----------------------------------------------------
+# Pipelines running at once; further jobs wait in the queue
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+
+# Finished jobs are kept this long for polling / late subscribers
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_MAX_ENTRIES = int(os.getenv("JOB_MAX_ENTRIES", "1000"))
+
+# SSE comment sent while a stage is still running
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+
+# -----------------------------------------------------
+# Job
+# -----------------------------------------------------
+class Job:
+    """
+    One verification run. Stage events are appended by the pipeline
+    thread; async subscribers are woken through their own event loop.
+    """
+
+    def __init__(self, query_id, claim):
+        self.query_id = query_id
+        self.claim = claim
+        self.status = "queued"          # queued | running | done | failed
+        self.events = []                # [{"id", "stage", "data"}]
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+        self._lock = threading.Lock()
+        self._waiters = set()           # (loop, asyncio.Event)
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def add_event(self, stage, data, status=None):
+        """Append an event; `status` becomes the job status in the same step."""
+        with self._lock:
+            self.events.append({"id": len(self.events), "stage": stage, "data": data})
+            if status is not None:
+                self.status = status
+            waiters = list(self._waiters)
+
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def finish(self, status, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        # the final event lands before the status turns terminal, so a
+        # stream that sees the job finished has already seen that event
+        self.add_event("done" if status == "done" else "error", {
+            "query_id": self.query_id,
+            "status": status,
+            "error": error
+        }, status=status)
+
+    def snapshot(self):
+        return {
+            "query_id": self.query_id,
+            "claim": self.claim,
+            "status": self.status,
+            "stages": [e["stage"] for e in self.events],
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    async def stream(self, last_event_id=-1):
+        """Yield events after `last_event_id`, then new ones as they arrive."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            next_id = last_event_id + 1
+            while True:
+                event.clear()
+                with self._lock:
+                    pending = self.events[next_id:]
+                    finished = self.finished
+                for e in pending:
+                    yield e
+                next_id += len(pending)
+
+                if finished:
+                    return
+                if pending:
+                    continue
+
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None      # keepalive
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+# -----------------------------------------------------
+# Job store + runner
+# -----------------------------------------------------
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="verify-job")
+
+
+def _prune():
+    now = time.time()
+    with _jobs_lock:
+        expired = [
+            qid for qid, job in _jobs.items()
+            if job.finished and now - job.finished_at > JOB_TTL_SECONDS
+        ]
+        for qid in expired:
+            del _jobs[qid]
+
+        # size bound: drop the oldest finished jobs first
+        for qid in [q for q, j in _jobs.items() if j.finished]:
+            if len(_jobs) <= JOB_MAX_ENTRIES:
+                break
+            del _jobs[qid]
+
+
+def _run_job(job):
+    job.status = "running"
+    try:
+        result = verify_with_cache(job.claim, query_id=job.query_id, on_stage=job.add_event)
+        if "error" in result:
+            job.finish("failed", result=result, error=result["error"])
+        else:
+            job.finish("done", result=result)
+    except Exception as e:
+        log.error(f"❌ Job {job.query_id} failed: {e}")
+        job.finish("failed", error=str(e))
+
+
+def submit_job(claim):
+    _prune()
+
+    job = Job(new_query_id(), claim)
+    with _jobs_lock:
+        _jobs[job.query_id] = job
+
+    _job_executor.submit(_run_job, job)
+    return job
+
+
+def get_job(query_id):
+    with _jobs_lock:
+        return _jobs.get(query_id)
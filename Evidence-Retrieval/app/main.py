@@ -1,10 +1,31 @@
+import time
+
+_import_start = time.perf_counter()
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.metrics import setup_metrics
 from app.routes import router
+from app.warmup import report_import_time, start_warmup
+
+report_import_time(time.perf_counter() - _import_start)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # observers first, so startup model loads and the first requests are counted
+    setup_metrics()
+    # models load in the background; the port is bound immediately
+    start_warmup()
+    yield
+
 
 app = FastAPI(
     title="Claim Verification Backend",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 app.add_middleware(
     CORSMiddleware,
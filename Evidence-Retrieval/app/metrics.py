@@ -0,0 +1,207 @@
+import os
+import sys
+import threading
+
+from app.pipeline_context import add_stage_observer
+from Inference.nli_scheduler import add_batch_observer
+from Pipelines.http_client import add_request_observer
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("metrics")
+
+
+# -----------------------------------------------------
+# Config
+# -----------------------------------------------------
+# Prometheus metrics on /metrics (METRICS_ENABLED=0 answers 503)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+# -----------------------------------------------------
+# Event metrics (fed by the stage / request / batch observers)
+# -----------------------------------------------------
+_metrics = None         # {} when disabled
+_setup_lock = threading.Lock()
+
+
+def _observe_stage(stage, seconds, query_id=None):
+    _metrics["stage_seconds"].labels(stage).observe(seconds)
+
+
+def _observe_request(source, seconds, outcome):
+    _metrics["source_seconds"].labels(source, outcome).observe(seconds)
+    if outcome != "ok":
+        _metrics["source_failures"].labels(source, outcome).inc()
+
+
+def _observe_batch(n_pairs, n_requests, seconds):
+    _metrics["nli_batch_pairs"].observe(n_pairs)
+    _metrics["nli_batch_requests"].observe(n_requests)
+    _metrics["nli_batch_seconds"].observe(seconds)
+
+
+def record_source_counts(documents, sentences):
+    """Per-source document / sentence counts of one request."""
+    if not _metrics:
+        return
+    for doc in documents:
+        _metrics["documents"].labels(doc.get("source", "unknown")).inc()
+    for sentence in sentences:
+        _metrics["sentences"].labels(sentence.get("source", "unknown")).inc()
+
+
+# -----------------------------------------------------
+# State metrics (read from the live objects on each scrape)
+# -----------------------------------------------------
+class StateCollector:
+    """Cache hit ratios, NLI queue depth and model load times."""
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        requests = CounterMetricFamily(
+            "evidence_cache_requests", "Cache lookups by result",
+            labels=["cache", "source", "result"]
+        )
+        ratio = GaugeMetricFamily(
+            "evidence_cache_hit_ratio", "Share of cache lookups served from the cache",
+            labels=["cache", "source"]
+        )
+        for cache, source, hits, misses in self._cache_counts():
+            for result, value in hits.items():
+                requests.add_metric([cache, source, result], value)
+            requests.add_metric([cache, source, "miss"], misses)
+            total = sum(hits.values()) + misses
+            ratio.add_metric([cache, source], sum(hits.values()) / total if total else 0.0)
+        yield requests
+        yield ratio
+
+        queue = GaugeMetricFamily("evidence_nli_queue_depth", "NLI requests waiting for a batch")
+        loads = GaugeMetricFamily(
+            "evidence_model_load_seconds", "Load + warmup time of the active models",
+            labels=["model", "version"]
+        )
+
+        # only report what is already loaded; a scrape never loads models
+        nli_module = sys.modules.get("Inference.deberta_nli")
+        handle = nli_module.active_nli() if nli_module else None
+        if handle is not None:
+            loads.add_metric(["nli", handle.version], handle.load_seconds)
+            if handle.scheduler is not None:
+                queue.add_metric([], handle.scheduler.stats()["queued"])
+
+        encoder_module = sys.modules.get("Retrieval.encoder_registry")
+        if encoder_module:
+            for name, seconds in encoder_module.encoder_load_seconds().items():
+                loads.add_metric(["encoder", name], seconds)
+        yield queue
+        yield loads
+
+        from app.warmup import warmup_state
+        warmup = GaugeMetricFamily(
+            "evidence_warmup_step_seconds", "Startup warmup time per step", labels=["step"]
+        )
+        for step, result in warmup_state()["steps"].items():
+            warmup.add_metric([step], result["seconds"])
+        yield warmup
+
+    @staticmethod
+    def _cache_counts():
+        """(cache, source, {hit kind: count}, misses) rows."""
+        rows = []
+
+        claim_cache = sys.modules.get("app.claim_cache")
+        if claim_cache:
+            stats = claim_cache.CLAIM_CACHE.stats()
+            rows.append(("claim", "",
+                         {"exact": stats["exact_hits"], "semantic": stats["semantic_hits"]},
+                         stats["misses"]))
+
+        # the existing instance only: a scrape must not create the SQLite cache
+        response_cache = sys.modules.get("Pipelines.response_cache")
+        cache = response_cache._cache if response_cache else None
+        if cache:
+            for source, counters in cache.snapshot().items():
+                rows.append(("response", source,
+                             {"fresh": counters["hits"], "stale": counters["stale_hits"]},
+                             counters["misses"]))
+
+        explain_cache = sys.modules.get("app.explainability_cache")
+        if explain_cache:
+            stats = explain_cache.INDEX_CACHE.stats()
+            rows.append(("explainability_index", "", {"hit": stats["hits"]}, stats["misses"]))
+
+        embedding_store = sys.modules.get("Retrieval.embedding_store")
+        if embedding_store:
+            for model_id, stats in embedding_store.embedding_store_stats().items():
+                rows.append(("embedding", model_id, {"hit": stats["hits"]}, stats["misses"]))
+
+        return rows
+
+
+# -----------------------------------------------------
+# Setup + exposition
+# -----------------------------------------------------
+def setup_metrics():
+    """Register the metrics and observers once; False when metrics are unavailable."""
+    global _metrics
+    with _setup_lock:
+        if _metrics is not None:
+            return bool(_metrics)
+
+        if not METRICS_ENABLED:
+            _metrics = {}
+            return False
+        try:
+            from prometheus_client import REGISTRY, Counter, Histogram
+        except ImportError:
+            log.warning("⚠️ prometheus_client not installed, /metrics disabled")
+            _metrics = {}
+            return False
+
+        _metrics = {
+            "stage_seconds": Histogram(
+                "evidence_pipeline_stage_seconds", "Pipeline stage latency",
+                ["stage"], buckets=LATENCY_BUCKETS
+            ),
+            "source_seconds": Histogram(
+                "evidence_source_request_seconds", "Upstream source request latency (cache hits included)",
+                ["source", "outcome"], buckets=LATENCY_BUCKETS
+            ),
+            "source_failures": Counter(
+                "evidence_source_request_failures", "Upstream requests failed after retries",
+                ["source", "kind"]
+            ),
+            "documents": Counter(
+                "evidence_source_documents", "Documents collected per source", ["source"]
+            ),
+            "sentences": Counter(
+                "evidence_source_sentences", "Sentences split per source", ["source"]
+            ),
+            "nli_batch_pairs": Histogram(
+                "evidence_nli_batch_pairs", "Pairs per scheduled NLI batch", buckets=BATCH_BUCKETS
+            ),
+            "nli_batch_requests": Histogram(
+                "evidence_nli_batch_requests", "Pipeline requests merged per NLI batch",
+                buckets=BATCH_BUCKETS
+            ),
+            "nli_batch_seconds": Histogram(
+                "evidence_nli_batch_seconds", "NLI forward time per batch", buckets=LATENCY_BUCKETS
+            ),
+        }
+        REGISTRY.register(StateCollector())
+
+    add_stage_observer(_observe_stage)
+    add_request_observer(_observe_request)
+    add_batch_observer(_observe_batch)
+    log.info("📈 Prometheus metrics enabled on /metrics")
+    return True
+
+
+def render_metrics():
+    """(body, content type) in the Prometheus text format."""
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    return generate_latest(), CONTENT_TYPE_LATEST
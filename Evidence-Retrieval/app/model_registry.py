@@ -0,0 +1,87 @@
+import os
+import hmac
+import threading
+
+from app.warmup import warmup_state
+from Inference.deberta_nli import active_nli, swap_nli
+from Retrieval.encoder_registry import active_encoder_name, loaded_encoders, swap_encoder
+
+
+# -----------------------------------------------------
+# Admin access (model swaps are disabled without a token)
+# -----------------------------------------------------
+MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN", "")
+
+MODEL_KINDS = ("nli", "encoder")
+
+# one swap at a time; serving never waits on this
+_swap_lock = threading.Lock()
+_swaps = {"in_progress": None, "last": None}
+
+
+def admin_token_valid(token):
+    if not MODEL_ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), MODEL_ADMIN_TOKEN.encode("utf-8"))
+
+
+# -----------------------------------------------------
+# Load state
+# -----------------------------------------------------
+def model_status():
+    nli = active_nli()
+    encoder = active_encoder_name()
+    return {
+        "nli": {
+            "loaded": nli is not None,
+            "version": nli.version if nli else None,
+            "model_path": nli.model_path if nli else None,
+            "loaded_at": nli.loaded_at if nli else None,
+        },
+        "encoder": {
+            "loaded": encoder in loaded_encoders(),
+            "version": encoder,
+        },
+        "swap": dict(_swaps),
+        "warmup": warmup_state(),
+    }
+
+
+def is_ready(status=None):
+    """
+    Ready once the NLI model and the retrieval encoder are in memory.
+    With WARMUP_ON_STARTUP=0 models load on the first request, so the
+    instance is ready as soon as startup has finished.
+    """
+    status = status or model_status()
+    if status["warmup"]["status"] == "skipped":
+        return True
+    return status["nli"]["loaded"] and status["encoder"]["loaded"]
+
+
+# -----------------------------------------------------
+# Hot swap
+# -----------------------------------------------------
+def swap_model(kind, target):
+    """
+    Load `target` (NLI checkpoint path or encoder name), warm it up and
+    make it active. The current model keeps serving until the switch.
+    """
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"Unknown model kind '{kind}' (use one of {list(MODEL_KINDS)})")
+
+    with _swap_lock:
+        _swaps["in_progress"] = {"kind": kind, "target": target}
+        try:
+            if kind == "nli":
+                if not os.path.isdir(target):
+                    raise ValueError(f"NLI model directory not found: {target}")
+                version = swap_nli(target).version
+            else:
+                version = swap_encoder(target)
+        finally:
+            _swaps["in_progress"] = None
+
+        _swaps["last"] = {"kind": kind, "version": version}
+
+    return {"kind": kind, "version": version}
@@ -3,6 +3,10 @@ import shutil
 import re
 from collections import defaultdict
 
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("cleanup")
+
 # All output subdirectories to manage
 OUTPUT_DIRS = [
     "outputs/bm25",
@@ -61,4 +65,4 @@ def cleanup_old_queries():
                         else:
                             os.remove(path)
                     except Exception as e:
-                        print(f"Cleanup failed for {path}: {e}")
+                        log.warning(f"⚠️ Cleanup failed for {path}: {e}")
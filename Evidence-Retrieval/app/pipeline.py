@@ -1,135 +1,282 @@
 from datetime import datetime
 from uuid import uuid4
+from concurrent.futures import ThreadPoolExecutor
 import os
-import json
 from app.explainability_chatbot import build_explainability_index
 from Pipelines.nltk_setup import setup_nltk
+from Pipelines.artifact_store import write_artifact
+from Pipelines.logging_setup import get_logger
+from Pipelines.source_adapter import install as install_source_adapter
+from Pipelines.tracing import propagate, span
 from Pipelines.Wiki import wiki_pipeline
 from Pipelines.Scholar import scholar_pipeline
 from Pipelines.Gnews import gnews_pipeline
 from Pipelines.sentence_splitter import (
-    setup_sentence_tokenizer,
     split_documents_into_sentences,
     save_sentences_to_json
 )
 from app.output_cleanup import cleanup_old_queries
-from Retrieval.bm25_retriever import run_bm25
-from Retrieval.faiss_retriever import run_faiss
-from Retrieval.fusion_and_ranking import run_fusion
-from Inference.deberta_nli import run_deberta_nli
+from app.pipeline_context import (
+    PERSIST_ARTIFACTS,
+    PipelineContext,
+    persist_artifact,
+    run_in_background
+)
+from Retrieval.bm25_retriever import bm25_results, bm25_score_array, save_bm25_scores
+from Retrieval.faiss_retriever import (
+    compute_dense_scores,
+    dense_results,
+    encode_sentences,
+    save_faiss_scores
+)
+from Retrieval.encoder_registry import active_encoder
+from Retrieval.fusion_and_ranking import fuse_scores, save_fused_results
+from Inference.deberta_nli import run_deberta_nli, save_nli_results
+from app.metrics import record_source_counts
 from dotenv import load_dotenv
 
 load_dotenv()
+log = get_logger("pipeline")
 
-# 🚨 Run ONCE when server starts
-setup_nltk()
-setup_sentence_tokenizer()
+# SOURCE_MODE=record|replay|remote (see Pipelines.source_adapter)
+install_source_adapter()
+
+
+# =================================================
+# 🔹 SOURCE FAN-OUT
+# =================================================
+# Merge order is fixed so doc_ids / sentence_ids stay stable
+# regardless of which source finishes first.
+SOURCE_ORDER = ["wikipedia", "scholar", "gnews"]
+
+# Max in-flight calls per source across all concurrent requests
+SOURCE_CONCURRENCY = {
+    "wikipedia": int(os.getenv("WIKI_MAX_CONCURRENCY", "4")),
+    "scholar": int(os.getenv("SCHOLAR_MAX_CONCURRENCY", "2")),
+    "gnews": int(os.getenv("GNEWS_MAX_CONCURRENCY", "2")),
+}
+
+# One pool per source, so a slow source can only queue behind itself
+_source_executors = {
+    name: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"source-{name}")
+    for name, limit in SOURCE_CONCURRENCY.items()
+}
+
+
+def _run_source(name, fn, *args, **kwargs):
+    try:
+        with span(f"source_pipeline.{name}") as source_span:
+            docs = fn(*args, **kwargs)
+            source_span.set(documents=len(docs))
+            return docs
+    except Exception as e:
+        log.error(f"❌ {name} pipeline failed: {e}", extra={"source": name})
+        return []
+
+
+def collect_documents(query_text, limit=10):
+    """
+    Runs all source pipelines concurrently and merges their
+    documents in SOURCE_ORDER.
+    """
+    GNEWS_API_KEY = os.getenv("GNEWS_API_KEY")
+
+    calls = {
+        "wikipedia": (wiki_pipeline, (query_text,), {"limit": limit}),
+        "scholar": (scholar_pipeline, (query_text,), {"limit": limit}),
+        "gnews": (gnews_pipeline, (query_text, GNEWS_API_KEY), {"limit": limit}),
+    }
+
+    futures = {
+        name: _source_executors[name].submit(propagate(_run_source), name, fn, *args, **kwargs)
+        for name, (fn, args, kwargs) in calls.items()
+    }
+
+    all_docs = []
+    for name in SOURCE_ORDER:
+        docs = futures[name].result()
+        log.info(f"✔ {name}: retrieved {len(docs)} documents",
+                 extra={"source": name, "documents": len(docs)})
+        all_docs.extend(docs)
+
+    return all_docs
 
 
 # =================================================
 # 🔹 SAVE DOCUMENTS
 # =================================================
 def save_docs_to_json(all_docs, query_id, query_text):
-    os.makedirs("outputs/documents", exist_ok=True)
-    file_path = f"outputs/documents/documents_{query_id}.json"
-
-    data = {
+    write_artifact("documents", "documents", query_id, {
         "query_id": query_id,
         "query_text": query_text,
         "total_docs": len(all_docs),
         "documents": all_docs
-    }
+    }, table_key="documents")
+
+
+# =================================================
+# 🔹 STAGE EVENTS
+# =================================================
+def new_query_id():
+    return f"q_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
 
-    print(f"💾 Documents saved to: {file_path}")
+def _emit(on_stage, stage, payload):
+    # progress reporting must never break the pipeline
+    if on_stage is None:
+        return
+    try:
+        on_stage(stage, payload)
+    except Exception as e:
+        log.warning(f"⚠️ on_stage callback failed for '{stage}': {e}", extra={"stage": stage})
+
+
+def _evidence_preview(ranked):
+    return [
+        {
+            "sentence_id": r["sentence_id"],
+            "sentence_text": r["sentence_text"],
+            "document_id": r["doc_id"],
+            "source": r.get("source"),
+            "title": r.get("title"),
+            "url": r.get("url"),
+            "final_score": r["final_score"]
+        }
+        for r in ranked
+    ]
 
 
 # =================================================
 # 🔹 MAIN PIPELINE
 # =================================================
-def verify_claim_pipeline(query_text: str):
-    print("\n" + "=" * 90)
-    print("🧪 NEW CLAIM VERIFICATION REQUEST")
-    print(f"📝 Claim: {query_text}")
+def verify_claim_pipeline(query_text: str, query_id=None, on_stage=None):
+    """
+    `on_stage(stage, payload)` is called as stages complete:
+    "documents", "sentences", "evidence" (fused top-k) and "result".
+    Traced as one `verify_claim` trace (see Pipelines.tracing).
+    """
+    query_id = query_id or new_query_id()
+    with span("verify_claim", root=True, query_id=query_id, claim_chars=len(query_text)) as root:
+        response = _verify_claim(query_text, query_id, on_stage)
+        root.set(label=response.get("label"), error=response.get("error"))
+        return response
 
-    query_id = f"q_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
-    print(f"🆔 Query ID: {query_id}")
 
-    all_docs = []
+def _verify_claim(query_text, query_id, on_stage):
+    log.info("🧪 New claim verification request", extra={"query_id": query_id, "claim": query_text})
 
-    # ---------------- Wikipedia ----------------
-    print("\n🚀 Wikipedia pipeline...")
-    wiki_docs = wiki_pipeline(query_text, limit=10)
-    print(f"   ✔ Retrieved {len(wiki_docs)} documents")
-    all_docs.extend(wiki_docs)
+    ctx = PipelineContext(query_id=query_id, query_text=query_text)
 
-    # ---------------- Scholar ------------------
-    print("\n🚀 Scholar pipeline...")
-    scholar_docs = scholar_pipeline(query_text, limit=10)
-    print(f"   ✔ Retrieved {len(scholar_docs)} documents")
-    all_docs.extend(scholar_docs)
+    # normally done by app.warmup already; a no-op then
+    setup_nltk()
 
-    # ---------------- GNews --------------------
-    print("\n🚀 GNews pipeline...")
-    GNEWS_API_KEY = os.getenv("GNEWS_API_KEY")
-    gnews_docs = gnews_pipeline(query_text, GNEWS_API_KEY, limit=10)
-    print(f"   ✔ Retrieved {len(gnews_docs)} documents")
-    all_docs.extend(gnews_docs)
+    # ---------------- Sources (concurrent) ----------------
+    log.debug("🚀 Wikipedia / Scholar / GNews pipelines (concurrent)", extra={"query_id": query_id})
+    with ctx.stage("fetch") as stage_span:
+        ctx.documents = collect_documents(query_text, limit=10)
+        stage_span.set(documents=len(ctx.documents))
 
-    print(f"\n📦 Total documents collected: {len(all_docs)}")
+    log.info(f"📦 Total documents collected: {len(ctx.documents)}",
+             extra={"query_id": query_id, "documents": len(ctx.documents)})
 
     # Attach query_id to documents
-    for doc in all_docs:
+    for doc in ctx.documents:
         doc["query_id"] = query_id
 
-    # Save documents (RESTORED STEP)
-    save_docs_to_json(all_docs, query_id, query_text)
+    persist_artifact(save_docs_to_json, ctx.documents, query_id, query_text)
+
+    by_source = {}
+    for doc in ctx.documents:
+        source = doc.get("source", "unknown")
+        by_source[source] = by_source.get(source, 0) + 1
+    _emit(on_stage, "documents", {
+        "query_id": query_id,
+        "total_documents": len(ctx.documents),
+        "by_source": by_source
+    })
 
     # ---------------- Sentence Splitting ----------------
-    print("\n✂️ Splitting documents into sentences...")
-    sentences = split_documents_into_sentences(all_docs)
-    print(f"   ✔ Total sentences generated: {len(sentences)}")
-    save_sentences_to_json(sentences, query_id)
+    with ctx.stage("split") as stage_span:
+        ctx.sentences = split_documents_into_sentences(ctx.documents)
+        stage_span.set(documents=len(ctx.documents), sentences=len(ctx.sentences))
+    log.info(f"✂️ Total sentences generated: {len(ctx.sentences)}",
+             extra={"query_id": query_id, "sentences": len(ctx.sentences)})
+    record_source_counts(ctx.documents, ctx.sentences)
+    persist_artifact(save_sentences_to_json, ctx.sentences, query_id)
+    _emit(on_stage, "sentences", {
+        "query_id": query_id,
+        "total_sentences": len(ctx.sentences)
+    })
 
     # ---------------- Retrieval -------------------------
-    print("\n🔍 Running BM25 retriever...")
-    run_bm25(query_id, query_text)
+    with ctx.stage("bm25") as stage_span:
+        ctx.bm25_scores = bm25_score_array(query_text, ctx.sentences)
+        stage_span.set(sentences=len(ctx.sentences))
+    if PERSIST_ARTIFACTS:
+        save_bm25_scores(bm25_results(ctx.bm25_scores, ctx.sentences), query_id)
 
-    print("\n🧠 Running FAISS retriever...")
-    run_faiss(query_id, query_text)
+    # one encoder for the whole request, even if it is swapped meanwhile
+    encoder = active_encoder()
+    with ctx.stage("encode") as stage_span:
+        ctx.sentence_embeddings = encode_sentences(
+            [s["sentence_text"] for s in ctx.sentences], encoder
+        )
+        stage_span.set(sentences=len(ctx.sentences), encoder=encoder[0])
+    with ctx.stage("faiss") as stage_span:
+        ctx.dense = compute_dense_scores(
+            query_text, ctx.sentences, embeddings=ctx.sentence_embeddings, encoder=encoder
+        )
+        stage_span.set(sentences=len(ctx.sentences))
+    ctx.faiss_scores = dense_results(ctx.dense, ctx.sentences)
+    persist_artifact(save_faiss_scores, ctx.faiss_scores, query_id)
 
-    print("\n⚖️ Running fusion & ranking...")
-    run_fusion(query_id, alpha=0.6, top_k=5)
+    with ctx.stage("fusion") as stage_span:
+        ctx.ranked = fuse_scores(
+            query_id, ctx.bm25_scores, ctx.dense, ctx.sentences,
+            alpha=0.6, top_k=5
+        )
+        stage_span.set(sentences=len(ctx.sentences), top_k=len(ctx.ranked))
+    persist_artifact(save_fused_results, ctx.ranked, query_id)
+    _emit(on_stage, "evidence", {
+        "query_id": query_id,
+        "evidence": _evidence_preview(ctx.ranked)
+    })
 
     # ---------------- NLI -------------------------------
-    print("\n🧠 Running DeBERTa NLI (multi-evidence single-shot)...")
-    nli_result = run_deberta_nli(
-        query_id=query_id,
-        claim=query_text,
-        top_k=5
+    with ctx.stage("nli") as stage_span:
+        stage_span.set(evidence=len(ctx.ranked))
+        ctx.nli_result = run_deberta_nli(
+            query_id=query_id,
+            claim=query_text,
+            top_k=5,
+            ranked=ctx.ranked,
+            save=False
+        )
+    # built from the retrieval vectors, in the background
+    # (timed there as the "explainability" stage)
+    build_explainability_index(
+        query_id,
+        top_k=5,
+        sentences=ctx.sentences,
+        embeddings=ctx.sentence_embeddings,
+        ranked=ctx.ranked,
+        encoder_name=encoder[0]
     )
-    build_explainability_index(query_id, top_k=5)
-    if nli_result is None:
-        print("❌ NLI failed — no result returned")
-        return {
+    if ctx.nli_result is None:
+        log.error("❌ NLI failed — no result returned", extra={"query_id": query_id})
+        response = {
             "query_id": query_id,
             "claim": query_text,
             "error": "NLI inference failed"
         }
-
-    # ---------------- Load sentence metadata ----------------
-    sentences_path = f"outputs/sentences/sentences_{query_id}.json"
-    with open(sentences_path, "r", encoding="utf-8") as f:
-        sentence_data = json.load(f)
-
-    sentence_lookup = {
-        s["sentence_id"]: s
-        for s in sentence_data["sentences"]
-    }
+        _emit(on_stage, "result", response)
+        return response
+    nli_result = ctx.nli_result
+    persist_artifact(save_nli_results, query_id, query_text, nli_result)
 
     # ---------------- Enrich Evidence ----------------
+    sentence_lookup = ctx.sentence_lookup
+
     enriched_evidence = []
     for ev in nli_result["evidences"]:
         sid = ev["sentence_id"]
@@ -142,20 +289,26 @@ def verify_claim_pipeline(query_text: str):
                 "document_id": meta["doc_id"],   # ✅ FIXED
                 "source": meta.get("source"),
                 "title": meta.get("title"),
-                "url": meta.get("url")
+                "url": meta.get("url"),
+                "nli_label": ev.get("label"),
+                "probabilities": ev.get("probabilities")
             })
 
     # ---------------- Final Logs ----------------
-    print("\n📊 FINAL VERIFICATION RESULT")
-    print(f"   🏷 Label      : {nli_result['label']}")
-    print(f"   📈 Confidence : {nli_result.get('confidence')}")
-    print("=" * 90 + "\n")
-    cleanup_old_queries()
+    log.info(f"📊 Final verification result: {nli_result['label']}", extra={
+        "query_id": query_id,
+        "label": nli_result["label"],
+        "confidence": nli_result.get("confidence"),
+        "timings_ms": {k: round(v * 1000, 1) for k, v in ctx.timings.items()},
+    })
+    run_in_background(cleanup_old_queries)
     # ---------------- API RESPONSE ----------------
-    return {
+    response = {
         "query_id": query_id,
         "claim": query_text,
         "label": nli_result["label"],
         "confidence": nli_result.get("confidence"),
         "evidence": enriched_evidence
     }
+    _emit(on_stage, "result", response)
+    return response
@@ -0,0 +1,97 @@
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from Pipelines.artifact_store import submit_task
+from Pipelines.logging_setup import get_logger
+from Pipelines.tracing import span
+
+log = get_logger("pipeline")
+
+
+# -----------------------------------------------------
+# Per-request state handed from stage to stage in memory
+# -----------------------------------------------------
+@dataclass
+class PipelineContext:
+    query_id: str
+    query_text: str
+    documents: list = field(default_factory=list)
+    sentences: list = field(default_factory=list)
+    sentence_embeddings: Optional[Any] = None     # float32 matrix, rows = sentences
+    bm25_scores: Optional[Any] = None                    # (n,) array, rows = sentences
+    faiss_scores: list = field(default_factory=list)     # top-k dense candidates
+    dense: Optional[Any] = None                          # faiss_retriever.DenseScores
+    ranked: list = field(default_factory=list)
+    nli_result: Optional[dict] = None
+    timings: dict = field(default_factory=dict)           # stage -> seconds
+
+    @property
+    def sentence_lookup(self):
+        return {s["sentence_id"]: s for s in self.sentences}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time one pipeline stage into `timings` and the stage observers,
+        as a `pipeline.<name>` trace span (yielded, for attributes).
+        """
+        start = time.perf_counter()
+        try:
+            with span(f"pipeline.{name}") as stage_span:
+                yield stage_span
+        finally:
+            seconds = time.perf_counter() - start
+            self.timings[name] = seconds
+            log.debug(f"⏱ {name}", extra={
+                "query_id": self.query_id, "stage": name, "ms": round(seconds * 1000, 1)
+            })
+            record_stage(name, seconds, self.query_id)
+
+
+# -----------------------------------------------------
+# Stage observers (benchmarks, metrics)
+# -----------------------------------------------------
+_stage_observers = []
+
+
+def add_stage_observer(fn):
+    """`fn(stage, seconds, query_id)` is called after every timed stage."""
+    if fn not in _stage_observers:
+        _stage_observers.append(fn)
+
+
+def remove_stage_observer(fn):
+    if fn in _stage_observers:
+        _stage_observers.remove(fn)
+
+
+def record_stage(stage, seconds, query_id=None):
+    for fn in list(_stage_observers):
+        try:
+            fn(stage, seconds, query_id)
+        except Exception as e:
+            log.warning(f"⚠️ Stage observer failed: {e}")
+
+
+# -----------------------------------------------------
+# Optional artifact persistence (off the request path)
+# -----------------------------------------------------
+PERSIST_ARTIFACTS = os.getenv("PERSIST_ARTIFACTS", "1") == "1"
+
+
+def persist_artifact(save_fn, *args, **kwargs):
+    """
+    Call a stage's save_* function when persistence is enabled.
+    The save_* functions encode the data and leave the file write to
+    the artifact writer thread.
+    """
+    if PERSIST_ARTIFACTS:
+        save_fn(*args, **kwargs)
+
+
+def run_in_background(fn):
+    """Housekeeping that should run after pending artifact writes."""
+    submit_task(fn)
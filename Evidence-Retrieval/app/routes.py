@@ -1,8 +1,16 @@
-from fastapi import APIRouter
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
-from app.pipeline import verify_claim_pipeline
+from app.batch import BATCH_MAX_CLAIMS, verify_claims
+from app.claim_cache import verify_with_cache
+from app.jobs import get_job, submit_job
+from app.metrics import render_metrics, setup_metrics
 from app.explainability_chatbot import answer_user_question
+from app.model_registry import admin_token_valid, is_ready, model_status, swap_model
 
 router = APIRouter()
 
@@ -16,7 +24,82 @@ class ClaimRequest(BaseModel):
 
 @router.post("/api/verify")
 def verify_claim(request: ClaimRequest):
-    return verify_claim_pipeline(request.claim)
+    return verify_with_cache(request.claim)
+
+
+# ============================
+# BATCH VERIFY
+# ============================
+class BatchClaimRequest(BaseModel):
+    claims: List[str]
+
+
+@router.post("/api/verify/batch")
+def verify_claim_batch(request: BatchClaimRequest):
+    """One result per claim, in order; failures are reported per claim."""
+    if len(request.claims) > BATCH_MAX_CLAIMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_MAX_CLAIMS} claims per batch (use main.py --input for more)"
+        )
+    results = verify_claims(request.claims)
+    return {
+        "total": len(results),
+        "failed": sum(1 for r in results if "error" in r),
+        "results": results
+    }
+
+
+# ============================
+# VERIFY JOBS (ASYNC + STREAMING)
+# ============================
+@router.post("/api/verify/jobs", status_code=202)
+def create_verify_job(request: ClaimRequest):
+    """Starts the pipeline in the background and returns its query_id."""
+    job = submit_job(request.claim)
+    return {
+        "query_id": job.query_id,
+        "status": job.status,
+        "status_url": f"/api/verify/jobs/{job.query_id}",
+        "events_url": f"/api/verify/jobs/{job.query_id}/events"
+    }
+
+
+def _job_or_404(query_id):
+    job = get_job(query_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+
+@router.get("/api/verify/jobs/{query_id}")
+def verify_job_status(query_id: str):
+    return _job_or_404(query_id).snapshot()
+
+
+@router.get("/api/verify/jobs/{query_id}/events")
+async def verify_job_events(query_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events: one event per completed stage (documents,
+    sentences, evidence, result) and a final done / error event.
+    Reconnects resume after the Last-Event-ID header.
+    """
+    job = _job_or_404(query_id)
+    start = int(last_event_id) if last_event_id and last_event_id.isdigit() else -1
+
+    async def event_source():
+        async for event in job.stream(start):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            data = json.dumps(event["data"], ensure_ascii=False, default=str)
+            yield f"id: {event['id']}\nevent: {event['stage']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 # ============================
@@ -46,3 +129,58 @@ def explain_decision(request: ChatRequest):
     return {
         "answer": answer
     }
+
+
+# ============================
+# HEALTH PROBES
+# ============================
+@router.get("/health/live")
+def health_live():
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+def health_ready():
+    """200 once the NLI model and encoder are loaded (or startup ran without warmup), 503 before."""
+    status = model_status()
+    ready = is_ready(status)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "loading", **status}
+    )
+
+
+# ============================
+# METRICS (PROMETHEUS)
+# ============================
+@router.get("/metrics")
+def metrics():
+    if not setup_metrics():
+        raise HTTPException(status_code=503, detail="Metrics disabled or prometheus_client not installed")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+# ============================
+# MODEL ADMIN
+# ============================
+class ModelSwapRequest(BaseModel):
+    kind: str       # nli | encoder
+    target: str     # NLI checkpoint directory or encoder name
+
+
+@router.post("/admin/models/swap")
+def swap_model_route(request: ModelSwapRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Loads and warms up the new model, then switches to it atomically.
+    In-flight requests finish on the previous version.
+    """
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid or missing admin token")
+
+    try:
+        return swap_model(request.kind, request.target)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model swap failed: {e}")
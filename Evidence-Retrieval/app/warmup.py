@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+
+from Pipelines.logging_setup import get_logger
+
+log = get_logger("warmup")
+
+
+# Load models in the background once the server is up
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+# Seconds importing app.main may take before a warning is printed
+IMPORT_TIME_BUDGET_S = float(os.getenv("IMPORT_TIME_BUDGET_S", "3"))
+
+
+# -----------------------------------------------------
+# Warmup steps (heavy imports + model loads, in order)
+# -----------------------------------------------------
+def _warm_nltk():
+    from Pipelines.nltk_setup import setup_nltk
+    setup_nltk()
+
+
+def _warm_encoder():
+    from Retrieval.encoder_registry import active_encoder
+    active_encoder()[1].encode(["warmup"], normalize_embeddings=True)
+
+
+def _warm_nli():
+    # loading runs a warmup forward pass (Inference.deberta_nli.load_nli)
+    from Inference.deberta_nli import get_nli
+    get_nli()
+
+
+def _warm_explainability():
+    from langchain_community.vectorstores import FAISS  # noqa: F401
+    from app.explainability_chatbot import get_embeddings
+    get_embeddings()
+
+
+WARMUP_STEPS = [
+    ("nltk", _warm_nltk),
+    ("encoder", _warm_encoder),
+    ("nli", _warm_nli),
+    ("explainability", _warm_explainability),
+]
+
+
+# -----------------------------------------------------
+# State (read by the health endpoints)
+# -----------------------------------------------------
+_state = {
+    "status": "pending",        # pending | running | ready | failed | skipped
+    "import_seconds": None,
+    "steps": {},
+}
+_state_lock = threading.Lock()
+_warmup_thread = None
+
+
+def warmup_state():
+    with _state_lock:
+        return {**_state, "steps": dict(_state["steps"])}
+
+
+def report_import_time(seconds):
+    with _state_lock:
+        _state["import_seconds"] = round(seconds, 3)
+
+    if seconds > IMPORT_TIME_BUDGET_S:
+        log.warning(f"⚠️ App import took {seconds:.2f}s (budget {IMPORT_TIME_BUDGET_S:.1f}s)")
+    else:
+        log.info(f"⏱ App import took {seconds:.2f}s (budget {IMPORT_TIME_BUDGET_S:.1f}s)")
+
+
+def run_warmup():
+    with _state_lock:
+        _state["status"] = "running"
+
+    failed = False
+    for name, step in WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+            result = {"ok": True}
+        except Exception as e:
+            failed = True
+            result = {"ok": False, "error": str(e)}
+            log.error(f"❌ Warmup step '{name}' failed: {e}")
+
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        with _state_lock:
+            _state["steps"][name] = result
+
+    with _state_lock:
+        _state["status"] = "failed" if failed else "ready"
+    log.info(f"🔥 Warmup finished: {_state['status']}")
+
+
+def start_warmup():
+    """Run the warmup once, on a background thread."""
+    global _warmup_thread
+    if not WARMUP_ON_STARTUP:
+        # models load on first use; startup itself is done
+        with _state_lock:
+            if _state["status"] == "pending":
+                _state["status"] = "skipped"
+        return
+    if _warmup_thread is not None:
+        return
+
+    _warmup_thread = threading.Thread(target=run_warmup, name="warmup", daemon=True)
+    _warmup_thread.start()
@@ -0,0 +1,374 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Per-stage latency benchmark for verify_claim_pipeline over a fixed
+claim set, with source responses replayed from recorded fixtures
+(a Pipelines.source_adapter store, no synthetic latency or errors).
+
+    python -m benchmarks.run_benchmarks --record          # capture fixtures once (network, GNEWS_API_KEY)
+    python -m benchmarks.run_benchmarks --save-baseline   # measure, store as baseline
+    python -m benchmarks.run_benchmarks                   # measure, compare to baseline
+
+Without recorded fixtures the sources are answered by
+benchmarks.synthetic_sources (deterministic, offline), and the first
+run without a baseline stores one, so a fresh checkout can run and
+check for regressions. Baselines only compare against runs over the
+same kind of sources.
+
+Reports p50/p95/p99 latency, throughput and peak RSS per stage
+(fetch, split, bm25, encode, faiss, fusion, nli, explainability, total).
+Exits with status 1 when a stage regressed past the tolerance.
+"""
+
+import os
+
+# measure the pipeline, not artifact writes or the startup warmup thread;
+# without the embedding cache every pass runs the encoder, so "encode"
+# times the model rather than cache hits after the first iteration
+os.environ.setdefault("PERSIST_ARTIFACTS", "0")
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "0")
+
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks.synthetic_sources import SyntheticStore
+from Pipelines.source_adapter import Faults, SourceStore, install
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CLAIMS = os.path.join(BENCH_DIR, "claims.jsonl")
+DEFAULT_FIXTURES = os.path.join(BENCH_DIR, "fixtures", "sources.sqlite3")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = "outputs/benchmarks/latest.json"
+
+STAGES = ["fetch", "split", "bm25", "encode", "faiss", "fusion", "nli", "explainability", "total"]
+
+# a stage regresses when p50 or p95 grows by more than the tolerance
+# and by more than this many milliseconds (timer noise on tiny stages)
+MIN_REGRESSION_MS = 1.0
+
+RSS_SAMPLE_INTERVAL_S = 0.01
+
+
+# =================================================
+# 🔹 MEMORY
+# =================================================
+def current_rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class RssSampler:
+    """Samples RSS on a background thread so stage peaks can be read back."""
+
+    def __init__(self, interval=RSS_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self.samples = []           # (perf_counter, rss_mb)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = current_rss_mb()
+            if rss is not None:
+                self.samples.append((time.perf_counter(), rss))
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def peak_between(self, start, end):
+        values = [rss for t, rss in self.samples if start <= t <= end]
+        return max(values) if values else None
+
+
+# =================================================
+# 🔹 STAGE RECORDER
+# =================================================
+class StageRecorder:
+    """Pipeline stage observer: (stage -> [(start, end)]) in perf_counter time."""
+
+    def __init__(self):
+        self.intervals = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, query_id=None):
+        end = time.perf_counter()
+        with self._lock:
+            self.intervals[stage].append((end - seconds, end))
+
+    def add(self, stage, start, end):
+        with self._lock:
+            self.intervals[stage].append((start, end))
+
+
+def summarize(intervals, sampler):
+    seconds = np.array([end - start for start, end in intervals])
+    ms = seconds * 1000
+    peaks = [sampler.peak_between(start, end) for start, end in intervals]
+    peaks = [p for p in peaks if p is not None]
+    return {
+        "count": len(intervals),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "throughput_per_s": round(len(seconds) / float(seconds.sum()), 3) if seconds.sum() else None,
+        "peak_rss_mb": round(max(peaks), 1) if peaks else None,
+    }
+
+
+# =================================================
+# 🔹 RUN
+# =================================================
+def load_claims(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["claim"] for line in f if line.strip()]
+
+
+def run_claim(claim, recorder=None):
+    from app.pipeline import verify_claim_pipeline
+    from app.explainability_chatbot import get_explainability_index
+
+    start = time.perf_counter()
+    result = verify_claim_pipeline(claim)
+    if "error" not in result:
+        # the index is built in the background; wait so it is part of the run
+        get_explainability_index(result["query_id"])
+    end = time.perf_counter()
+
+    if recorder is not None:
+        recorder.add("total", start, end)
+    return result
+
+
+def run_benchmark(args, adapter):
+    from app.pipeline_context import add_stage_observer, remove_stage_observer
+    from app.warmup import run_warmup
+    from Inference.backends import NLI_BACKEND
+    from Retrieval.encoder_registry import active_encoder_name
+
+    claims = load_claims(args.claims)
+    print(f"🧪 {len(claims)} claims × {args.iterations} iterations ({args.warmup} warmup)")
+
+    # model loads are not part of any stage
+    run_warmup()
+    for _ in range(args.warmup):
+        for claim in claims:
+            run_claim(claim)
+
+    recorder = StageRecorder()
+    sampler = RssSampler()
+    failures = 0
+    adapter.stats.clear()
+
+    add_stage_observer(recorder.observe)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        for _ in range(args.iterations):
+            for claim in claims:
+                if "error" in run_claim(claim, recorder):
+                    failures += 1
+    finally:
+        wall = time.perf_counter() - started
+        sampler.stop()
+        remove_stage_observer(recorder.observe)
+
+    runs = len(claims) * args.iterations
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "claims": len(claims),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "encoder": active_encoder_name(),
+            "nli_backend": NLI_BACKEND,
+            "sources": "synthetic" if isinstance(adapter.store, SyntheticStore) else "recorded",
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "runs": runs,
+        "failures": failures,
+        "fixture_hits": adapter.stats["hits"],
+        "fixture_misses": adapter.stats["misses"],
+        "wall_seconds": round(wall, 3),
+        "throughput_claims_per_s": round(runs / wall, 3) if wall else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1) if peak_rss_mb() is not None else None,
+        "stages": {
+            stage: summarize(recorder.intervals[stage], sampler)
+            for stage in STAGES
+            if recorder.intervals.get(stage)
+        },
+    }
+
+
+def record_fixtures(args):
+    """
+    One live source fan-out per claim; every response is stored. Only
+    the fetch stage talks to the sources, so nothing else is run.
+    """
+    from app.pipeline import collect_documents
+
+    adapter = install("record", args.fixtures)
+    try:
+        for claim in load_claims(args.claims):
+            collect_documents(claim, limit=10)
+    finally:
+        install("live")
+        # single file, ready to commit next to the claims
+        adapter.store.close()
+    print(f"💾 Recorded {adapter.stats['recorded']} source responses → {args.fixtures}")
+
+
+# =================================================
+# 🔹 REPORT + BASELINE
+# =================================================
+def print_report(report):
+    print("\n📊 STAGE LATENCY")
+    print(f"   {'stage':<15}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/s':>10}{'RSS MB':>9}")
+    for stage, s in report["stages"].items():
+        print(f"   {stage:<15}{s['count']:>6}{s['p50_ms']:>11.1f}{s['p95_ms']:>11.1f}"
+              f"{s['p99_ms']:>11.1f}{s['throughput_per_s'] or 0:>10.2f}{s['peak_rss_mb'] or 0:>9.0f}")
+
+    print(f"\n   🚀 {report['throughput_claims_per_s']} claims/s over {report['runs']} runs, "
+          f"peak RSS {report['peak_rss_mb']} MB")
+    if report["failures"]:
+        print(f"   ⚠️ {report['failures']} runs returned an error")
+    if report["fixture_misses"]:
+        print(f"   ⚠️ {report['fixture_misses']} source requests had no recorded fixture "
+              f"(re-run with --record)")
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """Returns the list of regressions, printing a per-stage comparison."""
+    regressions = []
+    print(f"\n📐 VS BASELINE ({baseline['meta']['timestamp']}, tolerance {tolerance:.0%})")
+
+    sources = report["meta"].get("sources"), baseline["meta"].get("sources", "recorded")
+    if sources[0] != sources[1]:
+        print(f"   ⚠️ Baseline was measured over {sources[1]} sources, this run over {sources[0]}; "
+              f"not comparing (store a new one with --save-baseline)")
+        return regressions
+
+    for stage, current in report["stages"].items():
+        base = baseline["stages"].get(stage)
+        if base is None:
+            continue
+
+        cells = []
+        for metric in ("p50_ms", "p95_ms"):
+            delta = current[metric] - base[metric]
+            change = delta / base[metric] if base[metric] else 0.0
+            regressed = change > tolerance and delta > MIN_REGRESSION_MS
+            if regressed:
+                regressions.append({"stage": stage, "metric": metric,
+                                    "baseline": base[metric], "current": current[metric]})
+            cells.append(f"{metric[:3]} {change:+7.1%}{' ❌' if regressed else '  '}")
+
+        print(f"   {stage:<15}" + "   ".join(cells))
+
+    if baseline.get("throughput_claims_per_s") and report.get("throughput_claims_per_s"):
+        change = report["throughput_claims_per_s"] / baseline["throughput_claims_per_s"] - 1
+        print(f"   {'throughput':<15}{change:+7.1%}")
+
+    return regressions
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+# =================================================
+# 🔹 CLI
+# =================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage pipeline latency benchmark")
+    parser.add_argument("--claims", default=DEFAULT_CLAIMS, help="JSONL with one {\"claim\"} per line")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="recorded source responses")
+    parser.add_argument("--record", action="store_true", help="fetch live and (re)record the fixtures")
+    parser.add_argument("--iterations", type=int, default=3, help="measured passes over the claims")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured passes first")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p50/p95 growth (0.10 = 10%%)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write this run's report")
+    args = parser.parse_args(argv)
+
+    # installs the SOURCE_MODE adapter on import; ours replaces it below
+    import app.pipeline  # noqa: F401
+
+    if args.record:
+        record_fixtures(args)
+        return 0
+
+    store = None
+    if not os.path.exists(args.fixtures) or not len(SourceStore(args.fixtures)):
+        print(f"ℹ️ No fixtures at {args.fixtures}, using synthetic source responses "
+              f"(record real ones with --record)")
+        store = SyntheticStore()
+
+    adapter = install("replay", args.fixtures, Faults(0, 0, 0, 0), store=store)
+    try:
+        report = run_benchmark(args, adapter)
+    finally:
+        install("live")
+
+    print_report(report)
+    write_json(args.output, report)
+    print(f"\n💾 Report → {args.output}")
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        # the first run on a checkout becomes the baseline later runs compare to
+        write_json(args.baseline, report)
+        print(f"💾 Baseline → {args.baseline}")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over baseline")
+        return 1
+
+    print("\n✅ No regressions over baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
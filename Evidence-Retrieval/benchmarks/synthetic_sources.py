@@ -0,0 +1,162 @@
+# benchmarks/synthetic_sources.py
+
+"""
+Deterministic stand-in for the source APIs, for benchmark runs without
+recorded fixtures (fresh checkout, no network).
+
+SyntheticStore answers the same lookups as a recorded SourceStore with
+bodies shaped like each upstream's JSON (MediaWiki search / extracts /
+REST summary, OpenAlex, Semantic Scholar, GNews). Text is generated
+from the query words with a seeded RNG, so a request always gets the
+same response and runs are comparable with each other — but not with
+runs over recorded fixtures.
+"""
+
+import re
+import zlib
+import random
+from urllib.parse import unquote, urlsplit
+
+
+DOCS_PER_SEARCH = 3
+SENTENCES_PER_DOC = 8
+
+FILLER = [
+    "reported", "according", "records", "official", "sources", "study", "figures",
+    "historians", "measured", "published", "evidence", "analysis", "survey", "data",
+    "confirmed", "disputed", "researchers", "experts", "estimate", "claimed",
+]
+TEMPLATES = [
+    "{a} {b} was {f1} by {f2} in the {f3}.",
+    "Several {f1} describe how {a} relates to {b}.",
+    "The {f1} on {a} {f2} that {b} is {f3}.",
+    "{a} and {b} are often {f1} together in {f2}.",
+    "In later {f1}, {a} was {f2} again.",
+    "Not all {f1} agree that {a} {f2} {b}.",
+]
+
+
+def _words(text):
+    return re.findall(r"[A-Za-z0-9]+", text) or ["topic"]
+
+
+def _rng(*parts):
+    return random.Random(zlib.crc32("|".join(map(str, parts)).encode("utf-8")))
+
+
+def synthetic_text(topic, n_sentences=SENTENCES_PER_DOC):
+    rng = _rng("text", topic)
+    words = _words(topic)
+    sentences = []
+    for _ in range(n_sentences):
+        sentences.append(rng.choice(TEMPLATES).format(
+            a=rng.choice(words), b=rng.choice(words),
+            f1=rng.choice(FILLER), f2=rng.choice(FILLER), f3=rng.choice(FILLER),
+        ))
+    text = " ".join(sentences)
+    return text[0].upper() + text[1:]
+
+
+def _titles(query, limit):
+    base = " ".join(w.capitalize() for w in _words(query))
+    return [base if i == 0 else f"{base} ({i})" for i in range(min(int(limit), DOCS_PER_SEARCH))]
+
+
+def _inverted_index(text):
+    index = {}
+    for position, word in enumerate(text.split()):
+        index.setdefault(word, []).append(position)
+    return index
+
+
+# ==============================
+# 🔹 PER-ENDPOINT BODIES
+# ==============================
+def _wiki_api(params):
+    if params.get("list") == "search":
+        titles = _titles(params.get("srsearch", ""), params.get("srlimit", 5))
+        return {"query": {"search": [{"title": t, "pageid": zlib.crc32(t.encode())} for t in titles]}}
+
+    pages = {}
+    for title in str(params.get("titles", "")).split("|"):
+        if not title:
+            continue
+        page_id = str(zlib.crc32(title.encode("utf-8")))
+        pages[page_id] = {
+            "title": title,
+            "extract": synthetic_text(title),
+            "fullurl": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}",
+        }
+    return {"query": {"pages": pages}}
+
+
+def _wiki_summary(path):
+    title = unquote(path.rsplit("/", 1)[-1]).replace("_", " ")
+    return {
+        "title": title,
+        "extract": synthetic_text(title),
+        "content_urls": {"desktop": {"page": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"}},
+    }
+
+
+def _openalex(params):
+    titles = _titles(params.get("search", ""), params.get("per-page", 5))
+    return {"results": [
+        {
+            "id": f"https://openalex.org/W{zlib.crc32(t.encode())}",
+            "title": f"A study of {t}",
+            "abstract_inverted_index": _inverted_index(synthetic_text("openalex " + t)),
+        }
+        for t in titles
+    ]}
+
+
+def _semantic_scholar(params):
+    titles = _titles(params.get("query", ""), params.get("limit", 5))
+    return {"data": [
+        {
+            "title": f"On {t}",
+            "abstract": synthetic_text("scholar " + t),
+            "url": f"https://www.semanticscholar.org/paper/{zlib.crc32(t.encode())}",
+        }
+        for t in titles
+    ]}
+
+
+def _gnews(params):
+    titles = _titles(params.get("q", ""), params.get("max", 10))
+    return {"articles": [
+        {
+            "title": f"News: {t}",
+            "description": synthetic_text("news " + t, n_sentences=3),
+            "url": f"https://news.example.org/{zlib.crc32(t.encode())}",
+        }
+        for t in titles
+    ]}
+
+
+# ==============================
+# 🔹 STORE
+# ==============================
+class SyntheticStore:
+    """SourceStore stand-in: lookup() synthesizes instead of reading recordings."""
+
+    path = "synthetic"
+
+    def lookup(self, url, params):
+        parts = urlsplit(url)
+        params = params or {}
+        if parts.netloc == "en.wikipedia.org":
+            if parts.path.startswith("/api/rest_v1/page/summary/"):
+                return _wiki_summary(parts.path)
+            return _wiki_api(params)
+        if parts.netloc == "api.openalex.org":
+            return _openalex(params)
+        if parts.netloc == "api.semanticscholar.org":
+            return _semantic_scholar(params)
+        if parts.netloc == "gnews.io":
+            return _gnews(params)
+        return None
+
+    def close(self):
+        pass
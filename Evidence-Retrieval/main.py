@@ -1,4 +1,5 @@
 from Pipelines.nltk_setup import setup_nltk
+from Pipelines.artifact_store import write_artifact
 from Pipelines.Wiki import wiki_pipeline
 from Pipelines.Scholar import scholar_pipeline
 from Pipelines.Gnews import gnews_pipeline
@@ -15,6 +16,11 @@ from Inference.deberta_nli import run_deberta_nli
 
 import os
 import json
+import asyncio
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from uuid import uuid4
 from dotenv import load_dotenv
@@ -23,28 +29,21 @@ load_dotenv()
 
 
 def save_docs_to_json(all_docs, query_id, query_text):
-    os.makedirs("outputs/documents", exist_ok=True)
-
-    file_path = f"outputs/documents/documents_{query_id}.json"
-
-    data = {
+    write_artifact("documents", "documents", query_id, {
         "query_id": query_id,
         "query_text": query_text,
         "total_docs": len(all_docs),
         "documents": all_docs
-    }
+    }, table_key="documents")
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
 
-    print(f"💾 Documents saved to: {file_path}")
+DEFAULT_CLAIM = "Lionel Messi won the FIFA World Cup with Argentina in 2022."
 
 
-def main():
+def run_single(query_text=DEFAULT_CLAIM):
     setup_nltk()
     setup_sentence_tokenizer()
 
-    query_text = "Lionel Messi won the FIFA World Cup with Argentina in 2022."
     query_id = f"q_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:6]}"
 
     all_docs = []
@@ -88,5 +87,145 @@ def main():
     )
 
 
+# =================================================
+# 🔹 OFFLINE BATCH MODE (JSONL in -> JSONL out)
+# =================================================
+def load_done_ids(output_path):
+    """
+    Ids already in `output_path` (the output doubles as the checkpoint).
+    A torn last line from an interrupted run is cut off; other lines
+    that do not parse are skipped, so later ids still count as done.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    valid_bytes = 0
+    with open(output_path, "rb") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.endswith(b"\n"):
+                break
+            valid_bytes += len(line)
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                print(f"⚠️ Skipping unreadable line {line_no} in {output_path}")
+                continue
+
+    with open(output_path, "r+b") as f:
+        f.truncate(valid_bytes)
+    return done
+
+
+def iter_claims(input_path, done):
+    """
+    Streams {"id", "claim"} rows; id defaults to the line number.
+    Rows that do not parse or have no claim are skipped with a warning.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                claim = row["claim"]
+            except (ValueError, KeyError, TypeError):
+                print(f"⚠️ Skipping unreadable line {line_no + 1} in {input_path}")
+                continue
+            if not isinstance(claim, str) or not claim.strip():
+                print(f"⚠️ Skipping line {line_no + 1} in {input_path}: no claim")
+                continue
+
+            claim_id = row.get("id", line_no)
+            if claim_id not in done:
+                yield {"id": claim_id, "claim": claim}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+async def run_batch(args):
+    # heavy pipeline imports only for this mode
+    from app.batch import init_worker, verify_documents_batch
+    from app.pipeline import collect_documents
+
+    setup_nltk()
+    done = load_done_ids(args.output)
+    if done:
+        print(f"↩️ Resuming: {len(done)} claims already in {args.output}")
+
+    loop = asyncio.get_running_loop()
+    fetch_slots = asyncio.Semaphore(args.fetch_concurrency)
+    threads_per_worker = max(1, (os.cpu_count() or 1) // args.workers)
+    stats = {"written": 0, "failed": 0}
+
+    async def fetch(item):
+        # source calls overlap across claims; the event loop never blocks on them
+        async with fetch_slots:
+            documents = await asyncio.to_thread(collect_documents, item["claim"], 10)
+        return {**item, "documents": documents}
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(threads_per_worker,)
+    ) as pool, open(args.output, "a", encoding="utf-8") as out:
+
+        async def process(chunk):
+            try:
+                items = await asyncio.gather(*(fetch(item) for item in chunk))
+                return await loop.run_in_executor(pool, verify_documents_batch, items)
+            except Exception as e:
+                # not written, so a rerun retries these claims
+                print(f"❌ Chunk of {len(chunk)} claims failed: {e}")
+                stats["failed"] += len(chunk)
+                return []
+
+        def write(results):
+            for result in results:
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            stats["written"] += len(results)
+
+        pending = set()
+        for chunk in chunked(iter_claims(args.input, done), args.chunk_size):
+            pending.add(asyncio.create_task(process(chunk)))
+
+            # enough work in flight to keep fetching ahead of the pool
+            if len(pending) >= args.workers * 2:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    write(task.result())
+                print(f"   ✔ {stats['written']} claims written")
+
+        for task in asyncio.as_completed(pending):
+            write(await task)
+
+    print(f"\n📦 Batch finished: {stats['written']} written, {stats['failed']} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Claim verification pipeline")
+    parser.add_argument("--claim", default=DEFAULT_CLAIM, help="verify one claim (default mode)")
+    parser.add_argument("--input", help="JSONL of {\"id\", \"claim\"} rows (batch mode)")
+    parser.add_argument("--output", default="outputs/batch_results.jsonl")
+    parser.add_argument("--workers", type=int, default=2, help="encoding / NLI processes")
+    parser.add_argument("--chunk-size", type=int, default=16, help="claims per worker batch")
+    parser.add_argument("--fetch-concurrency", type=int, default=8,
+                        help="claims fetching sources at once")
+    args = parser.parse_args()
+
+    if args.input:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        asyncio.run(run_batch(args))
+    else:
+        run_single(args.claim)
+
+
 if __name__ == "__main__":
     main()
@@ -106,12 +106,15 @@
 #                 )
 
 #                 st.divider()
+import json
+
 import streamlit as st
 import requests
 
 # ---------------- CONFIG ----------------
-VERIFY_API_URL = "http://127.0.0.1:8000/api/verify"
-CHAT_API_URL = "http://127.0.0.1:8000/api/chat"
+API_BASE_URL = "http://127.0.0.1:8000"
+VERIFY_JOBS_URL = f"{API_BASE_URL}/api/verify/jobs"
+CHAT_API_URL = f"{API_BASE_URL}/api/chat"
 
 st.set_page_config(
     page_title="Claim Verification System",
@@ -153,6 +156,30 @@ claim = st.text_area(
 
 verify_btn = st.button("Verify Claim")
 
+# ---------------- SSE HELPERS ----------------
+def iter_sse(response):
+    """(event, data) pairs from a text/event-stream response."""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = None, []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
+
+def show_evidence_preview(container, evidence):
+    with container.container():
+        st.markdown("**Top evidence (before NLI)**")
+        for idx, ev in enumerate(evidence, start=1):
+            st.markdown(f"{idx}. {ev['sentence_text']}  \n_{ev.get('title')} ({ev.get('source')})_")
+
+
 # ---------------- VERIFY API CALL ----------------
 if verify_btn:
     if not claim.strip():
@@ -162,25 +189,52 @@ if verify_btn:
     st.session_state.verified = False
     st.session_state.chat_history = []
 
-    with st.spinner("Running verification pipeline..."):
-        try:
-            response = requests.post(
-                VERIFY_API_URL,
-                json={"claim": claim},
-                timeout=300
-            )
+    progress = st.status("Running verification pipeline...", expanded=True)
+    preview = st.empty()
+    result = None
 
-            if response.status_code != 200:
-                st.error(f"Backend error: {response.status_code}")
-                st.stop()
+    try:
+        job = requests.post(VERIFY_JOBS_URL, json={"claim": claim}, timeout=30)
+        if job.status_code != 202:
+            st.error(f"Backend error: {job.status_code}")
+            st.stop()
+        job = job.json()
+
+        # stages arrive as they complete; no single long blocking call
+        with requests.get(
+            f"{API_BASE_URL}{job['events_url']}",
+            stream=True,
+            timeout=(10, 120)
+        ) as events:
+            for event, data in iter_sse(events):
+                if event == "documents":
+                    progress.write(f"Documents collected: {data['total_documents']}")
+                elif event == "sentences":
+                    progress.write(f"Sentences extracted: {data['total_sentences']}")
+                elif event == "evidence":
+                    progress.write("Evidence ranked, running NLI...")
+                    show_evidence_preview(preview, data["evidence"])
+                elif event == "result":
+                    result = data
+                elif event == "error":
+                    progress.update(state="error")
+                    st.error(f"Verification failed: {data.get('error')}")
+                    st.stop()
+
+    except requests.exceptions.RequestException as e:
+        progress.update(state="error")
+        st.error(f"Failed to connect to backend: {e}")
+        st.stop()
 
-            result = response.json()
-            st.session_state.result = result
-            st.session_state.verified = True
+    preview.empty()
+    if result is None or "error" in result:
+        progress.update(state="error")
+        st.error("Verification did not return a result.")
+        st.stop()
 
-        except requests.exceptions.RequestException as e:
-            st.error(f"Failed to connect to backend: {e}")
-            st.stop()
+    progress.update(label="Verification pipeline finished", state="complete", expanded=False)
+    st.session_state.result = result
+    st.session_state.verified = True
 
 # ---------------- SHOW VERIFICATION RESULT ----------------
 if st.session_state.verified and st.session_state.result:
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# modules are imported from the project root, as `uvicorn app.main:app` does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# no artifact writes, startup warmup or on-disk response cache from the modules under test
+os.environ.setdefault("PERSIST_ARTIFACTS", "0")
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+os.environ.setdefault("RESPONSE_CACHE_TIERS", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from Pipelines import artifact_store
+from Pipelines.artifact_store import ArtifactWriter, read_artifact, write_artifact
+
+
+PAYLOAD = {
+    "query_id": "q1",
+    "total": 2,
+    "sentences": [
+        {"sentence_id": "s0", "sentence_text": "Première phrase.", "score": 0.5},
+        {"sentence_id": "s1", "sentence_text": "Second sentence.", "score": 1.25},
+    ],
+}
+
+
+@pytest.fixture
+def outputs(monkeypatch, tmp_path):
+    monkeypatch.setattr(artifact_store, "OUTPUT_ROOT", str(tmp_path))
+    monkeypatch.setattr(artifact_store, "ARTIFACT_ASYNC", True)
+    writer = ArtifactWriter()
+    monkeypatch.setattr(artifact_store, "_writer", writer)
+    return writer
+
+
+@pytest.mark.parametrize("fmt,module", [
+    ("json", None), ("orjson", "orjson"), ("msgpack", "msgpack"), ("parquet", "pyarrow"),
+])
+def test_each_format_round_trips(outputs, fmt, module):
+    if module:
+        pytest.importorskip(module)
+
+    write_artifact("sentences", "sentences", "q1", PAYLOAD, table_key="sentences", fmt=fmt)
+    artifact = read_artifact("sentences", "sentences", "q1")
+
+    assert artifact.path.endswith("." + artifact_store.EXTENSIONS[fmt])
+    assert artifact["query_id"] == "q1" and artifact["total"] == 2
+    assert artifact["sentences"] == PAYLOAD["sentences"]
+
+
+@pytest.mark.parametrize("fmt", ["json", "orjson"])
+def test_json_artifacts_are_compact(outputs, tmp_path, fmt):
+    if fmt == "orjson":
+        pytest.importorskip("orjson")
+    write_artifact("bm25", "bm25_scores", "q1", PAYLOAD, fmt=fmt)
+    outputs.flush(5)
+
+    raw = (tmp_path / "bm25" / "bm25_scores_q1.json").read_bytes()
+    assert b"\n" not in raw and b'": ' not in raw
+
+
+def test_orjson_is_the_default_when_installed():
+    pytest.importorskip("orjson")
+    assert artifact_store.default_format() == "orjson"
+
+
+def test_read_waits_for_the_pending_write(outputs, monkeypatch):
+    release = threading.Event()
+    write_file = artifact_store._write_file
+
+    def slow_write(base, fmt, data):
+        assert release.wait(5)
+        write_file(base, fmt, data)
+
+    monkeypatch.setattr(artifact_store, "_write_file", slow_write)
+    write_artifact("fusion", "final_ranked_sentences", "q1", PAYLOAD)
+
+    reader = {}
+    thread = threading.Thread(target=lambda: reader.update(
+        artifact=read_artifact("fusion", "final_ranked_sentences", "q1")
+    ))
+    thread.start()
+    thread.join(0.1)
+    assert thread.is_alive()        # blocked on the queued write, not FileNotFoundError
+
+    release.set()
+    thread.join(5)
+    assert reader["artifact"]["total"] == 2
+
+
+def test_full_queue_writes_inline_instead_of_dropping(monkeypatch, tmp_path):
+    monkeypatch.setattr(artifact_store, "OUTPUT_ROOT", str(tmp_path))
+    monkeypatch.setattr(artifact_store, "ARTIFACT_ASYNC", True)
+    writer = ArtifactWriter(max_bytes=64)
+    monkeypatch.setattr(artifact_store, "_writer", writer)
+
+    # park the writer thread so queued bytes stay queued
+    release = threading.Event()
+    writer.submit(lambda: release.wait(5))
+
+    for i in range(5):
+        write_artifact("sentences", "sentences", f"q{i}", PAYLOAD)
+
+    # the first fits the (empty) queue, the rest are over the byte budget
+    assert writer.inline_writes == 4
+    assert writer.queued_bytes() > 0
+    for i in range(1, 5):
+        assert read_artifact("sentences", "sentences", f"q{i}")["total"] == 2
+
+    release.set()
+    assert read_artifact("sentences", "sentences", "q0")["total"] == 2
+    writer.flush(5)
+    assert writer.queued_bytes() == 0
+
+
+def test_housekeeping_runs_after_queued_writes(monkeypatch, tmp_path):
+    monkeypatch.setattr(artifact_store, "OUTPUT_ROOT", str(tmp_path))
+    writer = ArtifactWriter(max_bytes=1)
+    monkeypatch.setattr(artifact_store, "_writer", writer)
+    order = []
+
+    release = threading.Event()
+    writer.submit(lambda: (release.wait(5), order.append("write")), base="b", size=10)
+    writer.submit(lambda: order.append("cleanup"))       # size 0: queued even when full
+    release.set()
+    writer.flush(5)
+
+    assert order == ["write", "cleanup"]
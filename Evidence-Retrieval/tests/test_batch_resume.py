@@ -0,0 +1,70 @@
+import json
+
+from main import iter_claims, load_done_ids
+
+
+def write_lines(path, lines):
+    path.write_bytes(b"".join(lines))
+
+
+def result(claim_id):
+    return (json.dumps({"id": claim_id, "label": "SUPPORTED"}) + "\n").encode("utf-8")
+
+
+def test_missing_output_means_nothing_done(tmp_path):
+    assert load_done_ids(str(tmp_path / "out.jsonl")) == set()
+
+
+def test_torn_last_line_is_cut_off_in_place(tmp_path):
+    out = tmp_path / "out.jsonl"
+    write_lines(out, [result("a"), result("b"), b'{"id": "c", "lab'])
+
+    assert load_done_ids(str(out)) == {"a", "b"}
+    assert out.read_bytes() == result("a") + result("b")
+
+    # appending after the cut leaves a readable file
+    with open(out, "ab") as f:
+        f.write(result("c"))
+    assert load_done_ids(str(out)) == {"a", "b", "c"}
+
+
+def test_bad_middle_line_is_skipped_not_truncated(tmp_path, capsys):
+    out = tmp_path / "out.jsonl"
+    lines = [result("a"), b"not json\n", b'{"label": "no id"}\n', result("d")]
+    write_lines(out, lines)
+
+    assert load_done_ids(str(out)) == {"a", "d"}
+    assert out.read_bytes() == b"".join(lines)
+    assert "line 2" in capsys.readouterr().out
+
+
+def test_iter_claims_skips_bad_rows(tmp_path, capsys):
+    claims = tmp_path / "claims.jsonl"
+    claims.write_text("\n".join([
+        json.dumps({"id": "a", "claim": "First claim."}),
+        json.dumps({"id": "b", "text": "no claim field"}),
+        "{broken",
+        json.dumps(["not", "an", "object"]),
+        json.dumps({"id": "e", "claim": "  "}),
+        "",
+        json.dumps({"claim": "Id from the line number."}),
+    ]) + "\n", encoding="utf-8")
+
+    rows = list(iter_claims(str(claims), done=set()))
+    assert rows == [
+        {"id": "a", "claim": "First claim."},
+        {"id": 6, "claim": "Id from the line number."},
+    ]
+    assert capsys.readouterr().out.count("Skipping") == 4
+
+
+def test_resume_skips_ids_already_written(tmp_path):
+    claims = tmp_path / "claims.jsonl"
+    claims.write_text("".join(
+        json.dumps({"id": f"c{i}", "claim": f"Claim {i}."}) + "\n" for i in range(5)
+    ), encoding="utf-8")
+    out = tmp_path / "out.jsonl"
+    write_lines(out, [result("c0"), result("c2"), b'{"id": "c3"'])     # interrupted run
+
+    done = load_done_ids(str(out))
+    assert [row["id"] for row in iter_claims(str(claims), done)] == ["c1", "c3", "c4"]
@@ -0,0 +1,109 @@
+import argparse
+import json
+
+import pytest
+
+from app import pipeline, warmup
+from app.pipeline_context import PipelineContext
+from benchmarks import run_benchmarks
+from benchmarks.synthetic_sources import SyntheticStore
+from Pipelines import source_adapter
+from Pipelines.http_client import get_json
+from Pipelines.Scholar import scholar_pipeline
+from Pipelines.Wiki import get_page_summaries, search_wikipedia
+
+
+@pytest.fixture
+def synthetic_adapter():
+    adapter = source_adapter.install("replay", faults=source_adapter.Faults(0, 0, 0, 0),
+                                     store=SyntheticStore())
+    yield adapter
+    source_adapter.install("live")
+
+
+def fake_pipeline(claim, query_id=None, on_stage=None):
+    """Source fan-out through the adapter plus timed stages, no models."""
+    ctx = PipelineContext(query_id or "q", claim)
+    with ctx.stage("fetch"):
+        hits = get_json("https://en.wikipedia.org/w/api.php",
+                        params={"action": "query", "list": "search", "srsearch": claim,
+                                "format": "json", "srlimit": 5})
+        ctx.documents = hits["query"]["search"]
+    with ctx.stage("bm25"):
+        ctx.bm25_scores = [len(d["title"]) for d in ctx.documents]
+    return {"query_id": ctx.query_id, "verdict": "SUPPORTED"}
+
+
+def test_synthetic_sources_parse_like_the_real_apis(synthetic_adapter):
+    claim = "Python was first released in 1991."
+
+    results = search_wikipedia("python released", limit=5)
+    assert results and all(r["title"] for r in results)
+    summaries = get_page_summaries([r["title"] for r in results])
+    assert set(summaries) == {r["title"] for r in results}
+    assert all(s["extract"] for s in summaries.values())
+
+    docs = scholar_pipeline(claim, limit=5)
+    assert docs and all(d["text"] for d in docs)
+    # deterministic: the same request gets the same body
+    assert scholar_pipeline(claim, limit=5) == docs
+    assert synthetic_adapter.stats["misses"] == 0
+
+
+def test_run_benchmark_over_synthetic_sources(synthetic_adapter, monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "verify_claim_pipeline", fake_pipeline)
+    monkeypatch.setattr(warmup, "run_warmup", lambda: None)
+    monkeypatch.setattr("app.explainability_chatbot.get_explainability_index", lambda query_id: None)
+
+    claims = tmp_path / "claims.jsonl"
+    claims.write_text("\n".join(json.dumps({"claim": c}) for c in ["Water boils at 100 C.", "Apollo 11 landed."]))
+    args = argparse.Namespace(claims=str(claims), iterations=3, warmup=1)
+
+    report = run_benchmarks.run_benchmark(args, synthetic_adapter)
+
+    assert report["runs"] == 6 and report["failures"] == 0
+    assert report["fixture_hits"] == 6 and report["fixture_misses"] == 0
+    assert report["meta"]["sources"] == "synthetic"
+    assert set(report["stages"]) == {"fetch", "bm25", "total"}
+    assert report["stages"]["total"]["count"] == 6
+    assert report["stages"]["fetch"]["p50_ms"] <= report["stages"]["fetch"]["p95_ms"]
+
+    # a run against itself is never a regression
+    assert run_benchmarks.compare_to_baseline(report, report, 0.10) == []
+
+
+def stage_report(sources, p50):
+    return {
+        "meta": {"timestamp": "t", "sources": sources},
+        "stages": {"nli": {"p50_ms": p50, "p95_ms": p50}},
+    }
+
+
+def test_compare_flags_regressions_over_the_same_sources():
+    regressions = run_benchmarks.compare_to_baseline(
+        stage_report("synthetic", 30.0), stage_report("synthetic", 10.0), 0.10
+    )
+    assert {r["metric"] for r in regressions} == {"p50_ms", "p95_ms"}
+
+    # baselines over recorded sources are not compared with synthetic runs
+    assert run_benchmarks.compare_to_baseline(
+        stage_report("synthetic", 30.0), stage_report("recorded", 10.0), 0.10
+    ) == []
+
+
+def test_fresh_checkout_runs_offline_and_checks_regressions(monkeypatch, tmp_path):
+    monkeypatch.setattr(pipeline, "verify_claim_pipeline", fake_pipeline)
+    monkeypatch.setattr(warmup, "run_warmup", lambda: None)
+    monkeypatch.setattr("app.explainability_chatbot.get_explainability_index", lambda query_id: None)
+
+    argv = [
+        "--fixtures", str(tmp_path / "missing.sqlite3"),
+        "--baseline", str(tmp_path / "baseline.json"),
+        "--output", str(tmp_path / "latest.json"),
+        "--iterations", "1", "--warmup", "0",
+        "--tolerance", "1000",
+    ]
+    assert run_benchmarks.main(argv) == 0       # no fixtures, no baseline: stores one
+    assert json.loads((tmp_path / "baseline.json").read_text())["meta"]["sources"] == "synthetic"
+    assert run_benchmarks.main(argv) == 0       # compared against it
+    assert source_adapter.get_adapter() is None
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from Retrieval.bm25_engine import BM25Engine, tokenize
+from Retrieval.bm25_retriever import bm25_results, bm25_score_array
+
+
+CORPUS = [
+    "Lionel Messi won the FIFA World Cup with Argentina in 2022.",
+    "Argentina beat France on penalties in the final.",
+    "The World Cup final was played in Lusail, Qatar.",
+    "Messi was named player of the tournament.",
+    "France reached the final for the second time in a row.",
+    "Kylian Mbappe scored a hat-trick in the final.",
+]
+QUERIES = [
+    "Messi won the World Cup in 2022",
+    "France final penalties",
+    "who scored in the final",
+    "unrelated words only",
+]
+
+
+@pytest.mark.parametrize("variant,reference", [("okapi", "BM25Okapi"), ("bm25plus", "BM25Plus")])
+def test_scores_match_rank_bm25(variant, reference):
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    corpus = [tokenize(text) for text in CORPUS]
+    expected = getattr(rank_bm25, reference)(corpus)
+
+    engine = BM25Engine(variant)
+    engine.add_documents(CORPUS)
+
+    for query in QUERIES:
+        np.testing.assert_allclose(
+            engine.get_scores(query), expected.get_scores(tokenize(query)), rtol=1e-9, atol=1e-12
+        )
+
+
+def test_batch_scores_match_single_queries():
+    engine = BM25Engine()
+    engine.add_documents(CORPUS)
+
+    batch = engine.get_batch_scores(QUERIES)
+    for row, query in zip(batch, QUERIES):
+        np.testing.assert_allclose(row, engine.get_scores(query))
+
+
+def test_incremental_add_matches_one_shot_build():
+    incremental = BM25Engine()
+    incremental.add_documents(CORPUS[:3])
+    incremental.get_scores("warm the weights")
+    incremental.add_documents(CORPUS[3:])
+
+    one_shot = BM25Engine()
+    one_shot.add_documents(CORPUS)
+
+    for query in QUERIES:
+        np.testing.assert_allclose(incremental.get_scores(query), one_shot.get_scores(query))
+
+
+def test_empty_corpus_and_unknown_variant():
+    assert BM25Engine().get_batch_scores(["anything"]).shape == (1, 0)
+    with pytest.raises(ValueError):
+        BM25Engine("bm99")
+
+
+def test_score_array_is_aligned_with_sentences():
+    sentences = [
+        {"query_id": "q", "sentence_id": f"s{i}", "sentence_text": text}
+        for i, text in enumerate(CORPUS)
+    ]
+    scores = bm25_score_array(QUERIES[0], sentences)
+    records = bm25_results(scores, sentences)
+
+    assert [r["sentence_id"] for r in records] == [s["sentence_id"] for s in sentences]
+    assert int(np.argmax(scores)) == 0
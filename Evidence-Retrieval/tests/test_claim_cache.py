@@ -0,0 +1,222 @@
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from app import claim_cache, explainability_chatbot
+from app.claim_cache import ClaimResultCache, claim_signature, verify_with_cache
+
+
+class FakeEncoder:
+    """Every claim embeds to the same unit vector: cosine is always 1."""
+
+    def encode(self, texts, normalize_embeddings=False):
+        return np.ones((len(texts), 4), dtype=np.float32) / 2
+
+
+class Pins:
+    def __init__(self):
+        self.pinned = []
+        self.unpinned = []
+
+    def pin(self, query_id):
+        self.pinned.append(query_id)
+        return True
+
+    def unpin(self, query_id):
+        self.unpinned.append(query_id)
+
+
+class Pipeline:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, claim, query_id=None, on_stage=None):
+        self.calls.append(claim)
+        return {"query_id": query_id or f"q{len(self.calls)}", "claim": claim, "verdict": "SUPPORTED"}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    pins = Pins()
+    fresh = ClaimResultCache(max_entries=3, ttl=60, similarity=0.95, pin=pins.pin, unpin=pins.unpin)
+    fresh.pins = pins
+    fresh.pipeline = Pipeline()
+
+    monkeypatch.setattr(claim_cache, "CLAIM_CACHE", fresh)
+    monkeypatch.setattr(claim_cache, "CLAIM_CACHE_ENABLED", True)
+    monkeypatch.setattr(claim_cache, "CLAIM_CACHE_SEMANTIC", True)
+    monkeypatch.setattr(claim_cache, "_in_flight", {})
+    monkeypatch.setattr(claim_cache, "active_encoder", lambda: ("fake", FakeEncoder()))
+    monkeypatch.setattr(claim_cache, "verify_claim_pipeline", fresh.pipeline)
+    return fresh
+
+
+# -----------------------------------------------------
+# Hits and misses
+# -----------------------------------------------------
+def test_exact_hit_answers_for_the_submitted_claim(cache):
+    first = verify_with_cache("Messi won the World Cup in 2022.")
+    second = verify_with_cache("messi  won the world cup in 2022")
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["cache_match"]["level"] == "exact"
+    assert second["claim"] == "messi  won the world cup in 2022"
+    assert second["query_id"] == first["query_id"]
+    assert len(cache.pipeline.calls) == 1
+
+
+def test_semantic_hit_for_a_reworded_claim(cache):
+    verify_with_cache("Messi won the World Cup in 2022")
+    reworded = verify_with_cache("In 2022 Messi won the World Cup")
+
+    assert reworded["cache_match"]["level"] == "semantic"
+    assert reworded["cache_match"]["original_claim"] == "Messi won the World Cup in 2022"
+    assert reworded["claim"] == "In 2022 Messi won the World Cup"
+    assert cache.stats()["semantic_hits"] == 1
+
+
+@pytest.mark.parametrize("other", [
+    "Messi won the World Cup in 2018",          # number
+    "Ronaldo won the World Cup in 2022",        # name
+    "ronaldo won the world cup in 2022",        # name, all lowercase
+    "Messi did not win the World Cup in 2022",  # negation
+    "Messi lost the World Cup in 2022",         # antonym
+    "Messi won the World Cup before 2022",      # before / in
+])
+def test_semantic_level_never_matches_across_signatures(cache, other):
+    verify_with_cache("Messi won the World Cup in 2022")
+    response = verify_with_cache(other)
+
+    assert response["cached"] is False
+    assert len(cache.pipeline.calls) == 2
+
+
+def test_claim_signature_parts():
+    negations, numbers, words = claim_signature("Messi didn't score 1,000 goals for Inter Miami.")
+    assert negations == {"not"}
+    assert numbers == {"1,000"}
+    assert words == {"messi", "score", "goals", "inter", "miami"}
+
+
+@pytest.mark.parametrize("a,b", [
+    ("Prices increased after the merger", "Prices decreased after the merger"),
+    ("The bridge was built before the war", "The bridge was built after the war"),
+    ("coffee causes dehydration", "coffee prevents dehydration"),
+])
+def test_antonyms_have_different_signatures(a, b):
+    assert claim_signature(a) != claim_signature(b)
+
+
+def test_rewordings_share_a_signature():
+    assert claim_signature("In 2022 Messi won the World Cup") == \
+        claim_signature("messi won the world cup in 2022!")
+    assert claim_signature("The Eiffel Tower is in Paris") == claim_signature("Eiffel Tower, Paris")
+
+
+def test_semantic_hits_need_the_same_encoder(cache):
+    cache.put("a claim", "A claim", {"query_id": "q1"}, np.ones(4, dtype=np.float32) / 2, "other-encoder")
+    assert cache.get_similar(np.ones(4, dtype=np.float32) / 2, "fake", claim_signature("A claim")) is None
+
+
+def test_misses_are_counted_with_semantic_level_off(cache, monkeypatch):
+    monkeypatch.setattr(claim_cache, "CLAIM_CACHE_SEMANTIC", False)
+    verify_with_cache("Messi won the World Cup in 2022")
+    verify_with_cache("In 2022 Messi won the World Cup")
+
+    assert cache.stats() == {"entries": 2, "exact_hits": 0, "semantic_hits": 0, "misses": 2}
+
+
+def test_failed_runs_are_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(claim_cache, "verify_claim_pipeline", lambda claim, **kw: {"error": "no evidence"})
+    verify_with_cache("Messi won the World Cup in 2022")
+    assert cache.stats()["entries"] == 0
+    assert cache.pins.pinned == []
+
+
+# -----------------------------------------------------
+# Explainability pins
+# -----------------------------------------------------
+def test_entries_pin_their_index_until_dropped(cache):
+    for i in range(3):
+        cache.put(f"claim {i}", f"Claim {i}", {"query_id": f"q{i}"})
+    assert cache.pins.pinned == ["q0", "q1", "q2"]
+
+    cache.put("claim 1", "Claim 1", {"query_id": "q1b"})   # replace
+    cache.put("claim 3", "Claim 3", {"query_id": "q3"})    # evicts the oldest
+    assert cache.pins.unpinned == ["q1", "q0"]
+
+
+def test_expired_entries_release_their_pin(cache):
+    cache.put("claim", "Claim", {"query_id": "q1"}, np.ones(4, dtype=np.float32) / 2, "fake")
+    cache._entries["claim"]["cached_at"] -= 120
+
+    assert cache.get_similar(np.ones(4, dtype=np.float32) / 2, "fake", claim_signature("Claim")) is None
+    assert cache.get("claim") is None
+    assert cache.pins.unpinned == ["q1"]
+
+
+def test_pinned_index_is_rebuilt_after_eviction(monkeypatch):
+    monkeypatch.setattr(explainability_chatbot, "_recent_inputs", OrderedDict())
+    monkeypatch.setattr(explainability_chatbot, "_pinned_inputs", {})
+    monkeypatch.setattr(explainability_chatbot, "_load_saved_index", lambda query_id: None)
+    rebuilt = []
+
+    def fake_build(query_id, texts, vectors, metadatas, encoder_name=None):
+        rebuilt.append((query_id, texts, vectors, encoder_name))
+        with explainability_chatbot._pending_lock:
+            explainability_chatbot._pending_builds.pop(query_id, None)
+        return "vectorstore"
+
+    monkeypatch.setattr(explainability_chatbot, "_build_index", fake_build)
+
+    assert explainability_chatbot.pin_index("q-unknown") is False
+    explainability_chatbot._remember_inputs("q-pin", ["a", "b"], [{}, {}], "enc")
+    assert explainability_chatbot.pin_index("q-pin") is True
+    assert explainability_chatbot.pin_index("q-pin") is True
+
+    assert explainability_chatbot.get_explainability_index("q-pin") == "vectorstore"
+    assert rebuilt == [("q-pin", ["a", "b"], None, "enc")]
+
+    explainability_chatbot.unpin_index("q-pin")
+    assert "q-pin" in explainability_chatbot._pinned_inputs
+    explainability_chatbot.unpin_index("q-pin")
+    assert explainability_chatbot.get_explainability_index("q-pin") is None
+
+
+# -----------------------------------------------------
+# In-flight dedupe
+# -----------------------------------------------------
+def test_concurrent_identical_claims_share_one_run(cache, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_pipeline(claim, query_id=None, on_stage=None):
+        calls.append(claim)
+        started.set()
+        assert release.wait(5)
+        return {"query_id": "q-leader", "claim": claim, "verdict": "SUPPORTED"}
+
+    monkeypatch.setattr(claim_cache, "verify_claim_pipeline", slow_pipeline)
+    results = {}
+
+    def run(name, claim):
+        results[name] = verify_with_cache(claim)
+
+    leader = threading.Thread(target=run, args=("leader", "Messi won in 2022"))
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=run, args=("follower", "messi won in 2022!"))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert calls == ["Messi won in 2022"]
+    assert results["follower"]["cache_match"]["level"] == "in_flight"
+    assert results["follower"]["claim"] == "messi won in 2022!"
+    assert results["follower"]["query_id"] == "q-leader"
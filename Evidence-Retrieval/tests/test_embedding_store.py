@@ -0,0 +1,142 @@
+import os
+
+import numpy as np
+import pytest
+
+from Retrieval.embedding_store import KEY_BYTES, EmbeddingStore
+
+
+class FakeEncoder:
+    """Deterministic vectors per text; counts what actually reached the model."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.seen = []
+
+    def vector(self, text):
+        rng = np.random.default_rng(sum(map(ord, text)) * 7919 + len(text))
+        return rng.standard_normal(self.dim).astype(np.float32)
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return np.stack([self.vector(t) for t in texts])
+
+
+TEXTS = [f"sentence number {i}" for i in range(6)]
+
+
+def store(tmp_path, **kwargs):
+    kwargs.setdefault("dim", 8)
+    return EmbeddingStore("fake/model", directory=str(tmp_path), **kwargs)
+
+
+def test_misses_are_encoded_once_and_then_hit(tmp_path):
+    encoder = FakeEncoder()
+    s = store(tmp_path)
+
+    first = s.encode(TEXTS + TEXTS[:2], encoder)
+    again = s.encode(TEXTS, encoder)
+
+    assert encoder.seen == TEXTS
+    np.testing.assert_array_equal(first[:6], again)
+    np.testing.assert_array_equal(first[6:], first[:2])
+    np.testing.assert_allclose(again, encoder(TEXTS))
+    # repeats inside one call count as misses but reach the model once
+    assert s.stats() == {"hits": 6, "misses": 8, "rows": 6}
+
+
+def test_hit_after_restart_from_disk(tmp_path):
+    encoder = FakeEncoder()
+    expected = store(tmp_path).encode(TEXTS, encoder)
+
+    reopened = store(tmp_path)
+    restarted = FakeEncoder()
+    np.testing.assert_array_equal(reopened.encode(TEXTS, restarted), expected)
+    assert restarted.seen == []
+
+
+def test_lru_eviction_falls_back_to_the_mmap(tmp_path):
+    encoder = FakeEncoder()
+    s = store(tmp_path, lru_size=2)
+    expected = s.encode(TEXTS, encoder)
+
+    assert len(s._lru) == 2
+    np.testing.assert_array_equal(s.encode(TEXTS, encoder), expected)
+    assert encoder.seen == TEXTS
+
+
+def test_float16_hits_equal_the_first_answer(tmp_path):
+    encoder = FakeEncoder()
+    s = store(tmp_path, dtype="float16")
+    first = s.encode(TEXTS, encoder)
+
+    np.testing.assert_array_equal(store(tmp_path, dtype="float16").encode(TEXTS, encoder), first)
+    np.testing.assert_allclose(first, encoder(TEXTS), rtol=1e-3, atol=1e-3)
+    assert os.path.getsize(s.vec_path) == len(TEXTS) * 8 * 2
+
+
+def test_torn_final_vector_row_is_dropped_and_realigned(tmp_path):
+    encoder = FakeEncoder()
+    s = store(tmp_path)
+    s.encode(TEXTS[:3], encoder)
+
+    # crash mid-append: half a vector row, no key
+    with open(s.vec_path, "ab") as f:
+        f.write(b"\x01" * (s.row_bytes // 2))
+
+    reopened = store(tmp_path)
+    more = reopened.encode(TEXTS[3:], encoder)
+    np.testing.assert_allclose(more, encoder(TEXTS[3:]))
+
+    fresh = store(tmp_path)
+    np.testing.assert_allclose(fresh.encode(TEXTS, FakeEncoder()), encoder(TEXTS))
+    assert os.path.getsize(s.vec_path) == 6 * s.row_bytes
+    assert os.path.getsize(s.key_path) == 6 * KEY_BYTES
+
+
+def test_torn_final_key_is_ignored(tmp_path):
+    encoder = FakeEncoder()
+    s = store(tmp_path)
+    s.encode(TEXTS[:3], encoder)
+
+    # vector row written, key cut short
+    with open(s.vec_path, "ab") as f:
+        f.write(encoder([TEXTS[3]]).tobytes())
+    with open(s.key_path, "ab") as f:
+        f.write(b"\x02" * (KEY_BYTES // 2))
+
+    reopened = store(tmp_path)
+    assert reopened.stats()["rows"] == 3
+    np.testing.assert_allclose(reopened.encode(TEXTS, encoder), encoder(TEXTS))
+    np.testing.assert_allclose(store(tmp_path).encode(TEXTS, FakeEncoder()), encoder(TEXTS))
+
+
+def test_keys_without_vectors_are_never_served(tmp_path):
+    encoder = FakeEncoder()
+    s = store(tmp_path)
+    s.encode(TEXTS[:4], encoder)
+
+    # vector file lost its last rows (disk full, partial copy)
+    with open(s.vec_path, "r+b") as f:
+        f.truncate(2 * s.row_bytes)
+
+    reopened = store(tmp_path)
+    counted = FakeEncoder()
+    np.testing.assert_allclose(reopened.encode(TEXTS[:4], counted), encoder(TEXTS[:4]))
+    assert counted.seen == TEXTS[2:4]
+    np.testing.assert_allclose(store(tmp_path).encode(TEXTS[:4], FakeEncoder()), encoder(TEXTS[:4]))
+
+
+@pytest.mark.parametrize("other", [
+    {"model_id": "fake_model", "dim": 8},       # same file slug, different model
+    {"model_id": "fake/model", "dim": 4},       # same model, different dim
+])
+def test_other_model_or_dim_is_not_served(tmp_path, other):
+    store(tmp_path).encode(TEXTS, FakeEncoder())
+
+    encoder = FakeEncoder(other["dim"])
+    s = EmbeddingStore(other["model_id"], other["dim"], directory=str(tmp_path))
+    out = s.encode(TEXTS, encoder)
+
+    assert encoder.seen == TEXTS
+    assert out.shape == (len(TEXTS), other["dim"])
@@ -0,0 +1,172 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from langchain_core.embeddings import Embeddings
+
+from app import explainability_chatbot as chatbot
+from app.explainability_cache import ExplainabilityIndexCache
+
+DIM = 8
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic vectors per text; counts what would reach the encoder."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.embedded = []
+        self.gate = None
+        self.entered = threading.Event()
+
+    def embed_documents(self, texts):
+        self.entered.set()
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        self.embedded.append(list(texts))
+        return [vector(t).tolist() for t in texts]
+
+    def embed_query(self, text):
+        return vector(text).tolist()
+
+
+def vector(text):
+    rng = np.random.default_rng(sum(map(ord, text)))
+    v = rng.standard_normal(DIM).astype(np.float32)
+    return v / np.linalg.norm(v)
+
+
+def make_sentences(query):
+    return [
+        {"sentence_id": f"{query}-s{i}", "sentence_text": f"{query} sentence {i}",
+         "doc_id": f"{query}-d{i % 2}", "source": "wikipedia", "title": "t", "url": "u"}
+        for i in range(6)
+    ]
+
+
+@pytest.fixture
+def explain(monkeypatch, tmp_path):
+    embeddings = {}
+
+    def get_embeddings(model_name=None):
+        model_name = model_name or chatbot.active_encoder_name()
+        return embeddings.setdefault(model_name, FakeEmbeddings(model_name))
+
+    monkeypatch.setattr(chatbot, "get_embeddings", get_embeddings)
+    monkeypatch.setattr(chatbot, "active_encoder_name", lambda: "enc-active")
+    monkeypatch.setattr(chatbot, "INDEX_CACHE", ExplainabilityIndexCache(max_entries=1))
+    monkeypatch.setattr(chatbot, "PERSIST_ARTIFACTS", False)
+    monkeypatch.setattr(chatbot, "FAISS_BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(chatbot, "_recent_inputs", OrderedDict())
+    monkeypatch.setattr(chatbot, "_pinned_inputs", {})
+    monkeypatch.setattr(chatbot, "_pending_builds", {})
+    return get_embeddings
+
+
+def build(query, rng):
+    sentences = make_sentences(query)
+    vectors = rng.standard_normal((len(sentences), DIM)).astype(np.float32)
+    ranked = [{"doc_id": f"{query}-d0"}]
+    chatbot.build_explainability_index(query, top_k=1, sentences=sentences, embeddings=vectors,
+                                       ranked=ranked, encoder_name="enc-a")
+    return sentences, vectors
+
+
+def test_background_build_uses_the_retrieval_vectors(explain):
+    sentences, vectors = build("q1", np.random.default_rng(0))
+
+    store = chatbot.get_explainability_index("q1")
+    rows = [i for i, s in enumerate(sentences) if s["doc_id"] == "q1-d0"]
+
+    assert store.index.ntotal == len(rows)
+    np.testing.assert_array_equal(store.index.reconstruct_n(0, len(rows)), vectors[rows])
+    assert explain("enc-a").embedded == []      # nothing re-embedded
+    assert store.embedding_function.model_name == "enc-a"
+    assert {d.metadata["sentence_id"] for d in store.docstore._dict.values()} == \
+        {sentences[i]["sentence_id"] for i in rows}
+
+
+def test_pin_keeps_an_evicted_index_rebuildable(explain, monkeypatch):
+    monkeypatch.setattr(chatbot, "RECENT_INDEX_INPUTS", 1)
+    rng = np.random.default_rng(1)
+    build("q1", rng)
+    chatbot.get_explainability_index("q1")
+    assert chatbot.pin_index("q1")
+
+    # q2 evicts q1 from the index cache (1 entry) and from the recent inputs
+    build("q2", rng)
+    chatbot.get_explainability_index("q2")
+    assert "q1" not in chatbot._recent_inputs
+
+    # rebuild is parked inside the encoder while the claim cache drops the entry
+    encoder = explain("enc-a")
+    encoder.gate = threading.Event()
+    results = []
+    chats = [threading.Thread(target=lambda: results.append(chatbot.get_explainability_index("q1")))
+             for _ in range(2)]
+    for chat in chats:
+        chat.start()
+    assert encoder.entered.wait(5)
+    chatbot.unpin_index("q1")
+    encoder.gate.set()
+    for chat in chats:
+        chat.join(5)
+
+    # both chats got the one rebuild, re-embedded from the pinned texts
+    assert len(results) == 2 and results[0] is results[1] is not None
+    assert encoder.embedded == [[f"q1 sentence {i}" for i in (0, 2, 4)]]
+
+    # unpinned and evicted again: nothing left to rebuild from
+    chatbot.get_explainability_index("q2")
+    encoder.gate = None
+    build("q3", rng)
+    chatbot.get_explainability_index("q3")
+    assert chatbot.get_explainability_index("q1") is None
+
+
+def test_disk_fallback_embeds_questions_with_the_saved_encoder(explain, tmp_path):
+    from langchain_community.vectorstores import FAISS
+
+    query_id = "q_20240101_120000_abc123"
+    texts = ["water boils at 100 C", "ice melts at 0 C"]
+    store = FAISS.from_embeddings(list(zip(texts, [vector(t).tolist() for t in texts])),
+                                  explain("enc-a"))
+    chatbot._save_index(query_id, store, "enc-a")
+
+    loaded = chatbot.get_explainability_index(query_id)
+    assert loaded.embedding_function.model_name == "enc-a"     # not the active encoder
+    assert loaded.similarity_search("water boils at 100 C", k=1)[0].page_content == texts[0]
+
+    # saved before encoder.json existed: falls back to the active encoder
+    os.remove(tmp_path / query_id / chatbot.ENCODER_FILE)
+    chatbot.INDEX_CACHE.put("other", store)     # evicts the loaded copy
+    assert chatbot.get_explainability_index(query_id).embedding_function.model_name == "enc-active"
+
+    assert chatbot.get_explainability_index("../" + query_id) is None
+
+
+class FakeStore:
+    def __init__(self, rows):
+        self.index = type("Index", (), {"ntotal": rows, "d": DIM})()
+        self.docstore = type("Docstore", (), {"_dict": {}})()
+
+
+def test_index_cache_bounds_bytes_and_expires():
+    cache = ExplainabilityIndexCache(max_entries=8, max_bytes=3 * 10 * DIM * 4, ttl=60)
+    for q in ("a", "b", "c", "d"):
+        cache.put(q, FakeStore(10))
+    assert cache.get("a") is None and cache.get("d") is not None
+    assert cache.stats()["bytes"] == 3 * 10 * DIM * 4
+
+    cache.put("huge", FakeStore(1000))          # over budget alone: kept, everything else evicted
+    assert cache.stats()["entries"] == 1
+
+    cache._entries["huge"][2] -= 120
+    assert cache.get("huge") is None
+    assert cache.stats() == {"entries": 0, "bytes": 0, "hits": 1, "misses": 2}
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from Retrieval.faiss_retriever import DenseScores, dense_search
+from Retrieval.fusion_and_ranking import fuse_scores, reciprocal_ranks, top_k_indices
+
+
+def make_sentences(n):
+    return [
+        {
+            "query_id": "q",
+            "sentence_id": f"s{i}",
+            "sentence_text": f"sentence {i}",
+            "doc_id": f"d{i % 3}",
+            "source": "wikipedia",
+            "title": "t",
+            "url": "u",
+        }
+        for i in range(n)
+    ]
+
+
+def reference_fusion(bm25, dense, alpha, top_k):
+    """The pre-vectorization loop: min-max both sides, weighted sum, sort."""
+    def min_max(values):
+        lo, hi = min(values), max(values)
+        return [0.0] * len(values) if hi == lo else [(v - lo) / (hi - lo) for v in values]
+
+    fused = [alpha * x + (1 - alpha) * y for x, y in zip(min_max(bm25), min_max(dense))]
+    order = sorted(range(len(fused)), key=lambda i: fused[i], reverse=True)
+    return [(f"s{i}", fused[i]) for i in order[:top_k]]
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(7)
+    return rng.random(40) * 12, rng.random(40) * 2 - 1
+
+
+def test_weighted_matches_reference_loop(scores):
+    bm25, dense = scores
+    sentences = make_sentences(len(bm25))
+
+    results = fuse_scores("q", bm25, dense, sentences, alpha=0.6, top_k=10, strategy="weighted")
+    expected = reference_fusion(list(bm25), list(dense), 0.6, 10)
+
+    assert [r["sentence_id"] for r in results] == [sid for sid, _ in expected]
+    np.testing.assert_allclose([r["final_score"] for r in results], [s for _, s in expected])
+
+
+@pytest.mark.parametrize("strategy", ["weighted", "rrf", "zscore"])
+def test_array_and_record_inputs_agree(scores, strategy):
+    bm25, dense = scores
+    sentences = make_sentences(len(bm25))
+    bm25_records = [{"sentence_id": s["sentence_id"], "bm25_score": float(v)}
+                    for s, v in zip(sentences, bm25)]
+    dense_records = [{"sentence_id": s["sentence_id"], "faiss_score": float(v)}
+                     for s, v in zip(sentences, dense)]
+    by_id = {s["sentence_id"]: s for s in sentences}
+
+    from_arrays = fuse_scores("q", bm25, dense, sentences, top_k=8, strategy=strategy)
+    from_records = fuse_scores("q", bm25_records, dense_records, by_id, top_k=8, strategy=strategy)
+
+    assert [r["sentence_id"] for r in from_arrays] == [r["sentence_id"] for r in from_records]
+    np.testing.assert_allclose([r["final_score"] for r in from_arrays],
+                               [r["final_score"] for r in from_records])
+
+
+def test_dense_scores_input_matches_plain_array(scores):
+    bm25, dense = scores
+    sentences = make_sentences(len(bm25))
+    top = np.argsort(-dense)[:5]
+    full = DenseScores(dense, top, dense[top])
+
+    assert fuse_scores("q", bm25, full, sentences, top_k=5) == fuse_scores("q", bm25, dense, sentences, top_k=5)
+
+
+def test_rrf_ranks_and_mask():
+    rr = reciprocal_ranks([0.1, 0.9, 0.5], k=60)
+    np.testing.assert_allclose(rr, [1 / 63, 1 / 61, 1 / 62])
+
+    masked = reciprocal_ranks([0.1, 0.9, 0.5], mask=np.array([True, False, True]), k=60)
+    np.testing.assert_allclose(masked, [1 / 62, 0.0, 1 / 61])
+
+
+def test_top_k_indices_breaks_ties_by_row():
+    scores = np.array([1.0, 3.0, 3.0, 2.0, 3.0])
+    assert top_k_indices(scores, 3).tolist() == [1, 2, 4]
+    assert top_k_indices(scores, 10).tolist() == [1, 2, 4, 3, 0]
+    assert top_k_indices(scores, 0).tolist() == []
+
+
+def test_fuse_rejects_unknown_strategy_and_handles_empty():
+    assert fuse_scores("q", np.array([]), np.array([]), [], top_k=5) == []
+    with pytest.raises(ValueError):
+        fuse_scores("q", np.zeros(1), np.zeros(1), make_sentences(1), strategy="median")
+
+
+def test_numpy_and_faiss_dense_paths_agree(monkeypatch):
+    pytest.importorskip("faiss")
+    from Retrieval import faiss_retriever
+
+    rng = np.random.default_rng(3)
+    embeddings = rng.standard_normal((300, 16)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    query = embeddings[11] + 0.1 * embeddings[42]
+    query /= np.linalg.norm(query)
+
+    small = dense_search(query, embeddings, top_k=20)
+    monkeypatch.setattr(faiss_retriever, "FAISS_MIN_POOL", 1)
+    large = faiss_retriever.dense_search(query, embeddings, top_k=20)
+
+    assert large.scores is None
+    assert small.top_indices.tolist() == large.top_indices.tolist()
+    np.testing.assert_allclose(small.top_scores, large.top_scores, rtol=1e-5)
+
+
+def test_small_pool_on_the_faiss_branch_fuses_with_floor_scores(scores, monkeypatch):
+    pytest.importorskip("faiss")
+    from Retrieval import faiss_retriever
+
+    bm25, _ = scores
+    rng = np.random.default_rng(5)
+    embeddings = rng.standard_normal((len(bm25), 8)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    query = embeddings[3]
+
+    monkeypatch.setattr(faiss_retriever, "FAISS_MIN_POOL", 10)
+    dense = faiss_retriever.dense_search(query, embeddings, top_k=5)
+    assert dense.scores is None
+    assert dense.top_indices[0] == 3
+
+    results = fuse_scores("q", bm25, dense, make_sentences(len(bm25)), top_k=len(bm25))
+    by_row = {int(r["sentence_id"][1:]): r["faiss_score"] for r in results}
+    floor = float(dense.top_scores.min())
+
+    candidates = set(dense.top_indices.tolist())
+    for row, score in by_row.items():
+        if row in candidates:
+            assert score == pytest.approx(float(embeddings[row] @ query), rel=1e-5)
+        else:
+            assert score == pytest.approx(floor)
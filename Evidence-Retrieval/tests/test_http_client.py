@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from Pipelines import http_client
+from Pipelines.http_client import SourceRequestError
+
+
+class Upstream:
+    """MockTransport handler answering with the queued (status, headers) in order, then 200."""
+
+    def __init__(self, *responses, delay=0.0):
+        self.responses = list(responses)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _next(self):
+        with self._lock:
+            self.calls += 1
+            status, headers = self.responses.pop(0) if self.responses else (200, {})
+        if isinstance(status, Exception):
+            raise status
+        return httpx.Response(status, headers=headers, json={"status": status})
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def __call__(self, request):
+        self._enter()
+        try:
+            time.sleep(self.delay)
+            return self._next()
+        finally:
+            self._exit()
+
+    async def handle_async(self, request):
+        self._enter()
+        try:
+            await asyncio.sleep(self.delay)
+            return self._next()
+        finally:
+            self._exit()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the retry policy chose; the tests then wait 0 s instead."""
+    recorded = []
+    choose = http_client.backoff_delay
+
+    def record(attempt, retry_after=None):
+        recorded.append(choose(attempt, retry_after))
+        return 0
+
+    monkeypatch.setattr(http_client, "backoff_delay", record)
+    return recorded
+
+
+@pytest.fixture
+def use(monkeypatch):
+    def install(upstream):
+        client = httpx.Client(transport=httpx.MockTransport(upstream))
+        monkeypatch.setattr(http_client, "get_client", lambda: client)
+        return upstream
+
+    monkeypatch.setattr(http_client, "_host_semaphores", {})
+    return install
+
+
+def test_retries_rate_limits_and_server_errors(use, sleeps):
+    upstream = use(Upstream((429, {}), (503, {})))
+    assert http_client._fetch_json("https://api.example.org/x", None, None, 5, 2) == {"status": 200}
+    assert upstream.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(use, sleeps):
+    upstream = use(Upstream((404, {})))
+    with pytest.raises(SourceRequestError) as e:
+        http_client._fetch_json("https://api.example.org/x", None, None, 5, 2)
+    assert e.value.status_code == 404
+    assert upstream.calls == 1 and sleeps == []
+
+
+def test_retry_after_is_honoured_up_to_the_cap(use, sleeps):
+    use(Upstream((429, {"Retry-After": "3"}), (429, {"Retry-After": "600"})))
+    http_client._fetch_json("https://api.example.org/x", None, None, 5, 2)
+    assert sleeps == [3.0, http_client.BACKOFF_MAX]
+
+
+def test_last_attempt_raises_source_request_error(use, sleeps):
+    upstream = use(Upstream((503, {}), (503, {}), (503, {})))
+    with pytest.raises(SourceRequestError) as e:
+        http_client._fetch_json("https://api.example.org/x", None, None, 5, 2)
+    assert e.value.status_code == 503
+    assert upstream.calls == 3
+
+    use(Upstream(*[(httpx.ReadTimeout("slow"), {})] * 3))
+    with pytest.raises(SourceRequestError) as e:
+        http_client._fetch_json("https://api.example.org/x", None, None, 5, 2)
+    assert e.value.timed_out
+
+
+def test_per_host_limit_caps_concurrent_requests(use, monkeypatch):
+    monkeypatch.setattr(http_client, "MAX_CONNECTIONS_PER_HOST", 2)
+    upstream = use(Upstream(delay=0.05))
+
+    threads = [
+        threading.Thread(target=http_client._fetch_json, args=("https://api.example.org/x", None, None, 5, 0))
+        for _ in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert upstream.calls == 6
+    assert upstream.max_in_flight == 2
+
+
+# -----------------------------------------------------
+# Async path: same policy on httpx.AsyncClient
+# -----------------------------------------------------
+@pytest.fixture
+def use_async(monkeypatch):
+    def install(upstream):
+        clients = {}
+
+        def client():
+            loop = asyncio.get_running_loop()
+            if loop not in clients:
+                clients[loop] = httpx.AsyncClient(transport=httpx.MockTransport(upstream.handle_async))
+            return clients[loop]
+
+        monkeypatch.setattr(http_client, "get_async_client", client)
+        return upstream
+
+    return install
+
+
+def test_async_retries_with_the_same_policy(use_async, sleeps):
+    upstream = use_async(Upstream((429, {"Retry-After": "600"}), (502, {})))
+    result = asyncio.run(http_client._async_fetch_json("https://api.example.org/x", None, None, 5, 2))
+    assert result == {"status": 200}
+    assert upstream.calls == 3
+    assert sleeps[0] == http_client.BACKOFF_MAX
+
+    use_async(Upstream((500, {}), (500, {})))
+    with pytest.raises(SourceRequestError):
+        asyncio.run(http_client._async_fetch_json("https://api.example.org/x", None, None, 5, 1))
+
+
+def test_async_per_host_limit(use_async, monkeypatch):
+    monkeypatch.setattr(http_client, "MAX_CONNECTIONS_PER_HOST", 3)
+    upstream = use_async(Upstream(delay=0.02))
+
+    async def run():
+        await asyncio.gather(*(
+            http_client._async_fetch_json("https://api.example.org/x", None, None, 5, 0)
+            for _ in range(10)
+        ))
+
+    asyncio.run(run())
+    assert upstream.calls == 10
+    assert upstream.max_in_flight == 3
+
+
+def test_async_get_json_goes_through_the_response_cache(use_async, monkeypatch):
+    from Pipelines.response_cache import MemoryTier, ResponseCache
+
+    cache = ResponseCache([MemoryTier()])
+    monkeypatch.setattr(http_client, "get_response_cache", lambda: cache)
+    upstream = use_async(Upstream())
+
+    async def twice():
+        first = await http_client.async_get_json("https://api.example.org/x", {"q": 1}, cache="openalex")
+        second = await http_client.async_get_json("https://api.example.org/x", {"q": 1}, cache="openalex")
+        return first, second
+
+    first, second = asyncio.run(twice())
+    assert first == second == {"status": 200}
+    assert upstream.calls == 1
+    assert cache.snapshot()["openalex"]["hits"] == 1
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+from app import jobs
+from app.jobs import Job
+
+
+def collect(job, last_event_id=-1, timeout=5):
+    async def run():
+        events = []
+        async for event in job.stream(last_event_id):
+            if event is not None:
+                events.append(event)
+        return events
+
+    return asyncio.run(asyncio.wait_for(run(), timeout))
+
+
+def test_stream_replays_history_and_ends_on_done():
+    job = Job("q1", "claim")
+    job.add_event("retrieval", {"n": 3})
+    job.finish("done", result={"verdict": "SUPPORTED"})
+
+    events = collect(job)
+    assert [e["stage"] for e in events] == ["retrieval", "done"]
+    assert events[-1]["data"]["status"] == "done"
+    assert job.status == "done"
+
+
+def test_stream_resumes_after_last_event_id():
+    job = Job("q1", "claim")
+    for stage in ("expansion", "retrieval", "nli"):
+        job.add_event(stage, {})
+    job.finish("failed", error="boom")
+
+    events = collect(job, last_event_id=1)
+    assert [e["stage"] for e in events] == ["nli", "error"]
+    assert events[-1]["data"]["error"] == "boom"
+
+
+def test_live_subscriber_gets_the_final_event_from_another_thread():
+    job = Job("q1", "claim")
+
+    async def run():
+        events = []
+        subscribed = asyncio.Event()
+
+        async def consume():
+            agen = job.stream()
+            subscribed.set()
+            async for event in agen:
+                events.append(event)
+
+        task = asyncio.ensure_future(consume())
+        await subscribed.wait()
+        await asyncio.sleep(0.05)
+
+        def pipeline():
+            job.add_event("retrieval", {})
+            job.finish("done", result={})
+
+        threading.Thread(target=pipeline).start()
+        await asyncio.wait_for(task, 5)
+        return events
+
+    events = asyncio.run(run())
+    assert [e["stage"] for e in events] == ["retrieval", "done"]
+    assert not job._waiters
+
+
+def test_finished_job_is_never_seen_without_its_final_event():
+    # the status turns terminal only once the final event is in place
+    for _ in range(50):
+        job = Job("q", "claim")
+        seen = []
+
+        def watch():
+            while not job.finished:
+                pass
+            seen.append([e["stage"] for e in job.events])
+
+        watcher = threading.Thread(target=watch)
+        watcher.start()
+        job.finish("done", result={})
+        watcher.join(5)
+        assert seen == [["done"]]
+
+
+def test_run_job_records_stages_and_failures(monkeypatch):
+    def fake_verify(claim, query_id=None, on_stage=None):
+        on_stage("retrieval", {"claim": claim})
+        if claim == "bad":
+            return {"query_id": query_id, "error": "no evidence"}
+        return {"query_id": query_id, "verdict": "SUPPORTED"}
+
+    monkeypatch.setattr(jobs, "verify_with_cache", fake_verify)
+
+    ok, bad = Job("q1", "good"), Job("q2", "bad")
+    jobs._run_job(ok)
+    jobs._run_job(bad)
+
+    assert ok.status == "done" and ok.result["verdict"] == "SUPPORTED"
+    assert [e["stage"] for e in ok.events] == ["retrieval", "done"]
+    assert bad.status == "failed" and bad.error == "no evidence"
+    assert bad.events[-1]["stage"] == "error"
+
+
+def test_run_job_turns_exceptions_into_failed_jobs(monkeypatch):
+    def explode(claim, query_id=None, on_stage=None):
+        raise RuntimeError("pipeline crashed")
+
+    monkeypatch.setattr(jobs, "verify_with_cache", explode)
+
+    job = Job("q1", "claim")
+    jobs._run_job(job)
+    assert job.status == "failed"
+    assert job.error == "pipeline crashed"
+    assert collect(job)[-1]["stage"] == "error"
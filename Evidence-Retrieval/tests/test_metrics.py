@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+pytest.importorskip("prometheus_client")
+
+from app import claim_cache, metrics
+from app.pipeline_context import PipelineContext
+from app.routes import router
+from Pipelines import response_cache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", True)
+    # the scrape must not create the SQLite response cache
+    monkeypatch.setattr(response_cache, "_cache", None)
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_scrape_exposes_stage_histograms_and_state_gauges(client, monkeypatch):
+    assert metrics.setup_metrics()
+    monkeypatch.setattr(claim_cache, "CLAIM_CACHE", claim_cache.ClaimResultCache(max_entries=4))
+    claim_cache.CLAIM_CACHE.put("a claim", "A claim", {"query_id": "q1"})
+    claim_cache.CLAIM_CACHE.get("a claim")
+    claim_cache.CLAIM_CACHE.record_miss()
+
+    ctx = PipelineContext("q-metrics", "A claim")
+    with ctx.stage("bm25"):
+        pass
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+
+    assert "# TYPE evidence_pipeline_stage_seconds histogram" in body
+    assert 'evidence_pipeline_stage_seconds_bucket{le="0.005",stage="bm25"}' in body
+    assert 'evidence_pipeline_stage_seconds_count{stage="bm25"}' in body
+    assert 'evidence_cache_hit_ratio{cache="claim",source=""} 0.5' in body
+    assert 'evidence_cache_requests_total{cache="claim",result="exact",source=""} 1.0' in body
+    assert "# TYPE evidence_nli_queue_depth gauge" in body
+    assert "# TYPE evidence_model_load_seconds gauge" in body
+    assert response_cache._cache is None
+
+
+def test_disabled_metrics_answer_503(client, monkeypatch):
+    monkeypatch.setattr(metrics, "_metrics", None)
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+    assert client.get("/metrics").status_code == 503
@@ -0,0 +1,206 @@
+import sys
+import time
+import types
+import threading
+
+import numpy as np
+import pytest
+
+from app import model_registry, warmup
+from Inference import deberta_nli
+from Inference.deberta_nli import NLIHandle
+from Retrieval import encoder_registry
+
+
+# =================================================
+# 🔹 ENCODERS
+# =================================================
+class FakeSentenceTransformer:
+    loads = []
+
+    def __init__(self, name):
+        time.sleep(0.05)        # wide enough for concurrent first callers to overlap
+        FakeSentenceTransformer.loads.append(name)
+        self.name = name
+
+    def encode(self, texts, normalize_embeddings=False):
+        return np.ones((len(texts), 4), dtype=np.float32) / 2
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+
+@pytest.fixture
+def fake_encoders(monkeypatch):
+    FakeSentenceTransformer.loads = []
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = FakeSentenceTransformer
+    monkeypatch.setitem(sys.modules, "sentence_transformers", module)
+    monkeypatch.setattr(encoder_registry, "_encoders", {})
+    monkeypatch.setattr(encoder_registry, "_load_locks", {})
+    monkeypatch.setattr(encoder_registry, "_load_seconds", {})
+    monkeypatch.setattr(encoder_registry, "_active_name", encoder_registry.DEFAULT_ENCODER)
+    return FakeSentenceTransformer
+
+
+def test_concurrent_first_use_loads_one_encoder(fake_encoders):
+    got = []
+    threads = [
+        threading.Thread(target=lambda: got.append(encoder_registry.get_encoder("sentence-transformers/all-MiniLM-L6-v2")))
+        for _ in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fake_encoders.loads == ["all-MiniLM-L6-v2"]
+    assert len({id(e) for e in got}) == 1
+
+
+def test_swap_encoder_keeps_pairs_held_by_running_requests(fake_encoders):
+    held_name, held = encoder_registry.active_encoder()
+
+    encoder_registry.swap_encoder("other-model")
+    encoder_registry.swap_encoder("third-model")
+
+    assert encoder_registry.active_encoder_name() == "third-model"
+    assert held_name == encoder_registry.DEFAULT_ENCODER
+    assert held.encode(["still works"]).shape == (1, 4)
+    # the default stays loaded (query expansion), the intermediate one is dropped
+    assert set(encoder_registry.loaded_encoders()) == {encoder_registry.DEFAULT_ENCODER, "third-model"}
+
+
+# =================================================
+# 🔹 NLI
+# =================================================
+class FakeScheduler:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def stats(self):
+        return {"queued": 0}
+
+
+def handle(version, model=None):
+    return NLIHandle(version, f"Models/{version}", model, FakeScheduler(), time.time(), 0.0)
+
+
+def test_swap_nli_serves_the_old_model_while_loading(monkeypatch):
+    old = handle("old")
+    monkeypatch.setattr(deberta_nli, "_active_nli", old)
+
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_load(model_path, backend):
+        loading.set()
+        assert release.wait(5)
+        return handle("new")
+
+    monkeypatch.setattr(deberta_nli, "load_nli", slow_load)
+    swapper = threading.Thread(target=deberta_nli.swap_nli, args=("Models/new",))
+    swapper.start()
+    assert loading.wait(5)
+
+    # serving and the handle lock are free during the load
+    start = time.perf_counter()
+    assert deberta_nli.get_nli() is old
+    assert deberta_nli._nli_lock.acquire(timeout=1)
+    deberta_nli._nli_lock.release()
+    assert time.perf_counter() - start < 1
+
+    release.set()
+    swapper.join(5)
+    assert deberta_nli.active_nli().version == "new"
+    assert old.scheduler.closed
+
+
+def test_first_use_loads_once(monkeypatch):
+    monkeypatch.setattr(deberta_nli, "_active_nli", None)
+    loads = []
+
+    def load(model_path, backend):
+        time.sleep(0.05)
+        loads.append(model_path)
+        return handle("first")
+
+    monkeypatch.setattr(deberta_nli, "load_nli", load)
+    threads = [threading.Thread(target=deberta_nli.get_nli) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1
+
+
+class FakeDeberta:
+    id2label = {0: "LABEL_0", 1: "LABEL_1", 2: "LABEL_2"}
+
+    def __init__(self, **kwargs):
+        pass
+
+    def score_pairs(self, pairs):
+        raise AssertionError("warmup must not run on a rejected checkpoint")
+
+
+def test_load_nli_rejects_unmappable_labels(monkeypatch, tmp_path):
+    monkeypatch.setattr(deberta_nli, "DebertaNLI", FakeDeberta)
+    with pytest.raises(ValueError, match="Cannot map NLI labels"):
+        deberta_nli.load_nli(str(tmp_path))
+
+
+def test_run_nli_failure_returns_none(monkeypatch):
+    class Broken:
+        id2label = {0: "CONTRADICTION", 1: "NEUTRAL", 2: "ENTAILMENT"}
+
+        def predict_batch(self, *args, **kwargs):
+            raise RuntimeError("bad batch")
+
+    h = handle("broken", Broken())._replace(scheduler=None)
+    monkeypatch.setattr(deberta_nli, "get_nli", lambda: h)
+    ranked = [{"sentence_id": "s0", "sentence_text": "Evidence."}]
+    assert deberta_nli.run_deberta_nli("q", "Claim.", ranked=ranked, save=False) is None
+
+
+def test_checkpoint_fingerprint_tells_same_named_dirs_apart(tmp_path):
+    a, b, c = (tmp_path / x / "Model-1" for x in "abc")
+    for path, weights in ((a, b"\x00" * 10), (b, b"\x01" * 10), (c, b"\x00" * 10)):
+        path.mkdir(parents=True)
+        (path / "config.json").write_text('{"id2label": {}}')
+        (path / "model.safetensors").write_bytes(weights)
+
+    fingerprint = deberta_nli.checkpoint_fingerprint
+    assert fingerprint(str(a)) != fingerprint(str(b))
+    assert fingerprint(str(a)) == fingerprint(str(c))
+
+
+# =================================================
+# 🔹 READINESS
+# =================================================
+@pytest.fixture
+def fresh_warmup(monkeypatch):
+    monkeypatch.setattr(warmup, "_state", {"status": "pending", "import_seconds": None, "steps": {}})
+    monkeypatch.setattr(warmup, "_warmup_thread", None)
+    monkeypatch.setattr(deberta_nli, "_active_nli", None)
+    monkeypatch.setattr(encoder_registry, "_encoders", {})
+
+
+def test_ready_after_startup_without_warmup(monkeypatch, fresh_warmup):
+    monkeypatch.setattr(warmup, "WARMUP_ON_STARTUP", False)
+    assert not model_registry.is_ready()
+
+    warmup.start_warmup()
+    assert warmup.warmup_state()["status"] == "skipped"
+    assert model_registry.is_ready()
+
+
+def test_ready_with_warmup_waits_for_models(monkeypatch, fresh_warmup):
+    monkeypatch.setattr(warmup, "_state", {"status": "running", "import_seconds": None, "steps": {}})
+    assert not model_registry.is_ready()
+
+    monkeypatch.setattr(deberta_nli, "_active_nli", handle("loaded"))
+    monkeypatch.setitem(encoder_registry._encoders, encoder_registry.active_encoder_name(), object())
+    assert model_registry.is_ready()
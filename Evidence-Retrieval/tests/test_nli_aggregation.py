@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from Inference import nli_aggregation
+from Inference.nli_aggregation import aggregate, label_roles, rank_weights
+
+ID2LABEL = {0: "CONTRADICTION", 1: "NEUTRAL", 2: "ENTAILMENT"}
+
+# evidence in fusion order: supports, refutes, neutral
+PROBS = [
+    [0.1, 0.2, 0.7],
+    [0.6, 0.3, 0.1],
+    [0.2, 0.7, 0.1],
+]
+
+
+@pytest.mark.parametrize("aggregator,label,confidence", [
+    ("max", "ENTAILMENT", 0.7),
+    # votes 1 (support) + 1/2 (refute) + 1/3 (neutral)
+    ("vote", "ENTAILMENT", 1 / (1 + 1 / 2 + 1 / 3)),
+    # weights 1 * 0.7, 1/2 * 0.6, 1/3 * 0.7
+    ("confidence", "ENTAILMENT", (0.7 * 0.7 + 0.3 * 0.1 + 0.7 / 3 * 0.1) / (0.7 + 0.3 + 0.7 / 3)),
+])
+def test_aggregators_on_fixed_rows(aggregator, label, confidence):
+    got_label, got_confidence = aggregate(PROBS, ID2LABEL, aggregator)
+    assert got_label == label
+    assert got_confidence == pytest.approx(confidence)
+
+
+def test_rank_weights_decide_a_tied_vote():
+    tied = [[0.8, 0.1, 0.1], [0.1, 0.1, 0.8]]
+    assert aggregate(tied, ID2LABEL, "vote")[0] == "CONTRADICTION"
+    assert aggregate(tied, ID2LABEL, "vote", weights=[1, 2])[0] == "ENTAILMENT"
+    np.testing.assert_allclose(rank_weights(3), [1, 1 / 2, 1 / 3])
+
+
+def test_max_is_neutral_below_the_decision_threshold(monkeypatch):
+    weak = [[0.3, 0.3, 0.4], [0.45, 0.35, 0.2]]
+    assert aggregate(weak, ID2LABEL, "max") == ("NEUTRAL", pytest.approx(0.55))
+
+    monkeypatch.setattr(nli_aggregation, "NLI_DECISION_THRESHOLD", 0.4)
+    assert aggregate(weak, ID2LABEL, "max") == ("CONTRADICTION", pytest.approx(0.45))
+
+
+def test_refutation_wins_over_weaker_support():
+    assert aggregate([[0.9, 0.05, 0.05], [0.1, 0.1, 0.8]], ID2LABEL, "max") == \
+        ("CONTRADICTION", pytest.approx(0.9))
+
+
+def test_no_evidence_is_neutral():
+    assert aggregate(np.empty((0, 3)), ID2LABEL, "confidence") == ("NEUTRAL", 0.0)
+
+
+def test_label_roles_follow_the_checkpoint_names():
+    assert label_roles({0: "SUPPORTS", 1: "REFUTES", 2: "NOT ENOUGH INFO"}) == \
+        {"support": 0, "refute": 1, "neutral": 2}
+    with pytest.raises(ValueError):
+        label_roles({0: "LABEL_0", 1: "LABEL_1", 2: "LABEL_2"})
+
+
+def test_unknown_aggregator_is_rejected():
+    with pytest.raises(ValueError):
+        aggregate(PROBS, ID2LABEL, "mean")
@@ -0,0 +1,228 @@
+import contextlib
+import json
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from Inference import backends, nli_parity
+from Inference.deberta_nli import DebertaNLI
+
+ID2LABEL = {0: "CONTRADICTION", 1: "NEUTRAL", 2: "ENTAILMENT"}
+FIXTURES = os.path.join(os.path.dirname(nli_parity.__file__), "fixtures", "nli_parity.jsonl")
+
+
+# =================================================
+# 🔹 FAKE torch / transformers / onnxruntime
+# =================================================
+class FakeTensor:
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def to(self, device):
+        return self
+
+    def float(self):
+        return self
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array.astype(np.float32)
+
+
+class FakeModel:
+    def __init__(self, path):
+        self.path = path
+        self.device = None
+        self.quantized = False
+        self.config = types.SimpleNamespace(id2label={str(k): v for k, v in ID2LABEL.items()})
+
+    def to(self, device):
+        self.device = device
+        return self
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, **kwargs):
+        return types.SimpleNamespace(logits=FakeTensor(logits_for(input_ids.array)))
+
+
+class FakeSession:
+    def __init__(self, path, options, providers):
+        self.path = path
+        self.options = options
+        self.providers = providers
+
+    def get_inputs(self):
+        return [types.SimpleNamespace(name="input_ids"), types.SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, feed):
+        assert all(v.dtype == np.int64 for v in feed.values())
+        return [logits_for(feed["input_ids"]).astype(np.float64)]
+
+
+def logits_for(input_ids):
+    """Deterministic logits per row from its non-padding token ids."""
+    rows = []
+    for ids in np.asarray(input_ids):
+        ids = ids[ids != 0]
+        rng = np.random.default_rng(int((ids * np.arange(1, len(ids) + 1)).sum()))
+        rows.append(rng.normal(size=len(ID2LABEL)) * 3)
+    return np.array(rows, dtype=np.float32)
+
+
+class FakeTokenizer:
+    """Word ids for claim + evidence pairs; pads with 0."""
+
+    @classmethod
+    def from_pretrained(cls, path, local_files_only=True):
+        return cls()
+
+    @staticmethod
+    def ids(text):
+        return [sum(map(ord, w)) % 997 + 1 for w in text.split()]
+
+    def __call__(self, claims, evidence=None, truncation=True, max_length=512, **kwargs):
+        if isinstance(claims, str):
+            claims, evidence = [claims], [""]
+        input_ids = [(self.ids(c) + [999] + self.ids(e))[:max_length] for c, e in zip(claims, evidence)]
+        encoded = {"input_ids": input_ids, "attention_mask": [[1] * len(i) for i in input_ids]}
+        return self.pad(encoded, kwargs["return_tensors"]) if "return_tensors" in kwargs else encoded
+
+    def pad(self, encoded, return_tensors=None):
+        width = max(len(ids) for ids in encoded["input_ids"])
+        padded = {
+            key: np.array([row + [0] * (width - len(row)) for row in rows], dtype=np.int64)
+            for key, rows in encoded.items()
+        }
+        if return_tensors == "pt":
+            return {key: FakeTensor(value) for key, value in padded.items()}
+        return padded
+
+
+@pytest.fixture
+def fake_runtimes(monkeypatch, tmp_path):
+    torch = types.ModuleType("torch")
+    torch.threads = []
+    torch.set_num_threads = torch.threads.append
+    torch.cuda = types.SimpleNamespace(is_available=lambda: False)
+    torch.inference_mode = contextlib.nullcontext
+    torch.nn = types.SimpleNamespace(Linear=object)
+    torch.qint8 = "qint8"
+
+    def quantize_dynamic(model, layers, dtype):
+        model.quantized = (layers, dtype)
+        return model
+
+    torch.ao = types.SimpleNamespace(quantization=types.SimpleNamespace(quantize_dynamic=quantize_dynamic))
+
+    transformers = types.ModuleType("transformers")
+    transformers.AutoModelForSequenceClassification = types.SimpleNamespace(from_pretrained=lambda p, **kw: FakeModel(p))
+    transformers.AutoConfig = types.SimpleNamespace(from_pretrained=lambda p, **kw: FakeModel(p).config)
+    transformers.AutoTokenizer = FakeTokenizer
+
+    ort = types.ModuleType("onnxruntime")
+    ort.SessionOptions = lambda: types.SimpleNamespace(graph_optimization_level=None, intra_op_num_threads=0)
+    ort.GraphOptimizationLevel = types.SimpleNamespace(ORT_ENABLE_ALL="all")
+    ort.InferenceSession = FakeSession
+
+    for name, module in [("torch", torch), ("transformers", transformers), ("onnxruntime", ort)]:
+        monkeypatch.setitem(sys.modules, name, module)
+
+    model_path = tmp_path / "Model-1"
+    (model_path / backends.ONNX_SUBDIR).mkdir(parents=True)
+    (model_path / backends.ONNX_SUBDIR / "model.onnx").write_bytes(b"")
+    return torch, str(model_path)
+
+
+# =================================================
+# 🔹 BACKEND SELECTION
+# =================================================
+def test_each_backend_is_selected_by_name(fake_runtimes, monkeypatch):
+    torch, model_path = fake_runtimes
+    monkeypatch.setattr(backends, "NLI_NUM_THREADS", 2)
+
+    fp32 = backends.load_backend("torch", model_path)
+    assert isinstance(fp32, backends.TorchBackend) and fp32.return_tensors == "pt"
+    assert fp32.device == "cpu" and fp32.id2label == ID2LABEL
+    assert torch.threads == [2]
+
+    int8 = backends.load_backend("torch_int8", model_path, device="cuda")
+    assert int8.name == "torch_int8" and int8.device == "cpu"
+    assert int8.model.quantized == ({torch.nn.Linear}, "qint8")
+
+    onnx = backends.load_backend("onnx", model_path)
+    assert onnx.return_tensors == "np"
+    assert onnx.onnx_path == backends.default_onnx_path(model_path)
+    assert onnx.session.providers == ["CPUExecutionProvider"]
+    assert onnx.session.options.intra_op_num_threads == 2
+    assert onnx.id2label == ID2LABEL
+
+    with pytest.raises(ValueError):
+        backends.load_backend("tensorrt", model_path)
+
+
+def test_onnx_backend_needs_an_exported_graph(fake_runtimes):
+    _, model_path = fake_runtimes
+    with pytest.raises(FileNotFoundError, match="export_onnx"):
+        backends.load_backend("onnx", model_path, onnx_path=model_path + "/missing.onnx")
+
+
+@pytest.mark.parametrize("backend", ["torch", "torch_int8", "onnx"])
+def test_backends_score_the_same_pairs_alike(fake_runtimes, backend):
+    _, model_path = fake_runtimes
+    nli = DebertaNLI(model_path, backend=backend)
+    pairs = [("Water boils at 100 C", "At sea level, water boils at 100 C."),
+             ("Water boils at 100 C", "Ice melts at 0 C."),
+             ("Water boils at 100 C", "Boiling point falls with altitude, as measured on mountains.")]
+
+    probs = nli.score_pairs(pairs, batch_size=2)
+    expected = backends.softmax(logits_for(FakeTokenizer().pad(FakeTokenizer()(
+        [c for c, _ in pairs], [e for _, e in pairs]))["input_ids"]))
+
+    # sorted by length and padded per batch, returned in input order
+    np.testing.assert_allclose(probs, expected, rtol=1e-6)
+    np.testing.assert_allclose(probs.sum(axis=1), 1, rtol=1e-6)
+
+
+# =================================================
+# 🔹 PARITY SCRIPT (shipped fixtures)
+# =================================================
+def run_parity(monkeypatch, model_path, candidate):
+    monkeypatch.setattr(sys, "argv", [
+        "nli_parity", "--backend", candidate, "--model", model_path,
+        "--fixtures", FIXTURES,
+    ])
+    with pytest.raises(SystemExit) as exit:
+        nli_parity.main()
+    return exit.value.code
+
+
+def test_parity_fixture_passes_for_a_matching_backend(fake_runtimes, monkeypatch, capsys):
+    _, model_path = fake_runtimes
+    assert run_parity(monkeypatch, model_path, "onnx") == 0
+
+    out = capsys.readouterr().out
+    report = json.loads(out[:out.rindex("}") + 1])
+    fixtures = nli_parity.load_fixtures(FIXTURES)
+    assert report["fixtures"] == len(fixtures)
+    assert report["pairs"] == sum(len(row["evidence"]) for row in fixtures)
+    assert report["claim_label_agreement"] == 1.0
+    assert report["max_prob_diff"] < 1e-6
+
+
+def test_parity_fixture_fails_for_a_drifting_backend(fake_runtimes, monkeypatch, capsys):
+    _, model_path = fake_runtimes
+
+    class Drifting(backends.OnnxBackend):
+        def logits(self, inputs):
+            return -super().logits(inputs)      # every preference flipped
+
+    monkeypatch.setitem(backends.BACKENDS, "onnx", Drifting)
+    assert run_parity(monkeypatch, model_path, "onnx") == 1
+    assert "Parity check failed" in capsys.readouterr().out
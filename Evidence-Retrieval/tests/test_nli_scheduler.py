@@ -0,0 +1,106 @@
+import threading
+
+import numpy as np
+import pytest
+
+from Inference.nli_scheduler import NLIScheduler
+
+
+class FakeNLI:
+    """score_pairs stand-in: row i is a deterministic function of the pair text."""
+
+    id2label = {0: "CONTRADICTION", 1: "NEUTRAL", 2: "ENTAILMENT"}
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def score_pairs(self, pairs):
+        with self._lock:
+            self.calls.append(list(pairs))
+        if self.fail:
+            raise RuntimeError("forward failed")
+        return np.array([self.row(pair) for pair in pairs], dtype=np.float32)
+
+    @staticmethod
+    def row(pair):
+        seed = sum(map(ord, pair[0] + "|" + pair[1])) % 97
+        raw = np.array([seed % 7 + 1, seed % 5 + 1, seed % 3 + 1], dtype=np.float32)
+        return raw / raw.sum()
+
+
+def pairs_for(caller, n):
+    return [(f"claim {caller}", f"evidence {caller}-{i}") for i in range(n)]
+
+
+def test_concurrent_callers_share_batches_and_get_their_own_rows():
+    nli = FakeNLI()
+    scheduler = NLIScheduler(nli, window_ms=50, max_pairs=1000)
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def call(caller):
+        pairs = pairs_for(caller, caller + 1)
+        barrier.wait()
+        results[caller] = (pairs, scheduler.score_pairs(pairs, timeout=5))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    scheduler.close()
+
+    for pairs, probs in results.values():
+        np.testing.assert_allclose(probs, [FakeNLI.row(p) for p in pairs])
+
+    stats = scheduler.stats()
+    assert stats["requests"] == 8
+    assert stats["pairs"] == sum(range(1, 9))
+    assert stats["batches"] < 8
+
+
+def test_max_pairs_dispatches_without_waiting_for_the_window():
+    nli = FakeNLI()
+    scheduler = NLIScheduler(nli, window_ms=10_000, max_pairs=3)
+
+    probs = scheduler.score_pairs(pairs_for("a", 3), timeout=2)
+    scheduler.close()
+    assert probs.shape == (3, 3)
+
+
+def test_empty_request_never_reaches_the_model():
+    nli = FakeNLI()
+    scheduler = NLIScheduler(nli)
+    assert scheduler.score_pairs([]).shape == (0, 3)
+    scheduler.close()
+    assert nli.calls == []
+
+
+def test_model_errors_reach_every_caller_in_the_batch():
+    scheduler = NLIScheduler(FakeNLI(fail=True), window_ms=1)
+    with pytest.raises(RuntimeError, match="forward failed"):
+        scheduler.score_pairs(pairs_for("a", 2), timeout=2)
+    scheduler.close()
+
+
+def test_closed_scheduler_scores_inline():
+    nli = FakeNLI()
+    scheduler = NLIScheduler(nli, window_ms=1)
+    scheduler.close()
+    scheduler._thread.join(2)
+
+    pairs = pairs_for("late", 2)
+    np.testing.assert_allclose(scheduler.score_pairs(pairs, timeout=2), [FakeNLI.row(p) for p in pairs])
+
+
+def test_close_drains_queued_requests():
+    nli = FakeNLI()
+    scheduler = NLIScheduler(nli, window_ms=200, max_pairs=1000)
+    futures = [scheduler.submit(pairs_for(i, 2)) for i in range(5)]
+    scheduler.close()
+
+    for future in futures:
+        assert future.result(timeout=2).shape == (2, 3)
+
@@ -0,0 +1,143 @@
+import time
+import threading
+
+import pytest
+
+from Pipelines import response_cache
+from Pipelines.response_cache import (
+    DEFAULT_TTL,
+    MemoryTier,
+    ResponseCache,
+    SQLiteTier,
+    cache_key,
+)
+
+
+TTLS = {"wiki_search": (10, 100)}
+
+
+class Loader:
+    def __init__(self, value=None, error=None):
+        self.value = value if value is not None else {"pages": [1, 2]}
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.value
+
+
+def age(cache, key, seconds):
+    """Backdate `key` in every tier by `seconds`."""
+    for tier in cache.tiers:
+        stored_at, value = tier.get(key)
+        tier.set(key, "wiki_search", stored_at - seconds, value)
+
+
+def test_cache_key_ignores_param_order_and_secrets():
+    a = cache_key("https://Example.org/api/", {"q": "x", "limit": 5, "apikey": "secret"})
+    b = cache_key("https://example.org/api", {"limit": "5", "q": "x", "token": "other"})
+    assert a == b
+    assert a != cache_key("https://example.org/api", {"q": "y", "limit": 5})
+
+
+def test_fresh_hit_skips_loader():
+    cache = ResponseCache([MemoryTier()], TTLS)
+    loader = Loader()
+
+    first = cache.fetch("wiki_search", "https://x/api", {"q": 1}, loader)
+    second = cache.fetch("wiki_search", "https://x/api", {"q": 1}, loader)
+
+    assert first == second == loader.value
+    assert loader.calls == 1
+    assert cache.snapshot()["wiki_search"]["hits"] == 1
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    cache = ResponseCache([MemoryTier()], TTLS)
+    cache.fetch("wiki_search", "https://x/api", None, Loader({"v": 1}))
+    age(cache, cache_key("https://x/api"), 50)
+
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        return {"v": 2}
+
+    assert cache.fetch("wiki_search", "https://x/api", None, refresh) == {"v": 1}
+    assert refreshed.wait(2)
+
+    deadline = time.time() + 2
+    while cache.fetch("wiki_search", "https://x/api", None, Loader()) != {"v": 2}:
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_expired_entry_is_reloaded():
+    cache = ResponseCache([MemoryTier()], TTLS)
+    cache.fetch("wiki_search", "https://x/api", None, Loader({"v": 1}))
+    age(cache, cache_key("https://x/api"), 500)
+
+    loader = Loader({"v": 2})
+    assert cache.fetch("wiki_search", "https://x/api", None, loader) == {"v": 2}
+    assert loader.calls == 1
+
+
+def test_errors_are_not_cached():
+    cache = ResponseCache([MemoryTier()], TTLS)
+    with pytest.raises(RuntimeError):
+        cache.fetch("wiki_search", "https://x/api", None, Loader(error=RuntimeError("down")))
+
+    loader = Loader()
+    assert cache.fetch("wiki_search", "https://x/api", None, loader) == loader.value
+    assert loader.calls == 1
+
+
+def test_memory_hits_are_private_copies():
+    cache = ResponseCache([MemoryTier()], TTLS)
+    value = cache.fetch("wiki_search", "https://x/api", None, Loader({"pages": [1]}))
+    value["pages"].append("mutated")
+
+    again = cache.fetch("wiki_search", "https://x/api", None, Loader())
+    assert again == {"pages": [1]}
+    again["pages"].clear()
+    assert cache.fetch("wiki_search", "https://x/api", None, Loader()) == {"pages": [1]}
+
+
+def test_promotion_keeps_the_source(tmp_path):
+    disk = SQLiteTier(str(tmp_path / "cache.sqlite3"))
+    disk.set(cache_key("https://x/api"), "wiki_search", time.time(), {"v": 1})
+
+    class RecordingTier(MemoryTier):
+        def set(self, key, source, stored_at, value):
+            self.source = source
+            super().set(key, source, stored_at, value)
+
+    memory = RecordingTier()
+    cache = ResponseCache([memory, disk], TTLS)
+    assert cache.fetch("wiki_search", "https://x/api", None, Loader()) == {"v": 1}
+    assert memory.source == "wiki_search"
+
+
+def test_prune_removes_expired_rows_of_any_source(tmp_path):
+    disk = SQLiteTier(str(tmp_path / "cache.sqlite3"))
+    now = time.time()
+    long_ago = now - 365 * 24 * 3600
+    disk.set("known-old", "gnews", long_ago, {})
+    disk.set("unknown-old", "something_else", long_ago, {})
+    disk.set("none-old", None, now - sum(DEFAULT_TTL) - 1, {})
+    disk.set("none-new", None, now, {})
+    disk.set("known-new", "gnews", now, {})
+
+    disk._prune()
+
+    keys = {row[0] for row in disk._conn.execute("SELECT key FROM responses")}
+    assert keys == {"none-new", "known-new"}
+
+
+def test_empty_tier_spec_disables_the_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "CACHE_TIERS", "")
+    assert response_cache.get_response_cache() is None
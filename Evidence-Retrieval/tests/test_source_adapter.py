@@ -0,0 +1,128 @@
+import json
+import threading
+import zlib
+from http.server import ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from Pipelines import http_client, source_adapter
+from Pipelines.http_client import SourceRequestError, get_json
+from Pipelines.source_adapter import Faults, SourceStore, make_handler
+
+URL = "https://api.openalex.org/works"
+PARAMS = {"search": "apollo 11", "per_page": 5, "api_key": "secret"}
+BODY = {"results": [{"id": "W1", "title": "Apollo 11"}]}
+
+
+class Upstream:
+    """MockTransport handler: records the URLs it saw and answers with BODY."""
+
+    def __init__(self):
+        self.urls = []
+
+    def __call__(self, request):
+        self.urls.append(str(request.url))
+        return httpx.Response(200, json=BODY)
+
+
+class Offline:
+    def __call__(self, request):
+        raise AssertionError(f"network request in replay: {request.url}")
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    def use(handler):
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(http_client, "get_client", lambda: client)
+        return handler
+
+    yield use
+    source_adapter.install("live")
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "responses.sqlite3")
+
+
+def test_record_then_replay_without_network(transport, store_path):
+    upstream = transport(Upstream())
+    source_adapter.install("record", store_path)
+    assert get_json(URL, params=PARAMS, cache="openalex") == BODY
+    assert len(upstream.urls) == 1
+    source_adapter.get_adapter().store.close()
+
+    transport(Offline())
+    adapter = source_adapter.install("replay", store_path, faults=Faults(0, 0, 0, 0))
+    assert get_json(URL, params=PARAMS, cache="openalex") == BODY
+    assert adapter.stats == {"hits": 1}
+
+    with pytest.raises(SourceRequestError) as e:
+        get_json(URL, params={"search": "not recorded"})
+    assert e.value.status_code == 404
+    assert adapter.stats["misses"] == 1
+
+
+def test_store_is_zlib_json_without_secrets(store_path):
+    store = SourceStore(store_path)
+    store.put(URL, PARAMS, BODY)
+    store.close()
+
+    reopened = SourceStore(store_path)
+    # the api key is neither stored nor part of the lookup key
+    assert reopened.lookup(URL, {**PARAMS, "api_key": "rotated"}) == BODY
+    params, body = reopened._conn.execute("SELECT params, body FROM responses").fetchone()
+    assert "api_key" not in json.loads(params)
+    assert json.loads(zlib.decompress(body)) == BODY
+    assert reopened.hosts() == {"api.openalex.org": 1}
+
+
+@pytest.mark.parametrize("faults,status,timed_out", [
+    (Faults(error_rate=1.0, timeout_rate=0, latency_ms=0, jitter_ms=0), 503, False),
+    (Faults(timeout_rate=1.0, timeout_s=0, latency_ms=0, jitter_ms=0), None, True),
+])
+def test_injected_faults_raise(transport, store_path, faults, status, timed_out):
+    SourceStore(store_path).put(URL, PARAMS, BODY)
+    transport(Offline())
+    adapter = source_adapter.install("replay", store_path, faults=faults)
+
+    with pytest.raises(SourceRequestError) as e:
+        get_json(URL, params=PARAMS)
+    assert e.value.status_code == status
+    assert e.value.timed_out is timed_out
+    assert adapter.stats["hits"] == 0
+
+
+def test_faults_are_reproducible_with_a_seed():
+    draws = [Faults(0, 0, 0.3, 0.2, timeout_s=0, seed=7) for _ in range(2)]
+    assert [draws[0].draw() for _ in range(50)] == [draws[1].draw() for _ in range(50)]
+
+
+def test_remote_mode_rewrites_to_the_stand_in_server(transport):
+    upstream = transport(Upstream())
+    adapter = source_adapter.install("remote")
+    adapter.server_url = "http://replay.local:8765"
+
+    assert get_json(URL, params={"search": "apollo"}) == BODY
+    assert upstream.urls == ["http://replay.local:8765/api.openalex.org/works?search=apollo"]
+
+
+def test_stand_in_server_answers_from_the_store(store_path):
+    store = SourceStore(store_path)
+    store.put(URL, {"search": "apollo 11"}, BODY)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(store, Faults(0, 0, 0, 0)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        with httpx.Client() as client:
+            hit = client.get(source_adapter.remote_url(base, URL), params={"search": "apollo 11"})
+            miss = client.get(source_adapter.remote_url(base, URL), params={"search": "gemini"})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert hit.status_code == 200 and hit.json() == BODY
+    assert miss.status_code == 404
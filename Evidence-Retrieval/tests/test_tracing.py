@@ -0,0 +1,112 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from Pipelines import tracing
+from Pipelines.tracing import NOOP_SPAN, current_span, propagate, record_span, span
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    """Finished spans, captured instead of queued for the export thread."""
+    spans = []
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing, "_export", spans.append)
+    return spans
+
+
+def test_spans_follow_work_into_a_thread_pool(exported):
+    def fetch(source):
+        with span("source.fetch", source=source) as child:
+            return child.parent_id, threading.current_thread().name
+
+    with span("verify_claim", root=True, claim_chars=20) as root:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            parents = list(pool.map(propagate(fetch), ["wikipedia", "openalex"]))
+        start = time.time_ns()
+        record_span("nli.batch", root, start, start + 5_000_000, pairs=8)
+
+    assert current_span() is NOOP_SPAN
+    assert [p for p, _ in parents] == [root.span_id, root.span_id]
+    assert all(name != threading.current_thread().name for _, name in parents)
+
+    by_name = {s.name: s for s in exported}
+    assert {s.trace_id for s in exported} == {root.trace_id}
+    assert by_name["verify_claim"].parent_id is None
+    assert by_name["nli.batch"].parent_id == root.span_id
+    assert by_name["nli.batch"].end_ns - by_name["nli.batch"].start_ns == 5_000_000
+    assert sorted(s.attributes.get("source") for s in exported if s.name == "source.fetch") == \
+        ["openalex", "wikipedia"]
+
+
+def test_without_a_root_nothing_is_recorded(exported):
+    fn = lambda: current_span()
+    assert propagate(fn) is fn
+
+    with span("pipeline.bm25") as s:
+        assert s is NOOP_SPAN
+    record_span("nli.batch", current_span(), 0, 1)
+    assert exported == []
+
+
+def test_errors_mark_the_span(exported):
+    with pytest.raises(ValueError):
+        with span("verify_claim", root=True):
+            raise ValueError("bad claim")
+    assert exported[0].error == "ValueError: bad claim"
+
+
+def test_otlp_json_payload_shape(exported):
+    with span("verify_claim", root=True, cached=False, sentences=12, score=0.5, source="wiki"):
+        with span("http.get", kind=tracing.SPAN_KIND_CLIENT):
+            pass
+
+    document = tracing.encode_spans(exported)
+    resource = document["resourceSpans"][0]
+    assert resource["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": tracing.TRACE_SERVICE_NAME}}
+    ]
+    child, root = resource["scopeSpans"][0]["spans"]
+
+    assert len(root["traceId"]) == 32 and len(root["spanId"]) == 16
+    assert "parentSpanId" not in root
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["kind"] == tracing.SPAN_KIND_CLIENT
+    assert int(root["endTimeUnixNano"]) >= int(root["startTimeUnixNano"])
+    assert isinstance(root["startTimeUnixNano"], str)
+    assert root["status"] == {"code": 1}
+    assert {a["key"]: a["value"] for a in root["attributes"]} == {
+        "cached": {"boolValue": False},
+        "sentences": {"intValue": "12"},
+        "score": {"doubleValue": 0.5},
+        "source": {"stringValue": "wiki"},
+    }
+
+
+def test_exporter_posts_to_the_collector(monkeypatch, tmp_path):
+    out = tmp_path / "collected.jsonl"
+    server = ThreadingHTTPServer(("127.0.0.1", 0), tracing.make_collector_handler(str(out)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing, "TRACE_EXPORTER", "otlp")
+    monkeypatch.setattr(tracing, "TRACE_OTLP_ENDPOINT", f"http://127.0.0.1:{server.server_port}/v1/traces")
+    monkeypatch.setattr(tracing, "EXPORT_INTERVAL_S", 0.05)
+
+    try:
+        with span("verify_claim", root=True) as root:
+            with span("pipeline.fetch"):
+                pass
+        tracing.flush(5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    spans = tracing.load_spans(str(out))
+    assert {s["name"] for s in spans} == {"verify_claim", "pipeline.fetch"}
+    assert {s["traceId"] for s in spans} == {root.trace_id}